@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import time
+import warnings
+import itertools
+import numpy as np
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType
+from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
+from cnspy_spatial_csv_formats.ErrorRepresentationType import ErrorRepresentationType
+from cnspy_spatial_csv_formats.CSVSpatialStats import CSVSpatialStats, TimedLines
+from cnspy_spatial_csv_formats.CSVSpatialCompression import CSVSpatialCompression
+
+
+# Bulk (NumPy) counterpart of CSVSpatialFormatType.parse():
+#  - a file is loaded into one float64 block of shape (N, len(get_format(fmt))), the columns are in the order of
+#    CSVSpatialFormatType.get_format(fmt), regardless of the column order in the file header.
+#  - the typed columns 'est_err_type' and 'err_representation' are stored as small integer codes,
+#    see EstimationErrorType.code() and ErrorRepresentationType.code().
+#  - the entries are separated by ',' or, if the header has no ',', by whitespace (space-separated TUM files).
+class CSVSpatialArray:
+    fmt = CSVSpatialFormatType.none
+    header_parts = None   # column names as found in the file header
+    columns = None        # column names of the resulting block: CSVSpatialFormatType.get_format(fmt)
+    perm = None           # file column index for each block column, None if identical
+    converters = None     # file column index -> callable mapping a typed entry to its code
+    delimiter = ','       # None: whitespace
+
+    def __init__(self, fmt, header_parts=None, delimiter=','):
+        assert (isinstance(fmt, CSVSpatialFormatType))
+        self.fmt = fmt
+        self.delimiter = delimiter
+        self.columns = CSVSpatialFormatType.get_format(fmt)
+        h_parts = CSVSpatialFormatType.get_header(fmt)
+        if header_parts is None:
+            header_parts = h_parts
+        self.header_parts = [h.strip() for h in header_parts]
+        assert (len(self.header_parts) == len(h_parts))
+
+        perm = [self.header_parts.index(h) for h in h_parts]
+        if perm != list(range(len(perm))):
+            self.perm = perm
+
+        self.converters = dict()
+        codes = CSVSpatialArray.type_codes()
+        for name in ['est_err_type', 'err_representation']:
+            if name in self.header_parts:
+                # entries may be padded with whitespace, e.g. '1.0, type1, theta_R'
+                self.converters[self.header_parts.index(name)] = lambda s, c=codes[name]: c[s.strip()]
+
+    @staticmethod
+    def type_codes():
+        return {'est_err_type': dict((s, float(i)) for i, s in enumerate(EstimationErrorType.list())),
+                'err_representation': dict((s, float(i)) for i, s in enumerate(ErrorRepresentationType.list()))}
+
+    def num_columns(self):
+        return len(self.columns)
+
+    def column_index(self, name):
+        return self.columns.index(name)
+
+    def parse(self, lines):
+        """
+        parses an iterable of CSV lines (a file object or a list of strings) into a (N, num_columns()) block.
+        """
+        with warnings.catch_warnings():
+            # an empty input is not an error here, but results in an empty block
+            warnings.filterwarnings("ignore", message=".*input contained no data.*")
+            data = np.loadtxt(lines, delimiter=self.delimiter, dtype=np.float64, ndmin=2, converters=self.converters)
+        if data.size == 0:
+            return np.empty((0, self.num_columns()), dtype=np.float64)
+        if self.perm is not None:
+            data = data[:, self.perm]
+        return data
+
+    def timestamps(self, lines):
+        # extracts only the timestamp entry of each line, the remaining entries are not converted
+        t_idx = self.header_parts.index(CSVSpatialFormatType.get_header(self.fmt)[0])
+        if t_idx == 0 and self.delimiter is not None:
+            return np.array([float(line.partition(self.delimiter)[0]) for line in lines], dtype=np.float64)
+        return np.array([float(line.split(self.delimiter, t_idx + 1)[t_idx]) for line in lines], dtype=np.float64)
+
+    @staticmethod
+    def from_header(header):
+        header = str(header).rstrip("\n\r")
+        fmt = CSVSpatialFormatType.header_to_format_type(header)
+        if fmt == CSVSpatialFormatType.none:
+            return None
+        delimiter = CSVSpatialFormatType.delimiter(header)
+        return CSVSpatialArray(fmt, header_parts=header.split(delimiter), delimiter=delimiter)
+
+    @staticmethod
+    def read(fn, order='C'):
+        """
+        loads an entire CSV file in one pass.
+
+        :return: (CSVSpatialArray layout, data) or (None, None) if the file or its header is unknown
+        """
+        if not os.path.exists(fn):
+            print("CSVSpatialArray.read(): File not found!\n\t[" + str(fn) + "]")
+            return None, None
+
+        with CSVSpatialCompression.open_text(fn) as file:
+            header = file.readline()
+            layout = CSVSpatialArray.from_header(header)
+            if layout is None:
+                print("CSVSpatialArray.read(): Header unknown!\n\t[" + str(header).rstrip("\n\r") + "]")
+                return None, None
+            stats = CSVSpatialStats.active
+            if stats is None:
+                data = layout.parse(file)
+            else:
+                t_start = time.perf_counter()
+                lines = TimedLines(file)
+                data = layout.parse(lines)
+                t_parse = time.perf_counter() - t_start - lines.seconds
+                stats.record(fn, 'io', lines.seconds, n_bytes=len(header) + lines.n_bytes)
+                stats.record(fn, 'parse', t_parse, rows=len(data), rows_rejected=lines.lines - len(data),
+                             fmt=layout.fmt)
+
+        if order == 'F':
+            data = np.asfortranarray(data)
+        return layout, data
+
+    @staticmethod
+    def iter_chunks(fn, chunk_size=65536, t_min=None, t_max=None, is_sorted=False):
+        """
+        generator yielding consecutive (n <= chunk_size, num_columns) blocks of a file; only one chunk of lines is
+        held in memory at a time. Stopping the iteration early (break) closes the file.
+
+        :param t_min, t_max: optional time range [t_min, t_max]; rows outside are dropped based on their timestamp
+                             alone, without converting the remaining entries.
+        :param is_sorted: if the timestamps are ascending, reading stops at the first row beyond t_max.
+        """
+        if not os.path.exists(fn):
+            print("CSVSpatialArray.iter_chunks(): File not found!\n\t[" + str(fn) + "]")
+            return
+
+        with CSVSpatialCompression.open_text(fn) as file:
+            header = file.readline()
+            layout = CSVSpatialArray.from_header(header)
+            if layout is None:
+                print("CSVSpatialArray.iter_chunks(): Header unknown!\n\t[" + str(header).rstrip("\n\r") + "]")
+                return
+
+            filter_time = t_min is not None or t_max is not None
+            stats = CSVSpatialStats.active
+            if stats is not None:
+                stats.record(fn, 'io', 0.0, n_bytes=len(header), fmt=layout.fmt)
+            while True:
+                t_start = time.perf_counter() if stats is not None else 0.0
+                lines = list(itertools.islice(file, chunk_size))
+                if not lines:
+                    break
+                if stats is not None:
+                    t_read = time.perf_counter()
+                    n_lines = len(lines)
+                    stats.record(fn, 'io', t_read - t_start, n_bytes=sum(map(len, lines)))
+
+                done = False
+                if filter_time:
+                    lines = [line for line in lines if line.strip()]
+                    t = layout.timestamps(lines)
+                    mask = np.ones(len(t), dtype=bool)
+                    if t_min is not None:
+                        mask &= t >= t_min
+                    if t_max is not None:
+                        beyond = t > t_max
+                        mask &= ~beyond
+                        done = is_sorted and bool(beyond.any())
+                    if not mask.all():
+                        lines = list(itertools.compress(lines, mask))
+
+                block = layout.parse(lines) if lines else None
+                if stats is not None:
+                    n_rows = 0 if block is None else len(block)
+                    stats.record(fn, 'parse', time.perf_counter() - t_read, rows=n_rows, rows_rejected=n_lines - n_rows)
+                if block is not None:
+                    yield block
+                if done:
+                    break
+
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import asyncio
+import weakref
+import threading
+import numpy as np
+from cnspy_spatial_csv_formats.CSVSpatialArray import CSVSpatialArray
+from cnspy_spatial_csv_formats.CSVSpatialFormat import CSVSpatialFormat
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType
+from cnspy_spatial_csv_formats.CSVSpatialLoader import CSVSpatialLoader, CSVSpatialLoadResult
+
+
+# asyncio counterparts of the (blocking) readers:
+#  - file I/O and parsing run in an executor (None: the default thread pool of the event loop), the event loop only
+#    awaits the results.
+#  - iter_chunks_async() hands one chunk at a time to the executor, thus cancelling the consuming task stops reading
+#    after the current chunk and closes the file.
+class CSVSpatialAsync:
+    @staticmethod
+    async def identify_format_async(fn, executor=None):
+        # see CSVSpatialFormat.identify_format()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, CSVSpatialFormat.identify_format, fn)
+
+    @staticmethod
+    async def read_array_async(fn, executor=None):
+        # see CSVSpatialFormat.read_array()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, CSVSpatialFormat.read_array, fn)
+
+    @staticmethod
+    async def iter_chunks_async(fn, chunk_size=65536, t_min=None, t_max=None, is_sorted=False, executor=None):
+        """
+        async generator yielding consecutive blocks of a file, see CSVSpatialArray.iter_chunks().
+        """
+        loop = asyncio.get_running_loop()
+        chunks = CSVSpatialArray.iter_chunks(fn, chunk_size=chunk_size, t_min=t_min, t_max=t_max, is_sorted=is_sorted)
+        # a chunk may still be parsed in the executor when the consumer is cancelled: close() waits for it
+        lock = threading.Lock()
+
+        def step():
+            with lock:
+                return next(chunks, None)
+
+        def close():
+            with lock:
+                chunks.close()
+
+        try:
+            while True:
+                block = await loop.run_in_executor(executor, step)
+                if block is None:
+                    break
+                yield block
+        finally:
+            try:
+                await loop.run_in_executor(executor, close)
+            except RuntimeError:
+                # the event loop or executor is shut down already
+                close()
+
+
+# Loads many files concurrently from a coroutine; at most max_concurrency files are read at the same time.
+#  - the semaphores are created inside the running event loop and load() keeps one per loop (a semaphore is bound
+#    to the loop it first waited in), thus a loader may be constructed outside of it and be used with several
+#    asyncio.run() calls.
+class CSVSpatialAsyncLoader:
+    max_concurrency = 4
+    chunk_size = 65536
+    executor = None
+    semaphores = None   # event loop -> semaphore of load(), created on its first call in the loop
+
+    def __init__(self, max_concurrency=4, chunk_size=65536, executor=None):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.chunk_size = chunk_size
+        self.executor = executor
+        self.semaphores = weakref.WeakKeyDictionary()
+
+    async def load(self, fn):
+        """
+        :return: CSVSpatialLoadResult; problems are returned as its error, cancellation is propagated
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = self.semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self.semaphores[loop] = semaphore
+        return await self._load(fn, semaphore)
+
+    async def _load(self, fn, semaphore):
+        async with semaphore:
+            if not os.path.exists(fn):
+                return CSVSpatialLoadResult(fn, error="File not found")
+            try:
+                fmt = await CSVSpatialAsync.identify_format_async(fn, executor=self.executor)
+                if fmt.type == CSVSpatialFormatType.none:
+                    return CSVSpatialLoadResult(fn, error="Header unknown")
+                chunks = [block async for block in CSVSpatialAsync.iter_chunks_async(fn, chunk_size=self.chunk_size,
+                                                                                     executor=self.executor)]
+                if chunks:
+                    data = np.concatenate(chunks)
+                else:
+                    data = CSVSpatialArray(fmt.type).parse([])
+                return CSVSpatialLoadResult(fn, fmt=CSVSpatialFormat.from_array(fmt.type, data), data=data)
+            except Exception as e:
+                return CSVSpatialLoadResult(fn, error=type(e).__name__ + ": " + str(e))
+
+    async def load_all(self, paths, pattern='*.csv'):
+        """
+        :return: dict file name -> CSVSpatialLoadResult, in the order of CSVSpatialLoader.expand()
+        """
+        files = CSVSpatialLoader.expand(paths, pattern=pattern)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results = await asyncio.gather(*[self._load(fn, semaphore) for fn in files])
+        return dict((r.fn, r) for r in results)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import subprocess
+import numpy as np
+from cnspy_spatial_csv_formats.CSVSpatialFormat import CSVSpatialFormat
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType, get_parse_tables
+from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
+from cnspy_spatial_csv_formats.ErrorRepresentationType import ErrorRepresentationType
+
+
+# Benchmark harness over synthesized trajectories of every CSVSpatialFormatType:
+#  - per format and number of rows, a file is written and the following paths are measured: identify_format,
+#    per-line parse (CSVSpatialFormatType.parse), CSVSpatialParser, read_array (bulk), iter_chunks (streaming) and
+#    write_array.
+#  - each result records the best time of 'repeat' runs as rows/s and MB/s (of the CSV file), and the peak memory
+#    traced by tracemalloc (in a separate run, the timing runs are not traced).
+#  - the report is a JSON file with the environment (commit, versions) and a list of results; compare() relates two
+#    reports, e.g. of two commits.
+class CSVSpatialBenchmark:
+    BENCHMARKS = ['identify_format', 'parse_lines', 'parser', 'read_array', 'iter_chunks', 'write_array']
+    # per-line paths build one object per row; they are measured on at most this many rows
+    MAX_LINE_ROWS = 1000000
+
+    rows = None
+    formats = None
+    benchmarks = None
+    trace_memory = True
+    repeat = 3
+    tmp_dir = None
+
+    def __init__(self, rows=(10000,), formats=None, benchmarks=None, trace_memory=True, repeat=3, tmp_dir=None):
+        self.rows = list(rows)
+        if formats is None:
+            formats = [CSVSpatialFormatType(f) for f in CSVSpatialFormatType.list() if f != 'none']
+        self.formats = [CSVSpatialFormatType(str(f)) for f in formats]
+        self.benchmarks = list(benchmarks) if benchmarks is not None else CSVSpatialBenchmark.BENCHMARKS
+        self.trace_memory = trace_memory
+        self.repeat = repeat
+        self.tmp_dir = tmp_dir
+
+    @staticmethod
+    def synthesize(fmt, n_rows, seed=0):
+        """
+        :return: (n_rows, len(get_format(fmt))) block of a random trajectory at 100 Hz with unit quaternions
+        """
+        rng = np.random.default_rng(seed)
+        columns = CSVSpatialFormatType.get_format(fmt)
+        data = rng.standard_normal((n_rows, len(columns)))
+        data[:, 0] = np.arange(n_rows) * 0.01
+        if 'qw' in columns:
+            i = [columns.index(c) for c in ['qx', 'qy', 'qz', 'qw']]
+            data[:, i] /= np.linalg.norm(data[:, i], axis=1, keepdims=True)
+        if 'est_err_type' in columns:
+            data[:, columns.index('est_err_type')] = EstimationErrorType.type1.code()
+        if 'err_representation' in columns:
+            data[:, columns.index('err_representation')] = ErrorRepresentationType.theta_so3.code()
+        return data
+
+    @staticmethod
+    def measure(func, trace_memory=True, repeat=3):
+        """
+        :return: (best seconds of repeat runs, peak traced bytes or None, result of func)
+        """
+        seconds = None
+        for _ in range(max(1, repeat)):
+            t_start = time.perf_counter()
+            result = func()
+            t_elapsed = time.perf_counter() - t_start
+            seconds = t_elapsed if seconds is None else min(seconds, t_elapsed)
+        peak = None
+        if trace_memory:
+            del result
+            tracemalloc.start()
+            try:
+                result = func()
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        return seconds, peak, result
+
+    @staticmethod
+    def environment():
+        commit = None
+        try:
+            commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                                    cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            pass
+        return {'commit': commit,
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'platform': platform.platform(),
+                'processor': platform.processor(),
+                'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+    def run_format(self, fmt, n_rows, fn):
+        results = []
+        data = CSVSpatialBenchmark.synthesize(fmt, n_rows)
+        csv_fmt = CSVSpatialFormat.from_array(fmt, data)
+        csv_fmt.write_array(fn, data)
+        file_bytes = os.path.getsize(fn)
+
+        def lines():
+            with open(fn, "r") as file:
+                file.readline()
+                return [line for _, line in zip(range(CSVSpatialBenchmark.MAX_LINE_ROWS), file)]
+
+        cases = {'identify_format': (lambda: CSVSpatialFormat.identify_format(fn), 1),
+                 'read_array': (lambda: CSVSpatialFormat.read_array(fn), n_rows),
+                 'iter_chunks': (lambda: sum(len(b) for b in CSVSpatialFormat.iter_chunks(fn)), n_rows),
+                 'write_array': (lambda: csv_fmt.write_array(fn + '.out', data), n_rows)}
+        if str(fmt) in get_parse_tables()[0]:
+            file_lines = lines()
+            parser = csv_fmt.get_parser()
+            cases['parse_lines'] = (lambda: [CSVSpatialFormatType.parse(line, fmt) for line in file_lines],
+                                    len(file_lines))
+            cases['parser'] = (lambda: [parser(line) for line in file_lines], len(file_lines))
+
+        for name in self.benchmarks:
+            if name not in cases:
+                continue
+            func, rows = cases[name]
+            seconds, peak, _ = CSVSpatialBenchmark.measure(func, trace_memory=self.trace_memory, repeat=self.repeat)
+            n_bytes = file_bytes if rows == n_rows else (0 if rows == 1 else file_bytes * rows / float(n_rows))
+            results.append({'format': str(fmt),
+                            'benchmark': name,
+                            'rows': rows,
+                            'bytes': int(n_bytes),
+                            'seconds': seconds,
+                            'rows_per_s': rows / seconds if seconds > 0 else None,
+                            'mb_per_s': n_bytes / seconds * 1e-6 if seconds > 0 and n_bytes else None,
+                            'peak_memory_bytes': peak})
+        if os.path.exists(fn + '.out'):
+            os.remove(fn + '.out')
+        return results
+
+    def run(self, verbose=False):
+        """
+        :return: report dict {'environment': ..., 'results': [...]}
+        """
+        tmp_dir = tempfile.mkdtemp(dir=self.tmp_dir)
+        results = []
+        try:
+            for n_rows in self.rows:
+                for fmt in self.formats:
+                    fn = os.path.join(tmp_dir, str(fmt) + '-' + str(n_rows) + '.csv')
+                    for res in self.run_format(fmt, n_rows, fn):
+                        results.append(res)
+                        if verbose:
+                            print(CSVSpatialBenchmark.result_to_str(res))
+                    os.remove(fn)
+        finally:
+            shutil.rmtree(tmp_dir)
+        return {'environment': CSVSpatialBenchmark.environment(), 'results': results}
+
+    @staticmethod
+    def result_to_str(res):
+        text = '%-22s %-16s rows: %9d  %9.4f s' % (res['format'], res['benchmark'], res['rows'], res['seconds'])
+        if res['rows_per_s'] is not None:
+            text += '  %12.0f rows/s' % res['rows_per_s']
+        if res['mb_per_s'] is not None:
+            text += '  %8.2f MB/s' % res['mb_per_s']
+        if res['peak_memory_bytes'] is not None:
+            text += '  peak: %8.2f MB' % (res['peak_memory_bytes'] * 1e-6)
+        return text
+
+    @staticmethod
+    def save(report, fn):
+        with open(fn, "w") as file:
+            json.dump(report, file, indent=1)
+
+    @staticmethod
+    def load(fn):
+        with open(fn, "r") as file:
+            return json.load(file)
+
+    @staticmethod
+    def compare(baseline, report):
+        """
+        :return: list of (format, benchmark, rows, speedup) for the results in both reports; speedup > 1 is faster
+        """
+        base = dict(((r['format'], r['benchmark'], r['rows']), r['seconds']) for r in baseline['results'])
+        comparison = []
+        for r in report['results']:
+            key = (r['format'], r['benchmark'], r['rows'])
+            if key in base and r['seconds'] > 0:
+                comparison.append(key + (base[key] / r['seconds'],))
+        return comparison
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks reading and writing spatial CSV files.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000], help='rows per file, e.g. 10000 1000000')
+    parser.add_argument('--formats', nargs='+', default=None, choices=CSVSpatialFormatType.list()[:-1],
+                        help='formats to benchmark (default: all)')
+    parser.add_argument('--benchmarks', nargs='+', default=None, choices=CSVSpatialBenchmark.BENCHMARKS,
+                        help='benchmarks to run (default: all)')
+    parser.add_argument('--output', default=None, help='JSON report file')
+    parser.add_argument('--compare', default=None, help='JSON report of a previous run to compare with')
+    parser.add_argument('--repeat', type=int, default=3, help='timing runs per benchmark, the best is reported')
+    parser.add_argument('--no-memory', action='store_true', help='skip the peak memory (tracemalloc) runs')
+    parser.add_argument('--tmp-dir', default=None, help='directory for the synthesized files')
+    args = parser.parse_args()
+
+    bench = CSVSpatialBenchmark(rows=args.rows, formats=args.formats, benchmarks=args.benchmarks,
+                                trace_memory=not args.no_memory, repeat=args.repeat, tmp_dir=args.tmp_dir)
+    report = bench.run(verbose=True)
+    if args.output:
+        CSVSpatialBenchmark.save(report, args.output)
+        print("written: " + str(args.output))
+    if args.compare:
+        for fmt, name, rows, speedup in CSVSpatialBenchmark.compare(CSVSpatialBenchmark.load(args.compare), report):
+            print('%-22s %-16s rows: %9d  speedup: %6.2f' % (fmt, name, rows, speedup))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
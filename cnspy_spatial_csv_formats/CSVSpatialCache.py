@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import json
+import glob
+import struct
+import hashlib
+import numpy as np
+from cnspy_spatial_csv_formats.CSVSpatialFormat import CSVSpatialFormat
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType
+from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
+from cnspy_spatial_csv_formats.ErrorRepresentationType import ErrorRepresentationType
+
+
+# Binary sidecar cache for parsed CSV files (see CSVSpatialFormat.read_array()):
+#  - a sidecar is named <hash(path)>-<hash(size, mtime)>.npsc (or the hash of the content), thus a modified CSV file
+#    gets a new sidecar and the outdated one of the same path is removed.
+#  - layout: MAGIC | uint32 length of the JSON header | JSON header | padding | float64 block (C-order)
+#    the JSON header holds the CSVSpatialFormatType, EstimationErrorType, ErrorRepresentationType and the shape.
+#  - subsequent loads return a read-only numpy.memmap of the block, i.e. no parsing and no copy.
+#  - the total size of the cache directory is bounded by max_bytes, least recently used sidecars are evicted first.
+class CSVSpatialCache:
+    MAGIC = b'CNSPYSC1'
+    EXT = '.npsc'
+    ALIGN = 64
+    cache_dir = None
+    max_bytes = 0
+    use_content_hash = False
+
+    def __init__(self, cache_dir=None, max_bytes=2**30, use_content_hash=False):
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.expanduser('~'), '.cache', 'cnspy_spatial_csv_formats')
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = int(max_bytes)
+        self.use_content_hash = use_content_hash
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def path_key(fn):
+        return hashlib.sha1(os.path.abspath(fn).encode('utf-8')).hexdigest()[0:16]
+
+    def state_key(self, fn):
+        h = hashlib.sha1()
+        if self.use_content_hash:
+            with open(fn, "rb") as file:
+                for block in iter(lambda: file.read(2**20), b''):
+                    h.update(block)
+        else:
+            stat = os.stat(fn)
+            h.update(str((stat.st_size, stat.st_mtime_ns)).encode('utf-8'))
+        return h.hexdigest()[0:16]
+
+    def sidecar_fn(self, fn):
+        return os.path.join(self.cache_dir,
+                            CSVSpatialCache.path_key(fn) + '-' + self.state_key(fn) + CSVSpatialCache.EXT)
+
+    def load(self, fn):
+        """
+        returns (CSVSpatialFormat, data) of a CSV file; data is a read-only numpy.memmap of the cached block.
+        On a cache miss the file is parsed once and its sidecar is written. (CSVSpatialFormat(), None) if the file
+        is not found or unknown.
+        """
+        if not os.path.exists(fn):
+            print("CSVSpatialCache.load(): File not found!\n\t[" + str(fn) + "]")
+            return CSVSpatialFormat(), None
+
+        sidecar_fn = self.sidecar_fn(fn)
+        if not os.path.exists(sidecar_fn):
+            fmt, data = CSVSpatialFormat.read_array(fn)
+            if data is None:
+                return fmt, None
+            self.invalidate(fn)
+            CSVSpatialCache.write_sidecar(sidecar_fn, fmt, data, source=os.path.abspath(fn))
+            self.evict(keep=sidecar_fn)
+        else:
+            # mark as recently used for the eviction
+            os.utime(sidecar_fn, None)
+        return CSVSpatialCache.open_sidecar(sidecar_fn)
+
+    def invalidate(self, fn):
+        # removes all sidecars of the given CSV file
+        for sidecar_fn in glob.glob(os.path.join(self.cache_dir, CSVSpatialCache.path_key(fn) + '-*' +
+                                                 CSVSpatialCache.EXT)):
+            CSVSpatialCache.remove(sidecar_fn)
+
+    def size(self):
+        return sum(os.path.getsize(fn) for fn in self.list_sidecars())
+
+    def list_sidecars(self):
+        return glob.glob(os.path.join(self.cache_dir, '*' + CSVSpatialCache.EXT))
+
+    def evict(self, keep=None):
+        # removes the least recently used sidecars until the cache directory is within max_bytes
+        entries = []
+        for fn in self.list_sidecars():
+            stat = os.stat(fn)
+            entries.append((stat.st_mtime_ns, stat.st_size, fn))
+        total = sum(e[1] for e in entries)
+        for _, size, fn in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if fn == keep:
+                continue
+            CSVSpatialCache.remove(fn)
+            total -= size
+
+    def clear(self):
+        for fn in self.list_sidecars():
+            CSVSpatialCache.remove(fn)
+
+    @staticmethod
+    def remove(fn):
+        try:
+            os.remove(fn)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def write_sidecar(fn, fmt, data, source=''):
+        assert (isinstance(fmt, CSVSpatialFormat))
+        data = np.ascontiguousarray(data, dtype=np.float64)
+        meta = json.dumps({'fmt': str(fmt.type),
+                           'est_err_type': str(fmt.estimation_error_type),
+                           'err_representation': str(fmt.rotation_error_representation),
+                           'shape': list(data.shape),
+                           'source': source}).encode('utf-8')
+        offset = len(CSVSpatialCache.MAGIC) + 4 + len(meta)
+        padding = (-offset) % CSVSpatialCache.ALIGN
+
+        # write to a temporary file first, concurrent readers never see a partial sidecar
+        tmp_fn = fn + '.' + str(os.getpid()) + '.tmp'
+        with open(tmp_fn, "wb") as file:
+            file.write(CSVSpatialCache.MAGIC)
+            file.write(struct.pack('<I', len(meta)))
+            file.write(meta)
+            file.write(b' ' * padding)
+            data.tofile(file)
+        os.replace(tmp_fn, fn)
+
+    @staticmethod
+    def open_sidecar(fn):
+        with open(fn, "rb") as file:
+            magic = file.read(len(CSVSpatialCache.MAGIC))
+            if magic != CSVSpatialCache.MAGIC:
+                print("CSVSpatialCache.open_sidecar(): invalid sidecar!\n\t[" + str(fn) + "]")
+                return CSVSpatialFormat(), None
+            meta_len = struct.unpack('<I', file.read(4))[0]
+            meta = json.loads(file.read(meta_len).decode('utf-8'))
+        offset = len(CSVSpatialCache.MAGIC) + 4 + meta_len
+        offset += (-offset) % CSVSpatialCache.ALIGN
+
+        fmt = CSVSpatialFormat(CSVSpatialFormatType(meta['fmt']),
+                               est_err_type=EstimationErrorType(meta['est_err_type']),
+                               err_rep_type=ErrorRepresentationType(meta['err_representation']))
+        shape = tuple(meta['shape'])
+        if shape[0] == 0:
+            # an empty region cannot be mapped
+            return fmt, np.empty(shape, dtype=np.float64)
+        return fmt, np.memmap(fn, dtype=np.float64, mode='r', offset=offset, shape=shape)
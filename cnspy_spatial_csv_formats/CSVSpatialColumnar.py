@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import json
+import argparse
+import numpy as np
+from cnspy_spatial_csv_formats.CSVSpatialFormat import CSVSpatialFormat
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType
+from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
+from cnspy_spatial_csv_formats.ErrorRepresentationType import ErrorRepresentationType
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+    import pyarrow.feather
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+# Columnar binary files (Parquet, Feather/Arrow IPC or NumPy .npz) holding the columns of a CSVSpatialFormat:
+#  - one column per entry of get_format(); the typed columns are stored as int8 codes, all others as float64.
+#  - the format, estimation error type and error representation type are stored as file-level metadata, thus
+#    CSVSpatialFormat.identify_format() works on these files as well.
+#  - load() supports column projection: only the requested columns are read from disk.
+#  - Parquet and Feather require pyarrow; without it, save() falls back to .npz.
+class CSVSpatialColumnar:
+    META_KEY = 'cnspy_spatial_csv_format'
+    BACKENDS = {'.parquet': 'parquet', '.feather': 'feather', '.arrow': 'feather', '.npz': 'npz'}
+    TYPED_COLUMNS = ['est_err_type', 'err_representation']
+
+    @staticmethod
+    def backend(fn):
+        return CSVSpatialColumnar.BACKENDS.get(os.path.splitext(str(fn))[1].lower())
+
+    @staticmethod
+    def is_columnar(fn):
+        return CSVSpatialColumnar.backend(fn) is not None
+
+    @staticmethod
+    def column_dtype(name):
+        return np.int8 if name in CSVSpatialColumnar.TYPED_COLUMNS else np.float64
+
+    @staticmethod
+    def save(fn, fmt, data):
+        """
+        stores a block with the columns of fmt.get_format() (see CSVSpatialArray).
+
+        :return: the file name written, which has the extension '.npz' if pyarrow is required but not installed
+        """
+        assert (isinstance(fmt, CSVSpatialFormat))
+        columns = fmt.get_format()
+        assert (data.ndim == 2 and data.shape[1] == len(columns))
+        meta = json.dumps({'fmt': str(fmt.type),
+                           'est_err_type': str(fmt.estimation_error_type),
+                           'err_representation': str(fmt.rotation_error_representation)})
+        backend = CSVSpatialColumnar.backend(fn)
+        if backend is None:
+            backend = 'npz'
+        if backend != 'npz' and not HAS_PYARROW:
+            fn = os.path.splitext(fn)[0] + '.npz'
+            backend = 'npz'
+            print("CSVSpatialColumnar.save(): pyarrow not installed, using NumPy instead!\n\t[" + str(fn) + "]")
+
+        cols = dict((name, data[:, i].astype(CSVSpatialColumnar.column_dtype(name)))
+                    for i, name in enumerate(columns))
+        if backend == 'npz':
+            cols['__' + CSVSpatialColumnar.META_KEY + '__'] = np.array(meta)
+            with open(fn, "wb") as file:
+                np.savez(file, **cols)
+        else:
+            table = pyarrow.table(cols).replace_schema_metadata({CSVSpatialColumnar.META_KEY: meta})
+            if backend == 'parquet':
+                pyarrow.parquet.write_table(table, fn)
+            else:
+                pyarrow.feather.write_feather(table, fn)
+        return fn
+
+    @staticmethod
+    def read_metadata(fn):
+        # returns the CSVSpatialFormat stored in the file, without reading any column
+        if not os.path.exists(fn):
+            print("CSVSpatialColumnar.read_metadata(): File not found!\n\t[" + str(fn) + "]")
+            return CSVSpatialFormat()
+        backend = CSVSpatialColumnar.backend(fn)
+        meta = None
+        if backend == 'npz':
+            with np.load(fn, allow_pickle=False) as npz:
+                key = '__' + CSVSpatialColumnar.META_KEY + '__'
+                if key in npz.files:
+                    meta = str(npz[key])
+        elif backend is not None and HAS_PYARROW:
+            if backend == 'parquet':
+                schema = pyarrow.parquet.read_schema(fn)
+            else:
+                with pyarrow.memory_map(fn) as source:
+                    schema = pyarrow.ipc.open_file(source).schema
+            if schema.metadata is not None:
+                meta = schema.metadata.get(CSVSpatialColumnar.META_KEY.encode('utf-8'))
+        if meta is None:
+            print("CSVSpatialColumnar.read_metadata(): no format metadata!\n\t[" + str(fn) + "]")
+            return CSVSpatialFormat()
+        meta = json.loads(meta)
+        return CSVSpatialFormat(CSVSpatialFormatType(meta['fmt']),
+                                est_err_type=EstimationErrorType(meta['est_err_type']),
+                                err_rep_type=ErrorRepresentationType(meta['err_representation']))
+
+    @staticmethod
+    def load(fn, columns=None):
+        """
+        :param columns: list of column names to load (e.g. ['t', 'tx', 'ty', 'tz']), None for all of get_format()
+        :return: (CSVSpatialFormat, float64 block of shape (N, len(columns))) or (CSVSpatialFormat(), None)
+        """
+        fmt = CSVSpatialColumnar.read_metadata(fn)
+        if fmt.type == CSVSpatialFormatType.none:
+            return fmt, None
+        if columns is None:
+            columns = fmt.get_format()
+        unknown = [c for c in columns if c not in fmt.get_format()]
+        if unknown:
+            print("CSVSpatialColumnar.load(): unknown columns " + str(unknown) + "!\n\t[" + str(fn) + "]")
+            return fmt, None
+
+        backend = CSVSpatialColumnar.backend(fn)
+        if backend == 'npz':
+            with np.load(fn, allow_pickle=False) as npz:
+                cols = [npz[c] for c in columns]
+        else:
+            if backend == 'parquet':
+                table = pyarrow.parquet.read_table(fn, columns=columns)
+            else:
+                table = pyarrow.feather.read_table(fn, columns=columns)
+            cols = [table.column(c).to_numpy() for c in columns]
+
+        n_rows = len(cols[0]) if cols else 0
+        data = np.empty((n_rows, len(columns)), dtype=np.float64)
+        for i, col in enumerate(cols):
+            data[:, i] = col
+        return fmt, data
+
+    @staticmethod
+    def export(fn_csv, fn_out):
+        # converts a CSV file; returns the file name written or None
+        fmt, data = CSVSpatialFormat.read_array(fn_csv)
+        if data is None:
+            return None
+        return CSVSpatialColumnar.save(fn_out, fmt, data)
+
+    @staticmethod
+    def to_csv(fn_in, fn_csv, precision=None):
+        fmt, data = CSVSpatialColumnar.load(fn_in)
+        if data is None:
+            return None
+        fmt.write_array(fn_csv, data, precision=precision)
+        return fn_csv
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Converts spatial CSV files to columnar binary files (.parquet, .feather, .npz) and back.')
+    parser.add_argument('input', help='input file (.csv, .parquet, .feather, .arrow or .npz)')
+    parser.add_argument('output', help='output file; the extension defines the format')
+    parser.add_argument('--precision', type=int, default=None,
+                        help='significant digits when writing CSV files (default: exact)')
+    args = parser.parse_args()
+
+    if CSVSpatialColumnar.is_columnar(args.input):
+        fn = CSVSpatialColumnar.to_csv(args.input, args.output, precision=args.precision)
+    else:
+        fn = CSVSpatialColumnar.export(args.input, args.output)
+    if fn is None:
+        print("conversion failed!")
+        return 1
+    print("written: " + str(fn))
+    return 0
+
+
+if __name__ == "__main__":
+    main()
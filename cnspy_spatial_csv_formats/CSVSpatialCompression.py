@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import io
+import os
+
+
+# Transparent, streaming decompression of spatial CSV files:
+#  - gzip (.gz), xz (.xz) and zstd (.zst) compressed files are recognized by their magic bytes (the extension is only
+#    used if the file cannot be read); zstd requires the optional 'zstandard' package.
+#  - open_text() returns a text file object in place of open(fn, "r"); the file is decompressed block by block while
+#    it is read, buffer_size bounds the decompressed bytes held at a time. Identifying the format thus only
+#    decompresses the first block.
+#  - the codec modules are imported on first use; the module itself depends on the standard library only.
+class CSVSpatialCompression:
+    MAGIC = [(b'\x1f\x8b', 'gzip'), (b'\xfd7zXZ\x00', 'xz'), (b'\x28\xb5\x2f\xfd', 'zstd')]
+    EXTENSIONS = {'.gz': 'gzip', '.gzip': 'gzip', '.xz': 'xz', '.zst': 'zstd', '.zstd': 'zstd'}
+    BUFFER_SIZE = 1 << 20
+    SNIFF_BUFFER_SIZE = 1 << 16   # buffer size for reading the header only
+
+    @staticmethod
+    def codec(fn):
+        """
+        :return: 'gzip', 'xz', 'zstd' or None for an uncompressed file
+        """
+        try:
+            with open(fn, "rb") as file:
+                magic = file.read(6)
+        except OSError:
+            return CSVSpatialCompression.EXTENSIONS.get(os.path.splitext(str(fn))[1].lower())
+        for prefix, name in CSVSpatialCompression.MAGIC:
+            if magic.startswith(prefix):
+                return name
+        return None
+
+    @staticmethod
+    def is_compressed(fn):
+        return CSVSpatialCompression.codec(fn) is not None
+
+    @staticmethod
+    def strip_extension(fn):
+        # 'traj.csv.gz' -> 'traj.csv'
+        base, ext = os.path.splitext(str(fn))
+        return base if ext.lower() in CSVSpatialCompression.EXTENSIONS else str(fn)
+
+    @staticmethod
+    def open_binary(fn, codec=None, buffer_size=BUFFER_SIZE):
+        """
+        :return: buffered binary file object yielding the decompressed content of fn
+        """
+        if codec is None:
+            codec = CSVSpatialCompression.codec(fn)
+        if codec is None:
+            return open(fn, "rb", buffering=buffer_size)
+        if codec == 'gzip':
+            import gzip
+            stream = gzip.GzipFile(fn, "rb")
+        elif codec == 'xz':
+            import lzma
+            stream = lzma.LZMAFile(fn, "rb")
+        elif codec == 'zstd':
+            try:
+                import zstandard
+            except ImportError:
+                raise ImportError("CSVSpatialCompression: reading zstd files requires the 'zstandard' package!\n\t[" +
+                                  str(fn) + "]")
+            stream = zstandard.ZstdDecompressor().stream_reader(open(fn, "rb"), read_size=buffer_size, closefd=True)
+        else:
+            raise ValueError("CSVSpatialCompression: unknown codec [" + str(codec) + "]")
+        return io.BufferedReader(stream, buffer_size=buffer_size)
+
+    @staticmethod
+    def open_text(fn, buffer_size=BUFFER_SIZE):
+        """
+        :return: text file object of fn, equivalent to open(fn, "r") for uncompressed files
+        """
+        codec = CSVSpatialCompression.codec(fn)
+        if codec is None:
+            return open(fn, "r")
+        return io.TextIOWrapper(CSVSpatialCompression.open_binary(fn, codec=codec, buffer_size=buffer_size))
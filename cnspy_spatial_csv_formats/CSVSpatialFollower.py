@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import time
+import asyncio
+from cnspy_spatial_csv_formats.CSVSpatialArray import CSVSpatialArray
+
+
+# Follows a CSV file that is appended to while it is read (e.g. the log of a running estimator):
+#  - the byte offset behind the last complete line is remembered; each poll() reads and parses only the bytes
+#    appended since, thus the cost per new row does not depend on the length of the file.
+#  - a poll reads at most max_read bytes (but at least one complete line): the rows of a long file, e.g. on the first
+#    poll, are delivered over several polls.
+#  - a partially written last line (no trailing newline yet) is left in the file and parsed by a later poll().
+#  - the header is read once it is complete; if the file shrinks (truncated/rewritten), it is followed from the start.
+#  - an unknown header raises a ValueError once; it is remembered and further polls return None without reading the
+#    file again, until the file is replaced (inode) or rewritten with another header.
+#  - new rows are delivered as blocks (see CSVSpatialArray), by poll(), to a callback by follow(), or by
+#    'async for block in follower'; the async iterator polls in an executor (None: the default thread pool of the
+#    event loop).
+class CSVSpatialFollower:
+    fn = None
+    layout = None         # CSVSpatialArray of the header, None until the header line is complete
+    offset = 0            # byte offset behind the last complete line
+    poll_interval = 0.5   # [s] between polls of follow() and the async iterator
+    max_read = 2**22      # [bytes] read per poll
+    executor = None
+    stopped = False
+    bad_header = None     # (inode, size, header line) of the file with an unknown header
+
+    def __init__(self, fn, poll_interval=0.5, max_read=2**22, executor=None):
+        self.fn = fn
+        self.poll_interval = poll_interval
+        self.max_read = max(1, int(max_read))
+        self.executor = executor
+        self.layout = None
+        self.offset = 0
+        self.stopped = False
+        self.bad_header = None
+
+    def reset(self):
+        self.layout = None
+        self.offset = 0
+
+    def read_complete_lines(self):
+        # bytes of the complete lines appended since the last call (at most max_read, unless a line is longer), or b''
+        if not os.path.exists(self.fn):
+            return b''
+        size = os.path.getsize(self.fn)
+        if size < self.offset:
+            print("CSVSpatialFollower: file was truncated, following from the start!\n\t[" + str(self.fn) + "]")
+            self.reset()
+        if size == self.offset:
+            return b''
+        with open(self.fn, "rb") as file:
+            file.seek(self.offset)
+            buf = file.read(min(size - self.offset, self.max_read))
+            while b'\n' not in buf and len(buf) < size - self.offset:
+                buf += file.read(min(size - self.offset - len(buf), self.max_read))
+        end = buf.rfind(b'\n') + 1
+        self.offset += end
+        return buf[:end]
+
+    def header_changed(self):
+        # False while the file with the unknown header is only appended to
+        try:
+            stat = os.stat(self.fn)
+        except FileNotFoundError:
+            return False
+        inode, size, header = self.bad_header
+        if (stat.st_ino, stat.st_size) == (inode, size):
+            return False
+        with open(self.fn, "rb") as file:
+            line = file.readline()
+        if stat.st_ino == inode and line.endswith(b'\n') and line.decode('utf-8').rstrip("\n\r") == header:
+            self.bad_header = (inode, stat.st_size, header)
+            return False
+        return True
+
+    def poll(self):
+        """
+        :return: block of the rows appended since the last poll, or None if there are none
+        :raises ValueError: if the header is unknown; only once per header, see bad_header
+        """
+        if self.bad_header is not None and not self.header_changed():
+            return None
+        buf = self.read_complete_lines()
+        if not buf:
+            return None
+        lines = buf.decode('utf-8').splitlines()
+        if self.layout is None:
+            header = lines.pop(0)
+            self.layout = CSVSpatialArray.from_header(header)
+            if self.layout is None:
+                self.offset = 0
+                known = self.bad_header is not None and self.bad_header[2] == header
+                stat = os.stat(self.fn)
+                self.bad_header = (stat.st_ino, stat.st_size, header)
+                if known:
+                    return None
+                raise ValueError("CSVSpatialFollower: Header unknown!\n\t[" + str(header) + "]")
+            self.bad_header = None
+        lines = [line for line in lines if line.strip()]
+        if not lines:
+            return None
+        return self.layout.parse(lines)
+
+    def stop(self):
+        self.stopped = True
+
+    def follow(self, callback, timeout=None):
+        """
+        calls callback(block) for every batch of new rows until stop() is called or timeout [s] has passed.
+        """
+        self.stopped = False
+        t_end = None if timeout is None else time.monotonic() + timeout
+        while not self.stopped:
+            block = self.poll()
+            if block is not None:
+                callback(block)
+            if t_end is not None and time.monotonic() >= t_end:
+                break
+            if block is None:
+                time.sleep(self.poll_interval)
+
+    def __aiter__(self):
+        self.stopped = False
+        return self
+
+    async def __anext__(self):
+        loop = asyncio.get_running_loop()
+        while not self.stopped:
+            block = await loop.run_in_executor(self.executor, self.poll)
+            if block is not None:
+                return block
+            await asyncio.sleep(self.poll_interval)
+        raise StopAsyncIteration
@@ -24,7 +24,11 @@ from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
 from cnspy_spatial_csv_formats.ErrorRepresentationType import ErrorRepresentationType
 
 
+# HINT: the readers and writers (CSVSpatialArray, CSVSpatialParser, ...) depend on NumPy; they are imported in the
+# methods using them, thus identify_format() of a CSV file imports neither NumPy nor the PoseStructs.
 class CSVSpatialFormat:
+    COLUMNAR_EXTENSIONS = ('.parquet', '.feather', '.arrow', '.npz')  # see CSVSpatialColumnar.BACKENDS
+
     type = CSVSpatialFormatType.none
     estimation_error_type = EstimationErrorType.none
     rotation_error_representation = ErrorRepresentationType.none
@@ -38,12 +42,92 @@ class CSVSpatialFormat:
             self.rotation_error_representation = err_rep_type
 
     def get_header(self):
-        return CSVSpatialFormatType.get_header(self.type, self.estimation_error_type, self.rotation_error_representation)
+        return CSVSpatialFormatType.get_header(self.type)
 
     def get_format(self):
         return CSVSpatialFormatType.get_format(self.type)
 
+    def get_parser(self, header_parts=None, delimiter=','):
+        # line parser for this format; pass the file's header_parts if its columns might be in a different order and
+        # delimiter=None for space-separated files (see CSVSpatialFormatType.delimiter() of the header line)
+        from cnspy_spatial_csv_formats.CSVSpatialParser import CSVSpatialParser
+        return CSVSpatialParser(self.type, header_parts=header_parts, delimiter=delimiter)
+
     @staticmethod
     def identify_format(fn):
-        fmt, est_err, err_rep_type = CSVSpatialFormatType.identify_format(fn=fn)
-        return CSVSpatialFormat(fmt, est_err_type=est_err, err_rep_type=err_rep_type)
\ No newline at end of file
+        # columnar binary files carry the format as metadata
+        if os.path.splitext(str(fn))[1].lower() in CSVSpatialFormat.COLUMNAR_EXTENSIONS:
+            from cnspy_spatial_csv_formats.CSVSpatialColumnar import CSVSpatialColumnar
+            return CSVSpatialColumnar.read_metadata(fn)
+
+        fmt, est_err, err_rep_type = CSVSpatialFormatType.identify_format_with_types(fn=fn)
+        return CSVSpatialFormat(fmt, est_err_type=est_err, err_rep_type=err_rep_type)
+
+    @staticmethod
+    def identify_formats(paths):
+        return [CSVSpatialFormat(fmt, est_err_type=est_err, err_rep_type=err_rep_type)
+                for fmt, est_err, err_rep_type in CSVSpatialFormatType.identify_formats(paths)]
+
+    def write_array(self, fn, data, precision=None):
+        # writes a block with the columns of get_format(), a PoseStructsBatch or a list of PoseStructs
+        from cnspy_spatial_csv_formats.CSVSpatialWriter import CSVSpatialWriter
+        CSVSpatialWriter(self, precision=precision).write(fn, data)
+
+    @staticmethod
+    def from_array(fmt_type, data):
+        # the typed columns of the first row define the estimation error and error representation type
+        fmt = CSVSpatialFormat(fmt_type)
+        columns = CSVSpatialFormatType.get_format(fmt_type)
+        if data is not None and len(data):
+            if 'est_err_type' in columns:
+                fmt.estimation_error_type = EstimationErrorType.from_code(data[0, columns.index('est_err_type')])
+            if 'err_representation' in columns:
+                fmt.rotation_error_representation = \
+                    ErrorRepresentationType.from_code(data[0, columns.index('err_representation')])
+        return fmt
+
+    @staticmethod
+    def read_array(fn, order='C'):
+        # loads the entire file into one float64 block with the columns of get_format() (see CSVSpatialArray)
+        from cnspy_spatial_csv_formats.CSVSpatialArray import CSVSpatialArray
+        layout, data = CSVSpatialArray.read(fn, order=order)
+        if layout is None:
+            return CSVSpatialFormat(), None
+        return CSVSpatialFormat.from_array(layout.fmt, data), data
+
+    @staticmethod
+    def read_array_parallel(fn, max_workers=None):
+        # like read_array(), but byte ranges of the file are parsed by max_workers processes (see CSVSpatialSplitReader)
+        from cnspy_spatial_csv_formats.CSVSpatialSplitReader import CSVSpatialSplitReader
+        layout, data = CSVSpatialSplitReader(max_workers=max_workers).read(fn)
+        if layout is None:
+            return CSVSpatialFormat(), None
+        return CSVSpatialFormat.from_array(layout.fmt, data), data
+
+    @staticmethod
+    def iter_chunks(fn, chunk_size=65536, t_min=None, t_max=None, is_sorted=False):
+        # streams the file as consecutive blocks of at most chunk_size rows (see CSVSpatialArray.iter_chunks)
+        from cnspy_spatial_csv_formats.CSVSpatialArray import CSVSpatialArray
+        return CSVSpatialArray.iter_chunks(fn, chunk_size=chunk_size, t_min=t_min, t_max=t_max, is_sorted=is_sorted)
+
+    @staticmethod
+    def validate(fn, chunk_size=65536):
+        # checks timestamps, quaternions, covariances and NaNs chunk-wise (see CSVSpatialValidator)
+        from cnspy_spatial_csv_formats.CSVSpatialValidator import CSVSpatialValidator
+        return CSVSpatialValidator.validate_file(fn, chunk_size=chunk_size)
+
+    @staticmethod
+    def read_time_range(fn, t_min, t_max, stride=1024):
+        # rows with t_min <= t <= t_max of a file sorted by time, using (and creating) its CSVSpatialTimeIndex
+        from cnspy_spatial_csv_formats.CSVSpatialTimeIndex import CSVSpatialTimeIndex
+        index = CSVSpatialTimeIndex.load(fn, stride=stride)
+        if index is None:
+            return CSVSpatialFormat(), None
+        data = index.query(t_min, t_max)
+        return CSVSpatialFormat.from_array(index.layout.fmt, data), data
+
+    @staticmethod
+    def follow(fn, poll_interval=0.5, max_read=2**22, executor=None):
+        # follower of a growing file, delivering only the newly appended rows (see CSVSpatialFollower)
+        from cnspy_spatial_csv_formats.CSVSpatialFollower import CSVSpatialFollower
+        return CSVSpatialFollower(fn, poll_interval=poll_interval, max_read=max_read, executor=executor)
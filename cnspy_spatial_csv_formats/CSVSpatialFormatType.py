@@ -18,10 +18,12 @@
 #
 ########################################################################################################################
 import os
+import time
 from enum import Enum
-import cnspy_spatial_csv_formats.PoseStructs as ps
 from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
 from cnspy_spatial_csv_formats.ErrorRepresentationType import ErrorRepresentationType
+from cnspy_spatial_csv_formats.CSVSpatialStats import CSVSpatialStats
+from cnspy_spatial_csv_formats.CSVSpatialCompression import CSVSpatialCompression
 
 # Primary loader for CSV files via Pandas.read_csv():
 #  -  '#' are comments and first line after comment defines variable names!
@@ -140,60 +142,148 @@ class CSVSpatialFormatType(Enum):
 
     @staticmethod
     def parse(line, fmt):
-        elems = line.split(",")
-        if str(fmt) == 'Timestamp' or len(elems) == 1:
-            return ps.sTimestamp(vec=[float(x) for x in elems[0:1]])
-        elif str(fmt) == 'TUM' or str(fmt) == 'PoseStamped' or len(elems) == 8:
-            return ps.sTUMPoseStamped(vec=[float(x) for x in elems[0:8]])
-        elif str(fmt) == 'Pose2DStamped' or len(elems) == 4:
-            return ps.Pose2DStamped(vec=[float(x) for x in elems[0:4]])
-        elif str(fmt) == 'PositionStamped' or len(elems) == 4:
-            return ps.sPositionStamped(vec=[float(x) for x in elems[0:4]])
-        elif str(fmt) == 'PosOrientCov' or len(elems) == 13:
-            return ps.sPosOrientCovStamped(vec=[float(x) for x in elems[0:13]])
-        elif str(fmt) == 'PosOrientWithCov' or len(elems) == 20:
-            return ps.sTUMPosOrientWithCovStamped(vec=[float(x) for x in elems[0:20]])
-        elif str(fmt) == 'PosOrientWithCovTyped' or len(elems) == 22:
-            return ps.sTUMPosOrientWithCovStampedTyped(vec=[float(x) for x in elems[0:20]],
-                                                       est_type=elems[20], err_repr=elems[21])
-        elif str(fmt) == 'PoseCov' or len(elems) == 22:
-            return ps.sPoseCovStamped(vec=[float(x) for x in elems[0:22]])
-        elif str(fmt) == 'PoseWithCov' or len(elems) == 29:
-            return ps.sTUMPoseWithCovStamped(vec=[float(x) for x in elems[0:29]])
-        elif str(fmt) == 'PoseWithCovTyped' or len(elems) == 31:
-            return ps.sTUMPoseWithCovStampedTyped(vec=[float(x) for x in elems[0:29]],
-                                                  est_type=elems[29], err_repr=elems[30])
-        else:
+        # per-line parser; for many lines of the same file use a CSVSpatialParser (CSVSpatialFormat.get_parser())
+        elems = line.split(CSVSpatialFormatType.delimiter(line))
+        parse_table, parse_table_typed = get_parse_tables()
+        entry = parse_table.get(str(fmt))
+        if entry is None:
+            entry = parse_table.get(PARSE_TABLE_BY_COLUMNS.get(len(elems)))
+            if entry is None:
+                return None
+        struct_cls, n = entry
+        if struct_cls in parse_table_typed:
+            return struct_cls(vec=[float(x) for x in elems[0:n]], est_type=elems[n], err_repr=elems[n + 1])
+        return struct_cls(vec=[float(x) for x in elems[0:n]])
+
+    @staticmethod
+    def header_signature(header_parts):
+        # canonical, order-insensitive and whitespace-normalized signature of a list of column names;
+        # None if a column name appears twice.
+        names = [h.strip() for h in header_parts]
+        signature = frozenset(names)
+        if len(signature) != len(names):
             return None
+        return signature
+
+    @staticmethod
+    def delimiter(header):
+        # ',' for CSV files, None (whitespace) for space-separated files, e.g. '#t tx ty tz qx qy qz qw' (TUM)
+        return ',' if ',' in str(header) else None
 
     @staticmethod
     def header_to_format_type(header):
-        header.replace(" ", "")
-        header_parts = header.split(',')
-        for fmt in CSVSpatialFormatType.list():
-            format_type = CSVSpatialFormatType(fmt)
-            # h_ = ",".join(CSVSpatialFormatType.get_header(fmt))
-            h_parts = CSVSpatialFormatType.get_header(fmt)
+        header = str(header)
+        signature = CSVSpatialFormatType.header_signature(header.split(CSVSpatialFormatType.delimiter(header)))
+        return HEADER_SIGNATURE_INDEX.get(signature, CSVSpatialFormatType.none)
 
-            if len(header_parts) == len(h_parts):
-                common = set(header_parts) & set(h_parts)
-                if len(common) == len(header_parts):
-                    return format_type
+    @staticmethod
+    def identify_format(fn):
+        fmt, _, _ = CSVSpatialFormatType.identify_format_with_types(fn)
+        return fmt
 
-        return CSVSpatialFormatType.none
+    @staticmethod
+    def identify_format_with_types(fn):
+        """
+        identifies the format by the header of the file; for formats with typed columns, the estimation error type
+        and the error representation type are read from the first data row.
+
+        :return: (CSVSpatialFormatType, EstimationErrorType, ErrorRepresentationType)
+        """
+        stats = CSVSpatialStats.active
+        if stats is None:
+            return CSVSpatialFormatType._identify_format_with_types(fn)
+        t_start = time.perf_counter()
+        result = CSVSpatialFormatType._identify_format_with_types(fn)
+        stats.record(fn, 'identify', time.perf_counter() - t_start, fmt=result[0])
+        return result
 
     @staticmethod
-    def identify_format(fn):
+    def _identify_format_with_types(fn):
+        est_err_type = EstimationErrorType.none
+        err_rep_type = ErrorRepresentationType.none
         if os.path.exists(fn):
             assert(isinstance(fn, str))
-            with open(fn, "r") as file:
+            with CSVSpatialCompression.open_text(fn, buffer_size=CSVSpatialCompression.SNIFF_BUFFER_SIZE) as file:
                 header = str(file.readline()).rstrip("\n\r")
                 fmt = CSVSpatialFormatType.header_to_format_type(header)
                 if fmt == CSVSpatialFormatType.none:
                     print("CSVSpatialFormatType.identify_format(): Header unknown!\n\t[" + str(header) + "]")
-                return fmt
+                    return fmt, est_err_type, err_rep_type
+
+                delimiter = CSVSpatialFormatType.delimiter(header)
+                header_parts = [h.strip() for h in header.split(delimiter)]
+                if 'est_err_type' in header_parts or 'err_representation' in header_parts:
+                    elems = [e.strip() for e in file.readline().split(delimiter)]
+                    if len(elems) == len(header_parts):
+                        try:
+                            if 'est_err_type' in header_parts:
+                                est_err_type = EstimationErrorType(elems[header_parts.index('est_err_type')])
+                            if 'err_representation' in header_parts:
+                                err_rep_type = ErrorRepresentationType(elems[header_parts.index('err_representation')])
+                        except ValueError:
+                            print("CSVSpatialFormatType.identify_format(): unknown error type in first row!\n\t[" +
+                                  str(fn) + "]")
+                return fmt, est_err_type, err_rep_type
         else:
             print("CSVSpatialFormatType.identify_format(): File not found!\n\t[" + str(fn) + "]")
-        return CSVSpatialFormatType.none
+        return CSVSpatialFormatType.none, est_err_type, err_rep_type
+
+    @staticmethod
+    def identify_formats(paths):
+        # batch version of identify_format_with_types(): list of (fmt, est_err_type, err_rep_type) per path
+        return [CSVSpatialFormatType.identify_format_with_types(fn) for fn in paths]
+
+
+# Maps the header signature of each format to its type, built once at import. If two formats share the same set of
+# column names, the first one in CSVSpatialFormatType.list() wins (e.g. PoseStamped over TUM, which uses '#t').
+HEADER_SIGNATURE_INDEX = dict()
+for _fmt in CSVSpatialFormatType.list():
+    if _fmt != str(CSVSpatialFormatType.none):
+        HEADER_SIGNATURE_INDEX.setdefault(CSVSpatialFormatType.header_signature(CSVSpatialFormatType.get_header(_fmt)),
+                                          CSVSpatialFormatType(_fmt))
+del _fmt
+
+
+# Format type name -> (PoseStructs class, number of float entries); formats without a PoseStructs class are not
+# listed. Typed structs expect the 'est_err_type' and 'err_representation' entries after the float entries.
+# The tables are built on first use, thus identifying a format does not import the PoseStructs; 'from ... import
+# PARSE_TABLE' still works via the module-level __getattr__().
+def get_parse_tables():
+    global PARSE_TABLE, PARSE_TABLE_TYPED
+    if 'PARSE_TABLE' not in globals():
+        import cnspy_spatial_csv_formats.PoseStructs as ps
+        PARSE_TABLE_TYPED = {ps.sTUMPosOrientWithCovStampedTyped, ps.sTUMPoseWithCovStampedTyped}
+        PARSE_TABLE = {
+            'Timestamp': (ps.sTimestamp, 1),
+            'PoseStamped': (ps.sTUMPoseStamped, 8),
+            'TUM': (ps.sTUMPoseStamped, 8),
+            'Pose2DStamped': (ps.sPose2DStamped, 4),
+            'PositionStamped': (ps.sPositionStamped, 4),
+            'PosOrientCov': (ps.sPosOrientCovStamped, 13),
+            'PosOrientWithCov': (ps.sTUMPosOrientWithCovStamped, 20),
+            'PosOrientWithCovTyped': (ps.sTUMPosOrientWithCovStampedTyped, 20),
+            'PoseCov': (ps.sPoseCovStamped, 22),
+            'PoseWithCov': (ps.sTUMPoseWithCovStamped, 29),
+            'PoseWithCovTyped': (ps.sTUMPoseWithCovStampedTyped, 29),
+        }
+    return PARSE_TABLE, PARSE_TABLE_TYPED
+
+
+def __getattr__(name):
+    if name == 'PARSE_TABLE':
+        return get_parse_tables()[0]
+    elif name == 'PARSE_TABLE_TYPED':
+        return get_parse_tables()[1]
+    raise AttributeError("module " + repr(__name__) + " has no attribute " + repr(name))
 
 
+# Fallback if the format is unknown: number of columns -> format type name (22 columns are taken as
+# PosOrientWithCovTyped, 4 columns as Pose2DStamped, as before).
+PARSE_TABLE_BY_COLUMNS = {1: 'Timestamp',
+                          8: 'PoseStamped',
+                          4: 'Pose2DStamped',
+                          13: 'PosOrientCov',
+                          20: 'PosOrientWithCov',
+                          22: 'PosOrientWithCovTyped',
+                          29: 'PoseWithCov',
+                          31: 'PoseWithCovTyped'}
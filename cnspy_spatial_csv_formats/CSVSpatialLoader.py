@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import glob
+from concurrent.futures import ProcessPoolExecutor
+from cnspy_spatial_csv_formats.CSVSpatialArray import CSVSpatialArray
+from cnspy_spatial_csv_formats.CSVSpatialFormat import CSVSpatialFormat
+from cnspy_spatial_csv_formats.CSVSpatialCompression import CSVSpatialCompression
+
+
+class CSVSpatialLoadResult:
+    fn = None
+    fmt = None      # CSVSpatialFormat
+    data = None     # (N, len(fmt.get_format())) block, see CSVSpatialArray
+    error = None    # None on success, otherwise a message
+
+    def __init__(self, fn, fmt=None, data=None, error=None):
+        self.fn = fn
+        self.fmt = fmt if fmt is not None else CSVSpatialFormat()
+        self.data = data
+        self.error = error
+
+    def ok(self):
+        return self.error is None
+
+
+def load_file(fn):
+    # worker: identifies and parses one file; problems are returned instead of printed or raised
+    try:
+        with CSVSpatialCompression.open_text(fn) as file:
+            header = file.readline()
+            layout = CSVSpatialArray.from_header(header)
+            if layout is None:
+                return CSVSpatialLoadResult(fn, error="Header unknown: [" + str(header).rstrip("\n\r") + "]")
+            data = layout.parse(file)
+        return CSVSpatialLoadResult(fn, fmt=CSVSpatialFormat.from_array(layout.fmt, data), data=data)
+    except Exception as e:
+        return CSVSpatialLoadResult(fn, error=type(e).__name__ + ": " + str(e))
+
+
+# Loads many CSV files in parallel with a process pool:
+#  - max_workers: number of worker processes (None: os.cpu_count()); 0 or 1 loads sequentially in this process.
+#  - chunksize: number of files handed to a worker at once; larger values reduce the inter-process overhead when
+#    loading many small files.
+class CSVSpatialLoader:
+    max_workers = None
+    chunksize = 1
+
+    def __init__(self, max_workers=None, chunksize=1):
+        self.max_workers = max_workers
+        self.chunksize = max(1, int(chunksize))
+
+    @staticmethod
+    def expand(paths, pattern='*.csv'):
+        """
+        :param paths: a directory (all files matching 'pattern'), a glob pattern or a list of these
+        :return: sorted list of unique file names
+        """
+        if isinstance(paths, str):
+            paths = [paths]
+        files = set()
+        for p in paths:
+            if os.path.isdir(p):
+                files.update(glob.glob(os.path.join(p, pattern)))
+            elif glob.has_magic(p):
+                files.update(glob.glob(p))
+            else:
+                files.add(p)
+        return sorted(files)
+
+    def load(self, paths, pattern='*.csv'):
+        """
+        :return: dict file name -> CSVSpatialLoadResult, in the order of CSVSpatialLoader.expand()
+        """
+        files = CSVSpatialLoader.expand(paths, pattern=pattern)
+        if self.max_workers is not None and self.max_workers <= 1:
+            results = map(load_file, files)
+            return dict((r.fn, r) for r in results)
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            results = executor.map(load_file, files, chunksize=self.chunksize)
+            return dict((r.fn, r) for r in results)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType, get_parse_tables
+from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
+from cnspy_spatial_csv_formats.ErrorRepresentationType import ErrorRepresentationType
+
+
+# Per-file line parser, compiled once from the format (and optionally the file header):
+#  - the PoseStructs class, the float entries (slice or column order of the header) and the typed-entry lookups are
+#    resolved in the constructor, thus calling the parser on a line performs no format dispatch at all.
+#  - parser(line) returns the same PoseStructs object as CSVSpatialFormatType.parse(line, fmt).
+#  - delimiter: ',' or None for space-separated files (e.g. TUM files with the header '#t tx ty ...'), see
+#    CSVSpatialFormatType.delimiter() and from_header().
+class CSVSpatialParser:
+    fmt = CSVSpatialFormatType.none
+    struct_cls = None
+    parse = None
+    delimiter = ','
+
+    def __init__(self, fmt, header_parts=None, delimiter=','):
+        assert (isinstance(fmt, CSVSpatialFormatType))
+        entry = get_parse_tables()[0].get(str(fmt))
+        if entry is None:
+            raise ValueError("CSVSpatialParser(): no PoseStructs defined for format [" + str(fmt) + "]")
+        self.fmt = fmt
+        self.delimiter = delimiter
+        self.struct_cls, n = entry
+
+        # file column index of each struct entry; None if the file has the columns in get_header() order
+        perm = None
+        h_parts = CSVSpatialFormatType.get_header(fmt)
+        if header_parts is not None:
+            header_parts = [h.strip() for h in header_parts]
+            perm = [header_parts.index(h) for h in h_parts]
+            if perm == list(range(len(h_parts))):
+                perm = None
+
+        self.parse = self._compile(self.struct_cls, n, perm, delimiter)
+
+    def __call__(self, line):
+        return self.parse(line)
+
+    @staticmethod
+    def from_header(header):
+        """
+        :return: CSVSpatialParser for the lines following the header line of a file, None if the header is unknown
+        """
+        header = str(header).rstrip("\n\r")
+        fmt = CSVSpatialFormatType.header_to_format_type(header)
+        if fmt == CSVSpatialFormatType.none:
+            return None
+        delimiter = CSVSpatialFormatType.delimiter(header)
+        return CSVSpatialParser(fmt, header_parts=header.split(delimiter), delimiter=delimiter)
+
+    @staticmethod
+    def _compile(struct_cls, n, perm, delimiter=','):
+        if struct_cls not in get_parse_tables()[1]:
+            if perm is None:
+                return lambda line: struct_cls(vec=list(map(float, line.split(delimiter, n)[0:n])))
+            float_idx = perm[0:n]
+            return lambda line: struct_cls(vec=[float(e) for e in map(line.split(delimiter).__getitem__, float_idx)])
+
+        # typed entries: resolve each distinct string once, instead of constructing the enum per line
+        est_types = dict((s, EstimationErrorType(s)) for s in EstimationErrorType.list())
+        err_reprs = dict((s, ErrorRepresentationType(s)) for s in ErrorRepresentationType.list())
+
+        def lookup(table, enum_cls, s):
+            val = table.get(s)
+            if val is None:
+                val = enum_cls(s.strip())
+                table[s] = val
+            return val
+
+        if perm is None:
+            perm = list(range(n + 2))
+        float_idx = perm[0:n]
+        est_idx, err_idx = perm[n], perm[n + 1]
+
+        def parse(line):
+            elems = line.split(delimiter)
+            return struct_cls(vec=[float(elems[i]) for i in float_idx],
+                              est_type=lookup(est_types, EstimationErrorType, elems[est_idx]),
+                              err_repr=lookup(err_reprs, ErrorRepresentationType, elems[err_idx]))
+        return parse
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import sys
+import threading
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+from cnspy_spatial_csv_formats.CSVSpatialFormat import CSVSpatialFormat
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType
+from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
+from cnspy_spatial_csv_formats.ErrorRepresentationType import ErrorRepresentationType
+
+
+# Small, picklable description of a block in shared memory; it is passed to the worker processes instead of the data.
+class CSVSpatialSharedDescriptor:
+    name = None                     # name of the shared memory segment
+    shape = None                    # (N, len(columns))
+    columns = None                  # CSVSpatialFormatType.get_format(fmt)
+    fmt = 'none'                    # CSVSpatialFormatType as string
+    est_err_type = 'none'           # EstimationErrorType as string
+    err_representation = 'none'     # ErrorRepresentationType as string
+    source = None                   # file name the block was loaded from, if any
+
+    def __init__(self, name, shape, fmt, est_err_type='none', err_representation='none', source=None):
+        self.name = str(name)
+        self.shape = tuple(int(s) for s in shape)
+        self.fmt = str(fmt)
+        self.columns = CSVSpatialFormatType.get_format(CSVSpatialFormatType(self.fmt))
+        self.est_err_type = str(est_err_type)
+        self.err_representation = str(err_representation)
+        self.source = source
+
+    def get_format(self):
+        return CSVSpatialFormat(CSVSpatialFormatType(self.fmt),
+                                est_err_type=EstimationErrorType(self.est_err_type),
+                                err_rep_type=ErrorRepresentationType(self.err_representation))
+
+    def nbytes(self):
+        return self.shape[0] * self.shape[1] * np.dtype(np.float64).itemsize
+
+    def to_dict(self):
+        return {'name': self.name, 'shape': list(self.shape), 'fmt': self.fmt, 'est_err_type': self.est_err_type,
+                'err_representation': self.err_representation, 'source': self.source}
+
+    @staticmethod
+    def from_dict(d):
+        return CSVSpatialSharedDescriptor(d['name'], d['shape'], d['fmt'], est_err_type=d['est_err_type'],
+                                          err_representation=d['err_representation'], source=d.get('source'))
+
+
+# serializes the replacement of resource_tracker.register in attach_shared_memory()
+ATTACH_LOCK = threading.Lock()
+
+
+def attach_shared_memory(name):
+    # attaching must not register the segment with the resource tracker: before Python 3.13, the tracker of the
+    # attaching process would unlink the segment when that process exits, although the owner still uses it.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    with ATTACH_LOCK:
+        register = resource_tracker.register
+
+        def register_except_attached(res_name, rtype):
+            # registrations of other resources (e.g. by other threads) are passed through
+            if rtype != 'shared_memory' or res_name.lstrip('/') != name.lstrip('/'):
+                register(res_name, rtype)
+
+        resource_tracker.register = register_except_attached
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+# Trajectory block (see CSVSpatialArray) held once in multiprocessing.shared_memory for many worker processes:
+#  - the owner creates it from a file (load()) or a block (create()) and passes its descriptor to the workers, which
+#    attach() to it and get a read-only NumPy view of the block, i.e. no parsing and no copy per worker.
+#  - lifetime: every process calls close() when done (views of 'data' must not be used afterwards); the owner
+#    additionally calls unlink(), which frees the segment once all processes have closed it. Both are done on
+#    leaving a 'with' block. Segments still owned at interpreter exit are removed by the resource tracker.
+class CSVSpatialSharedTrajectory:
+    shm = None          # multiprocessing.shared_memory.SharedMemory
+    descriptor = None   # CSVSpatialSharedDescriptor
+    data = None         # (N, len(columns)) float64 view of the segment, read-only unless owner
+    owner = False
+
+    def __init__(self, shm, descriptor, owner=False):
+        self.shm = shm
+        self.descriptor = descriptor
+        self.owner = owner
+        self.data = np.ndarray(descriptor.shape, dtype=np.float64, buffer=shm.buf)
+        if not owner:
+            self.data.flags.writeable = False
+
+    @staticmethod
+    def create(fmt, data, source=None):
+        """
+        copies a block with the columns of fmt.get_format() into a new shared memory segment.
+        """
+        assert (isinstance(fmt, CSVSpatialFormat))
+        assert (data.ndim == 2 and data.shape[1] == len(fmt.get_format()))
+        descriptor = CSVSpatialSharedDescriptor('', data.shape, fmt.type, est_err_type=fmt.estimation_error_type,
+                                                err_representation=fmt.rotation_error_representation, source=source)
+        # a segment cannot be empty
+        shm = shared_memory.SharedMemory(create=True, size=max(1, descriptor.nbytes()))
+        descriptor.name = shm.name
+        traj = CSVSpatialSharedTrajectory(shm, descriptor, owner=True)
+        traj.data[:] = data
+        return traj
+
+    @staticmethod
+    def load(fn):
+        """
+        parses a CSV file (see CSVSpatialFormat.read_array()) into a new shared memory segment.
+
+        :return: CSVSpatialSharedTrajectory or None if the file is not found or unknown
+        """
+        fmt, data = CSVSpatialFormat.read_array(fn)
+        if data is None:
+            return None
+        return CSVSpatialSharedTrajectory.create(fmt, data, source=str(fn))
+
+    @staticmethod
+    def attach(descriptor):
+        """
+        :param descriptor: CSVSpatialSharedDescriptor (or its to_dict()) of a segment created by another process
+        :return: read-only CSVSpatialSharedTrajectory, or None if the segment does not exist (anymore)
+        """
+        if isinstance(descriptor, dict):
+            descriptor = CSVSpatialSharedDescriptor.from_dict(descriptor)
+        try:
+            shm = attach_shared_memory(descriptor.name)
+        except FileNotFoundError:
+            print("CSVSpatialSharedTrajectory.attach(): shared memory not found!\n\t[" + str(descriptor.name) + "]")
+            return None
+        return CSVSpatialSharedTrajectory(shm, descriptor, owner=False)
+
+    def get_format(self):
+        return self.descriptor.get_format()
+
+    def close(self):
+        # releases the view and detaches this process from the segment
+        if self.shm is None:
+            return
+        self.data = None
+        self.shm.close()
+
+    def unlink(self):
+        # owner only: the segment is freed as soon as all processes have closed it
+        if self.owner and self.shm is not None:
+            self.shm.unlink()
+            self.owner = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        self.unlink()
+        self.shm = None
+        return False
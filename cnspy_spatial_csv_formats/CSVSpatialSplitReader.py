@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import io
+import os
+import math
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from cnspy_spatial_csv_formats.CSVSpatialArray import CSVSpatialArray
+from cnspy_spatial_csv_formats.CSVSpatialStats import CSVSpatialStats
+from cnspy_spatial_csv_formats.CSVSpatialCompression import CSVSpatialCompression
+
+
+def parse_range(args):
+    # worker: parses the rows in the byte range [begin, end) of a file into a block (see CSVSpatialArray)
+    fn, header, begin, end = args
+    layout = CSVSpatialArray.from_header(header)
+    with open(fn, "rb") as file:
+        file.seek(begin)
+        text = file.read(end - begin).decode('utf-8')
+    return layout.parse(io.StringIO(text))
+
+
+# Parses one large CSV file with several processes:
+#  - after the header is read, the data part of the file is partitioned into byte ranges, each boundary is moved
+#    forward to the next line start, so every row belongs to exactly one range.
+#  - each range is parsed by a worker into its own block; the blocks are concatenated in the order of the ranges,
+#    thus the row order (and the typed columns, as codes) equal those of CSVSpatialArray.read().
+#  - ranges hold at most max_range_bytes, a worker holds only its range in memory; files smaller than
+#    min_range_bytes are not split, compressed files (see CSVSpatialCompression) are read sequentially.
+#  - max_workers: number of worker processes (None: os.cpu_count()); 0 or 1 parses the ranges in this process.
+class CSVSpatialSplitReader:
+    max_workers = None
+    min_range_bytes = 1 << 22
+    max_range_bytes = 1 << 26
+
+    def __init__(self, max_workers=None, min_range_bytes=1 << 22, max_range_bytes=1 << 26):
+        self.max_workers = max_workers
+        self.min_range_bytes = max(1, int(min_range_bytes))
+        self.max_range_bytes = max(self.min_range_bytes, int(max_range_bytes))
+
+    def num_workers(self):
+        if self.max_workers is None:
+            return os.cpu_count() or 1
+        return max(1, int(self.max_workers))
+
+    @staticmethod
+    def byte_ranges(file, begin, end, n_ranges):
+        """
+        :param file: file opened in binary mode
+        :return: list of n <= n_ranges non-empty [begin, end) byte ranges covering [begin, end), all starting at a
+                 line start
+        """
+        bounds = [begin]
+        for i in range(1, n_ranges):
+            pos = begin + (end - begin) * i // n_ranges
+            if pos <= bounds[-1]:
+                continue
+            # the range ends after the line containing the byte pos - 1
+            file.seek(pos - 1)
+            file.readline()
+            pos = min(file.tell(), end)
+            if pos > bounds[-1]:
+                bounds.append(pos)
+        if end > bounds[-1]:
+            bounds.append(end)
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def read(self, fn):
+        """
+        :return: (CSVSpatialArray layout, data) or (None, None) if the file or its header is unknown
+        """
+        if not os.path.exists(fn):
+            print("CSVSpatialSplitReader.read(): File not found!\n\t[" + str(fn) + "]")
+            return None, None
+        if CSVSpatialCompression.is_compressed(fn):
+            # a compressed stream has no byte offsets to split at, it is read sequentially
+            return CSVSpatialArray.read(fn)
+
+        t_start = time.perf_counter()
+        with open(fn, "rb") as file:
+            header = file.readline().decode('utf-8')
+            layout = CSVSpatialArray.from_header(header)
+            if layout is None:
+                print("CSVSpatialSplitReader.read(): Header unknown!\n\t[" + str(header).rstrip("\n\r") + "]")
+                return None, None
+            begin = file.tell()
+            end = os.fstat(file.fileno()).st_size
+            n_workers = self.num_workers()
+            n_ranges = min(max(1, (end - begin) // self.min_range_bytes), n_workers)
+            n_ranges = max(n_ranges, int(math.ceil((end - begin) / float(self.max_range_bytes))))
+            ranges = CSVSpatialSplitReader.byte_ranges(file, begin, end, n_ranges)
+
+        tasks = [(fn, header, b, e) for b, e in ranges]
+        if n_workers <= 1 or len(tasks) <= 1:
+            blocks = list(map(parse_range, tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=min(n_workers, len(tasks))) as executor:
+                blocks = list(executor.map(parse_range, tasks))
+
+        data = np.concatenate(blocks) if len(blocks) > 1 else (blocks[0] if blocks else layout.parse([]))
+        stats = CSVSpatialStats.active
+        if stats is not None:
+            # io and parse overlap in the workers; the wall time is reported as 'parse'
+            stats.record(fn, 'parse', time.perf_counter() - t_start, rows=len(data), n_bytes=end, fmt=layout.fmt)
+        return layout, data
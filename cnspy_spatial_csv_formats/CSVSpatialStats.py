@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import json
+import time
+
+
+# Opt-in instrumentation of the load pipeline:
+#  - while a CSVSpatialStats object is enabled (CSVSpatialStats.enable() or 'with CSVSpatialStats() as stats:'),
+#    identify_format, CSVSpatialArray.read/iter_chunks and PoseStructsBatch.to_structs record per file:
+#    the detected format, the seconds per stage, the rows and bytes processed and the rows rejected (blank or
+#    filtered lines).
+#  - stages: 'identify' (header and first row), 'io' (reading lines from disk), 'parse' (splitting and float
+#    conversion, fused in np.loadtxt), 'structs' (PoseStructs construction).
+#  - when disabled (the default), the instrumented functions only check CSVSpatialStats.active for None.
+#  - the loaders of CSVSpatialLoader run in worker processes; their work is not recorded here.
+class CSVSpatialStats:
+    active = None       # the enabled CSVSpatialStats object, None if disabled
+    files = None        # file name -> record
+    callback = None     # optional callable(event dict), called for every recorded stage
+
+    def __init__(self, callback=None):
+        self.files = dict()
+        self.callback = callback
+
+    @staticmethod
+    def enable(callback=None):
+        CSVSpatialStats.active = CSVSpatialStats(callback=callback)
+        return CSVSpatialStats.active
+
+    @staticmethod
+    def disable():
+        stats = CSVSpatialStats.active
+        CSVSpatialStats.active = None
+        return stats
+
+    def __enter__(self):
+        CSVSpatialStats.active = self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        CSVSpatialStats.active = None
+        return False
+
+    def record(self, fn, stage, seconds, rows=0, n_bytes=0, rows_rejected=0, fmt=None):
+        fn = str(fn)
+        rec = self.files.get(fn)
+        if rec is None:
+            rec = {'fn': fn, 'fmt': None, 'stages': dict(), 'rows': 0, 'bytes': 0, 'rows_rejected': 0}
+            self.files[fn] = rec
+        rec['stages'][stage] = rec['stages'].get(stage, 0.0) + seconds
+        rec['rows'] += rows
+        rec['bytes'] += n_bytes
+        rec['rows_rejected'] += rows_rejected
+        if fmt is not None:
+            rec['fmt'] = str(fmt)
+        if self.callback is not None:
+            self.callback({'fn': fn, 'stage': stage, 'seconds': seconds, 'rows': rows, 'bytes': n_bytes,
+                           'rows_rejected': rows_rejected, 'fmt': None if fmt is None else str(fmt)})
+
+    def total(self, stage=None):
+        # seconds of a stage (or of all stages) summed over all files
+        return sum(s for rec in self.files.values() for name, s in rec['stages'].items()
+                   if stage is None or name == stage)
+
+    def reset(self):
+        self.files = dict()
+
+    def to_dict(self):
+        return {'files': list(self.files.values())}
+
+    def to_json(self, indent=1):
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def dump(self, fn):
+        with open(fn, "w") as file:
+            file.write(self.to_json())
+
+
+# Line iterator over a text file that accumulates the time spent reading and the number of lines and bytes; it is
+# passed to np.loadtxt in place of the file object while instrumentation is enabled.
+class TimedLines:
+    file = None
+    seconds = 0.0
+    lines = 0
+    n_bytes = 0
+
+    def __init__(self, file):
+        self.file = file
+        self.seconds = 0.0
+        self.lines = 0
+        self.n_bytes = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        t_start = time.perf_counter()
+        try:
+            line = next(self.file)
+        finally:
+            self.seconds += time.perf_counter() - t_start
+        self.lines += 1
+        self.n_bytes += len(line)
+        return line
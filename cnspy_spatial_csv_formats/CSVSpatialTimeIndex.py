@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import numpy as np
+from cnspy_spatial_csv_formats.CSVSpatialArray import CSVSpatialArray
+from cnspy_spatial_csv_formats.CSVSpatialCompression import CSVSpatialCompression
+
+
+# Sparse index over the timestamps of a CSV file sorted by time:
+#  - every 'stride'-th data row, its timestamp and byte offset are recorded.
+#  - the index is persisted next to the CSV file (<fn>.tidx.npz) together with the size and mtime of the CSV file;
+#    it is rebuilt if they do not match anymore.
+#  - query(t_min, t_max) seeks to the indexed row preceding t_min and parses only the rows up to the indexed row
+#    following t_max, i.e. at most 2*stride rows more than requested.
+class CSVSpatialTimeIndex:
+    EXT = '.tidx.npz'
+    fn = None
+    stride = 1024
+    t = None          # timestamps of the indexed rows
+    offsets = None    # byte offsets of the indexed rows
+    data_end = 0      # byte offset of the end of the file
+    layout = None     # CSVSpatialArray of the file header
+    size = 0
+    mtime_ns = 0
+
+    def __init__(self, fn, stride, t, offsets, data_end, layout, size, mtime_ns):
+        self.fn = fn
+        self.stride = int(stride)
+        self.t = t
+        self.offsets = offsets
+        self.data_end = int(data_end)
+        self.layout = layout
+        self.size = int(size)
+        self.mtime_ns = int(mtime_ns)
+
+    @staticmethod
+    def index_fn(fn):
+        return str(fn) + CSVSpatialTimeIndex.EXT
+
+    @staticmethod
+    def build(fn, stride=1024):
+        if not os.path.exists(fn):
+            print("CSVSpatialTimeIndex.build(): File not found!\n\t[" + str(fn) + "]")
+            return None
+        if CSVSpatialCompression.is_compressed(fn):
+            print("CSVSpatialTimeIndex.build(): compressed files cannot be indexed!\n\t[" + str(fn) + "]")
+            return None
+        stat = os.stat(fn)
+        t = []
+        offsets = []
+        with open(fn, "rb") as file:
+            header = file.readline()
+            layout = CSVSpatialArray.from_header(header.decode('utf-8'))
+            if layout is None:
+                print("CSVSpatialTimeIndex.build(): Header unknown!\n\t[" + str(header).rstrip("\n\r") + "]")
+                return None
+            offset = len(header)
+            row = 0
+            for line in file:
+                if line.strip():
+                    if row % stride == 0:
+                        offsets.append(offset)
+                        t.append(line.decode('utf-8'))
+                    row += 1
+                offset += len(line)
+
+        t = layout.timestamps(t)
+        if np.any(np.diff(t) < 0):
+            print("CSVSpatialTimeIndex.build(): timestamps are not sorted!\n\t[" + str(fn) + "]")
+            return None
+        return CSVSpatialTimeIndex(fn, stride, t, np.array(offsets, dtype=np.int64), offset, layout,
+                                   stat.st_size, stat.st_mtime_ns)
+
+    def save(self):
+        # joined by the delimiter of the file, load() detects it from the header again
+        header = (self.layout.delimiter or ' ').join(self.layout.header_parts)
+        with open(CSVSpatialTimeIndex.index_fn(self.fn), "wb") as file:
+            np.savez(file, t=self.t, offsets=self.offsets, header=np.array(header),
+                     meta=np.array([self.stride, self.data_end, self.size, self.mtime_ns], dtype=np.int64))
+
+    @staticmethod
+    def load(fn, stride=1024, create=True):
+        """
+        loads the persisted index of a CSV file if it is up to date, otherwise it is built (and saved if create).
+        """
+        if not os.path.exists(fn):
+            print("CSVSpatialTimeIndex.load(): File not found!\n\t[" + str(fn) + "]")
+            return None
+        idx_fn = CSVSpatialTimeIndex.index_fn(fn)
+        if os.path.exists(idx_fn):
+            stat = os.stat(fn)
+            with np.load(idx_fn, allow_pickle=False) as npz:
+                idx_stride, data_end, size, mtime_ns = npz['meta'].tolist()
+                if size == stat.st_size and mtime_ns == stat.st_mtime_ns and idx_stride == stride:
+                    layout = CSVSpatialArray.from_header(str(npz['header']))
+                    return CSVSpatialTimeIndex(fn, idx_stride, npz['t'], npz['offsets'], data_end, layout,
+                                               size, mtime_ns)
+
+        index = CSVSpatialTimeIndex.build(fn, stride=stride)
+        if index is not None and create:
+            index.save()
+        return index
+
+    def byte_range(self, t_min, t_max):
+        # [begin, end) byte range holding all rows with t_min <= t <= t_max
+        if len(self.t) == 0:
+            return self.data_end, self.data_end
+        i_begin = max(0, int(np.searchsorted(self.t, t_min, side='left')) - 1)
+        i_end = int(np.searchsorted(self.t, t_max, side='right'))
+        begin = int(self.offsets[i_begin])
+        end = int(self.offsets[i_end]) if i_end < len(self.offsets) else self.data_end
+        return begin, end
+
+    def query(self, t_min, t_max):
+        """
+        :return: block (see CSVSpatialArray) of all rows with t_min <= t <= t_max
+        """
+        begin, end = self.byte_range(t_min, t_max)
+        with open(self.fn, "rb") as file:
+            file.seek(begin)
+            lines = [line for line in file.read(max(0, end - begin)).decode('utf-8').splitlines() if line.strip()]
+        if not lines:
+            return self.layout.parse([])
+        t = self.layout.timestamps(lines)
+        selected = np.flatnonzero((t >= t_min) & (t <= t_max))
+        return self.layout.parse([lines[i] for i in selected])
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import sys
+import argparse
+import numpy as np
+from cnspy_spatial_csv_formats.CSVSpatialArray import CSVSpatialArray
+from cnspy_spatial_csv_formats.CSVSpatialWriter import CSVSpatialWriter
+from cnspy_spatial_csv_formats.CSVSpatialFormat import CSVSpatialFormat
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType
+from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
+from cnspy_spatial_csv_formats.ErrorRepresentationType import ErrorRepresentationType
+
+
+# Converts files between CSVSpatialFormatTypes in chunks of rows, with constant memory:
+#  - the column projection from the source to the target layout is computed once from get_format(); each chunk
+#    (see CSVSpatialArray.iter_chunks()) is projected by a single fancy-index operation and written by a
+#    CSVSpatialWriter. No PoseStructs are constructed.
+#  - columns of the target that are missing in the source can only be the typed columns; they are filled with the
+#    estimation error type and error representation type of the target format. Existing typed columns are copied,
+#    i.e. covariances are not converted; a target requesting other types than the source ('none' keeps them) is
+#    rejected, see CovariancePropagator.convert_block() for the conversion.
+#  - delimiter None: TUM files are written space-separated (header '#t tx ty tz qx qy qz qw'), others with ','.
+class CSVSpatialTranscoder:
+    TYPED_COLUMNS = {'est_err_type': 'estimation_error_type', 'err_representation': 'rotation_error_representation'}
+
+    src_fmt = None      # CSVSpatialFormat
+    dst_fmt = None      # CSVSpatialFormat
+    take = None         # source column index of each target column (0 for filled columns)
+    filled = None       # target column indices that are filled
+    fill = None         # values of the filled columns
+    writer = None       # CSVSpatialWriter
+    chunk_size = 65536
+
+    def __init__(self, src_fmt, dst_fmt, precision=None, delimiter=None, chunk_size=65536):
+        assert (isinstance(src_fmt, CSVSpatialFormat) and isinstance(dst_fmt, CSVSpatialFormat))
+        self.src_fmt = src_fmt
+        self.dst_fmt = dst_fmt
+        self.chunk_size = max(1, int(chunk_size))
+        self.take, self.filled, self.fill = CSVSpatialTranscoder.projection(src_fmt, dst_fmt)
+        if delimiter is None:
+            delimiter = ' ' if dst_fmt.type == CSVSpatialFormatType.TUM else ','
+        self.writer = CSVSpatialWriter(dst_fmt, precision=precision, chunk_size=self.chunk_size, delimiter=delimiter)
+
+    @staticmethod
+    def projection(src_fmt, dst_fmt):
+        """
+        :return: (take, filled, fill): target block = source block[:, take] with the columns 'filled' set to 'fill'
+        :raises ValueError: if the target has a column that is neither in the source nor a typed column, or if it
+                            requests other types than those of the typed columns of the source
+        """
+        src_columns = src_fmt.get_format()
+        take = []
+        filled = []
+        fill = []
+        for idx, name in enumerate(dst_fmt.get_format()):
+            if name in src_columns:
+                if name in CSVSpatialTranscoder.TYPED_COLUMNS:
+                    src_type = getattr(src_fmt, CSVSpatialTranscoder.TYPED_COLUMNS[name])
+                    dst_type = getattr(dst_fmt, CSVSpatialTranscoder.TYPED_COLUMNS[name])
+                    if str(dst_type) != 'none' and dst_type != src_type:
+                        raise ValueError("CSVSpatialTranscoder: [" + name + "] of the source is " + str(src_type) +
+                                         ", converting it to " + str(dst_type) + " changes the covariances; use "
+                                         "CovariancePropagator.convert_block() instead")
+                take.append(src_columns.index(name))
+            elif name in CSVSpatialTranscoder.TYPED_COLUMNS:
+                take.append(0)
+                filled.append(idx)
+                fill.append(float(getattr(dst_fmt, CSVSpatialTranscoder.TYPED_COLUMNS[name]).code()))
+            else:
+                raise ValueError("CSVSpatialTranscoder: column [" + name + "] of " + str(dst_fmt.type) +
+                                 " is not in " + str(src_fmt.type))
+        return np.array(take, dtype=np.intp), np.array(filled, dtype=np.intp), np.array(fill, dtype=np.float64)
+
+    def transcode_block(self, block):
+        # (n, len(src_fmt.get_format())) -> (n, len(dst_fmt.get_format()))
+        out = block[:, self.take]
+        if len(self.filled):
+            out[:, self.filled] = self.fill
+        return out
+
+    def write_to(self, file, blocks):
+        """
+        writes the header and the transcoded blocks of an iterable of source blocks.
+
+        :return: number of rows written
+        """
+        file.write(self.writer.header())
+        n_rows = 0
+        for block in blocks:
+            file.write(self.writer.format_rows(self.transcode_block(block)))
+            n_rows += len(block)
+        return n_rows
+
+    @staticmethod
+    def transcode(in_fn, out_fn, dst_fmt, precision=None, delimiter=None, chunk_size=65536):
+        """
+        converts the file in_fn (any format identified by CSVSpatialFormat.identify_format()) into dst_fmt.
+
+        :param dst_fmt: CSVSpatialFormat, or a CSVSpatialFormatType (string) with the error types of the source
+        :return: number of rows written, None if in_fn is not found or unknown
+        """
+        src_fmt = CSVSpatialFormat.identify_format(in_fn)
+        if src_fmt.type == CSVSpatialFormatType.none:
+            return None
+        if not isinstance(dst_fmt, CSVSpatialFormat):
+            dst_fmt = CSVSpatialFormat(CSVSpatialFormatType(str(dst_fmt)), est_err_type=src_fmt.estimation_error_type,
+                                       err_rep_type=src_fmt.rotation_error_representation)
+        transcoder = CSVSpatialTranscoder(src_fmt, dst_fmt, precision=precision, delimiter=delimiter,
+                                          chunk_size=chunk_size)
+        with open(out_fn, "w", buffering=2**22) as file:
+            return transcoder.write_to(file, CSVSpatialArray.iter_chunks(in_fn, chunk_size=transcoder.chunk_size))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Converts spatial CSV files between formats, streaming in chunks.')
+    parser.add_argument('input', help='input CSV file (may be compressed)')
+    parser.add_argument('output', help='output CSV file')
+    parser.add_argument('--format', required=True, choices=CSVSpatialFormatType.list()[:-1], help='target format')
+    parser.add_argument('--est-err-type', default=None, choices=EstimationErrorType.list(),
+                        help='estimation error type, if the target has typed columns (default: of the input)')
+    parser.add_argument('--err-rep', default=None, choices=ErrorRepresentationType.list(),
+                        help='error representation type, if the target has typed columns (default: of the input)')
+    parser.add_argument('--precision', type=int, default=None, help='significant digits (default: exact)')
+    parser.add_argument('--delimiter', default=None, help="entry separator (default: ' ' for TUM, ',' otherwise)")
+    parser.add_argument('--chunk-size', type=int, default=65536, help='rows per chunk')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print("input not found: " + str(args.input))
+        return 1
+    src_fmt = CSVSpatialFormat.identify_format(args.input)
+    est_err_type = args.est_err_type if args.est_err_type is not None else src_fmt.estimation_error_type
+    err_rep = args.err_rep if args.err_rep is not None else src_fmt.rotation_error_representation
+    dst_fmt = CSVSpatialFormat(CSVSpatialFormatType(args.format), est_err_type=EstimationErrorType(str(est_err_type)),
+                               err_rep_type=ErrorRepresentationType(str(err_rep)))
+    try:
+        n_rows = CSVSpatialTranscoder.transcode(args.input, args.output, dst_fmt, precision=args.precision,
+                                                delimiter=args.delimiter, chunk_size=args.chunk_size)
+    except ValueError as e:
+        print(str(e))
+        return 1
+    if n_rows is None:
+        print("conversion failed!")
+        return 1
+    print("written: " + str(args.output) + " (" + str(n_rows) + " rows)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import json
+import numpy as np
+from cnspy_spatial_csv_formats.CSVSpatialArray import CSVSpatialArray
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType
+from cnspy_spatial_csv_formats.CovarianceMatrix import CovarianceMatrix
+
+
+# Offending row indices per check; at most max_indices indices are kept per check, but all are counted.
+class CSVSpatialValidationReport:
+    CHECKS = ['nan', 'timestamps', 'quaternion', 'covariance']
+
+    fmt = None          # CSVSpatialFormatType
+    n_rows = 0
+    counts = None       # check -> number of offending rows
+    indices = None      # check -> list of index arrays (at most max_indices in total)
+    max_indices = 1000
+
+    def __init__(self, fmt, max_indices=1000):
+        self.fmt = fmt
+        self.n_rows = 0
+        self.max_indices = max(0, int(max_indices))
+        self.counts = dict((check, 0) for check in CSVSpatialValidationReport.CHECKS)
+        self.indices = dict((check, []) for check in CSVSpatialValidationReport.CHECKS)
+
+    def add(self, check, idx):
+        # idx: row indices in the file (ascending)
+        kept = sum(len(i) for i in self.indices[check])
+        if kept < self.max_indices:
+            self.indices[check].append(np.asarray(idx[:self.max_indices - kept], dtype=np.int64))
+        self.counts[check] += len(idx)
+
+    def get(self, check):
+        if not self.indices[check]:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(self.indices[check])
+
+    def ok(self):
+        return not any(self.counts.values())
+
+    def to_dict(self):
+        return {'fmt': str(self.fmt),
+                'n_rows': self.n_rows,
+                'counts': dict(self.counts),
+                'indices': dict((check, self.get(check).tolist()) for check in CSVSpatialValidationReport.CHECKS)}
+
+    def to_json(self, indent=1):
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def __str__(self):
+        lines = ['format: ' + str(self.fmt) + ', rows: ' + str(self.n_rows) + (', ok' if self.ok() else '')]
+        for check in CSVSpatialValidationReport.CHECKS:
+            if self.counts[check]:
+                idx = self.get(check)
+                lines.append('* ' + check + ': ' + str(self.counts[check]) + ' rows, e.g. ' + str(idx[0:10].tolist()))
+        return '\n'.join(lines)
+
+
+# Vectorized validation of blocks (see CSVSpatialArray), all rows of a block are checked at once:
+#  - 'nan': rows with a NaN or infinite entry (excluded from the other checks).
+#  - 'timestamps': rows whose t is not larger than the t of the previous finite row (strict=False: smaller only).
+#  - 'quaternion': rows with | |[qx,qy,qz,qw]| - 1 | > quat_tol.
+#  - 'covariance': rows with a covariance block (6x6 'Txx'..'Tcc' or 3x3 'pxx'..'pzz', 'qrr'..'qyy') that is not
+#    positive semi-definite: a batched Cholesky decomposition accepts the common case of positive definite
+#    matrices at once; only if it fails, the smallest eigenvalues (batched eigvalsh) are compared against
+#    -psd_tol * the largest absolute eigenvalue of each matrix.
+#  - feed() validates consecutive blocks of a file, keeping the row offset and the last timestamp, thus files are
+#    validated in streaming mode (validate_file()) with the memory of one chunk.
+class CSVSpatialValidator:
+    fmt = None
+    quat_tol = 1e-4
+    psd_tol = 1e-9
+    strict = True
+    report = None
+    offset = 0          # file row index of the next block
+    t_prev = None       # timestamp of the last row fed
+    q_idx = None        # column indices of qx, qy, qz, qw; None if the format has no quaternion
+
+    def __init__(self, fmt, quat_tol=1e-4, psd_tol=1e-9, strict=True, max_indices=1000):
+        assert (isinstance(fmt, CSVSpatialFormatType))
+        self.fmt = fmt
+        self.quat_tol = quat_tol
+        self.psd_tol = psd_tol
+        self.strict = strict
+        columns = CSVSpatialFormatType.get_format(fmt)
+        if 'qw' in columns:
+            self.q_idx = [columns.index(c) for c in ['qx', 'qy', 'qz', 'qw']]
+        self.reset(max_indices=max_indices)
+
+    def reset(self, max_indices=1000):
+        self.report = CSVSpatialValidationReport(self.fmt, max_indices=max_indices)
+        self.offset = 0
+        self.t_prev = None
+
+    @staticmethod
+    def not_psd(P, psd_tol=1e-9):
+        """
+        :param P: (N,n,n) symmetric matrices
+        :return: (N,) bool, True for matrices that are not positive semi-definite
+        """
+        if len(P) == 0:
+            return np.zeros(0, dtype=bool)
+        try:
+            np.linalg.cholesky(P)
+            return np.zeros(len(P), dtype=bool)
+        except np.linalg.LinAlgError:
+            pass
+        w = np.linalg.eigvalsh(P)
+        return w[:, 0] < -psd_tol * np.abs(w).max(axis=1)
+
+    def check(self, block):
+        """
+        :return: dict check -> row indices (in the block) of the offending rows
+        """
+        finite = np.isfinite(block).all(axis=1)
+        offending = {'nan': np.flatnonzero(~finite)}
+        # the other checks consider the finite rows only
+        rows = np.flatnonzero(finite)
+
+        t = block[rows, 0]
+        t_prev = np.concatenate(([self.t_prev if self.t_prev is not None else -np.inf], t[:-1]))
+        offending['timestamps'] = rows[t <= t_prev if self.strict else t < t_prev]
+
+        if self.q_idx is not None:
+            norm = np.linalg.norm(block[np.ix_(rows, self.q_idx)], axis=1)
+            offending['quaternion'] = rows[np.abs(norm - 1.0) > self.quat_tol]
+
+        blocks = CovarianceMatrix.unpack_blocks(self.fmt, block)
+        if blocks:
+            bad = np.zeros(len(rows), dtype=bool)
+            for P in blocks:
+                bad |= CSVSpatialValidator.not_psd(P[rows], self.psd_tol)
+            offending['covariance'] = rows[bad]
+        return offending
+
+    def feed(self, block):
+        # validates the next block of a file; the offending rows are added to the report
+        block = np.asarray(block, dtype=np.float64)
+        if len(block) == 0:
+            return self.report
+        offending = self.check(block)
+        for name, idx in offending.items():
+            if len(idx):
+                self.report.add(name, idx + self.offset)
+        self.offset += len(block)
+        self.report.n_rows += len(block)
+        # timestamp of the last finite row
+        finite = np.ones(len(block), dtype=bool)
+        finite[offending['nan']] = False
+        rows = np.flatnonzero(finite)
+        if len(rows):
+            self.t_prev = block[rows[-1], 0]
+        return self.report
+
+    @staticmethod
+    def validate(fmt, data, quat_tol=1e-4, psd_tol=1e-9, strict=True, max_indices=1000):
+        """
+        :return: CSVSpatialValidationReport of a block with the columns of get_format(fmt)
+        """
+        validator = CSVSpatialValidator(fmt, quat_tol=quat_tol, psd_tol=psd_tol, strict=strict,
+                                        max_indices=max_indices)
+        return validator.feed(data)
+
+    @staticmethod
+    def validate_file(fn, chunk_size=65536, quat_tol=1e-4, psd_tol=1e-9, strict=True, max_indices=1000):
+        """
+        :return: CSVSpatialValidationReport, or None if the file is not found or unknown
+        """
+        fmt = CSVSpatialFormatType.identify_format(fn)
+        if fmt == CSVSpatialFormatType.none:
+            return None
+        validator = CSVSpatialValidator(fmt, quat_tol=quat_tol, psd_tol=psd_tol, strict=strict, max_indices=max_indices)
+        for block in CSVSpatialArray.iter_chunks(fn, chunk_size=chunk_size):
+            validator.feed(block)
+        return validator.report
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import numpy as np
+from cnspy_spatial_csv_formats.PoseStructsBatch import PoseStructsBatch, struct_fields
+from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
+from cnspy_spatial_csv_formats.ErrorRepresentationType import ErrorRepresentationType
+
+
+# Writes blocks with the columns of CSVSpatialFormat.get_format() (see CSVSpatialArray) as CSV file:
+#  - rows are formatted chunk-wise by a single %-operation per chunk and written with large buffered writes; there is
+#    no Python loop over the rows or entries.
+#  - precision: None writes the shortest representation that reads back exactly (repr), otherwise the number of
+#    significant digits ('%.<precision>g').
+#  - the typed columns hold codes (see EstimationErrorType.code()) and are written as names, e.g. 'type1', 'theta_R'.
+#  - delimiter: ',' by default; ' ' writes space-separated files, e.g. TUM files with the header '#t tx ty ...'.
+class CSVSpatialWriter:
+    fmt = None
+    precision = None
+    chunk_size = 65536
+    row_fmt = None
+    typed_columns = None  # column index -> array of names indexed by code
+    delimiter = ','
+
+    def __init__(self, fmt, precision=None, chunk_size=65536, delimiter=','):
+        # fmt: CSVSpatialFormat
+        self.fmt = fmt
+        self.precision = precision
+        self.delimiter = delimiter
+        self.chunk_size = max(1, int(chunk_size))
+
+        names = dict()
+        names['est_err_type'] = np.array(EstimationErrorType.list(), dtype=object)
+        names['err_representation'] = np.array(ErrorRepresentationType.list(), dtype=object)
+
+        float_fmt = '%s' if precision is None else '%.' + str(int(precision)) + 'g'
+        entries = []
+        self.typed_columns = dict()
+        for idx, name in enumerate(fmt.get_format()):
+            if name in names:
+                self.typed_columns[idx] = names[name]
+                entries.append('%s')
+            else:
+                entries.append(float_fmt)
+        self.row_fmt = delimiter.join(entries) + '\n'
+
+    def header(self):
+        return self.delimiter.join(self.fmt.get_header()) + '\n'
+
+    def format_rows(self, block):
+        # returns the CSV lines of a (n, len(get_format())) block as one string
+        block = np.asarray(block, dtype=np.float64)
+        if len(block) == 0:
+            return ''
+        assert (block.ndim == 2 and block.shape[1] == len(self.fmt.get_format()))
+        values = block.astype(object)
+        for idx, names in self.typed_columns.items():
+            values[:, idx] = names[block[:, idx].astype(np.intp)]
+        return (self.row_fmt * len(block)) % tuple(values.ravel())
+
+    def write_to(self, file, data, write_header=True):
+        if write_header:
+            file.write(self.header())
+        data = CSVSpatialWriter.to_block(data, columns=self.fmt.get_format())
+        for start in range(0, len(data), self.chunk_size):
+            file.write(self.format_rows(data[start:start + self.chunk_size]))
+
+    def write(self, fn, data, write_header=True):
+        with open(fn, "w", buffering=2**22) as file:
+            self.write_to(file, data, write_header=write_header)
+
+    @staticmethod
+    def to_block(data, columns=None):
+        # accepts a NumPy block, a PoseStructsBatch or a list of PoseStructs; the fields of structs are reordered by
+        # name to the columns (e.g. sPoseStamped holds qw first, the PoseStamped format last)
+        if isinstance(data, (list, tuple)):
+            if len(data) == 0:
+                return np.empty((0, 0), dtype=np.float64)
+            if not isinstance(data[0], (list, tuple, float, int)):
+                data = PoseStructsBatch.from_structs(data)
+        if isinstance(data, PoseStructsBatch):
+            fields = struct_fields(data.struct_cls)
+            if columns is None or fields == list(columns):
+                return data.data
+            if sorted(fields) != sorted(columns):
+                raise ValueError("CSVSpatialWriter.to_block(): fields of " + data.struct_cls.__name__ + " " +
+                                 str(fields) + " do not match the columns " + str(list(columns)))
+            return data.data[:, [fields.index(name) for name in columns]]
+        return np.asarray(data, dtype=np.float64)
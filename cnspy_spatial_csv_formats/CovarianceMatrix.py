@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import numpy as np
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType
+
+
+# Index maps between the upper-triangular covariance columns of a block (see CSVSpatialArray) and stacked symmetric
+# matrices:
+#  - the triangles are stored row-major: 'Txx', 'Txy', ..., 'Txc', 'Tyy', ..., 'Tcc' (6x6) and
+#    'pxx', ..., 'pzz' / 'qrr', ..., 'qyy' (two 3x3 blocks of a block-diagonal 6x6 matrix).
+#  - the triangle columns are contiguous, thus triangle_views() returns (strided) views into the block, no copy.
+#  - unpack() and pack() are a single gather each, using precomputed flat index maps.
+class CovarianceMatrix:
+    # (n, n) -> flat index into the triangle of each entry of the full matrix, row-major
+    FULL_FROM_TRI = dict()
+    # triangle entry -> flat index into the full (n*n) matrix
+    TRI_FROM_FULL = dict()
+
+    @staticmethod
+    def full_from_tri(n):
+        if n not in CovarianceMatrix.FULL_FROM_TRI:
+            rows, cols = np.triu_indices(n)
+            idx = np.empty((n, n), dtype=np.intp)
+            idx[rows, cols] = np.arange(len(rows))
+            idx[cols, rows] = np.arange(len(rows))
+            CovarianceMatrix.FULL_FROM_TRI[n] = idx.ravel()
+        return CovarianceMatrix.FULL_FROM_TRI[n]
+
+    @staticmethod
+    def tri_from_full(n):
+        if n not in CovarianceMatrix.TRI_FROM_FULL:
+            rows, cols = np.triu_indices(n)
+            CovarianceMatrix.TRI_FROM_FULL[n] = rows * n + cols
+        return CovarianceMatrix.TRI_FROM_FULL[n]
+
+    @staticmethod
+    def tri_size(n):
+        return n * (n + 1) // 2
+
+    @staticmethod
+    def tri_to_full(tri, n, out=None):
+        """
+        :param tri: (N, n*(n+1)/2) upper triangles, row-major
+        :param out: optional (N,n,n) float64 array to write into; a non-contiguous out (e.g. a strided view) is
+                    filled through a temporary array
+        :return: (N,n,n) symmetric matrices
+        """
+        tri = np.asarray(tri)
+        assert (tri.shape[-1] == CovarianceMatrix.tri_size(n))
+        if out is not None:
+            assert (out.shape == tri.shape[:-1] + (n, n))
+            if out.flags.c_contiguous:
+                # a view of out, reshape does not copy
+                np.take(tri, CovarianceMatrix.full_from_tri(n), axis=-1, out=out.reshape(tri.shape[:-1] + (n * n,)))
+            else:
+                out[...] = np.take(tri, CovarianceMatrix.full_from_tri(n), axis=-1).reshape(out.shape)
+            return out
+        return np.take(tri, CovarianceMatrix.full_from_tri(n), axis=-1).reshape(tri.shape[:-1] + (n, n))
+
+    @staticmethod
+    def full_to_tri(P, out=None):
+        # (N,n,n) -> (N, n*(n+1)/2) upper triangles, row-major
+        P = np.asarray(P)
+        n = P.shape[-1]
+        flat = P.reshape(P.shape[:-2] + (n * n,))
+        return np.take(flat, CovarianceMatrix.tri_from_full(n), axis=-1, out=out)
+
+    @staticmethod
+    def blocks(fmt):
+        """
+        :return: list of (first column, n, offset) of the triangles in the layout of fmt; offset is the position of the
+                 n x n block on the diagonal of the 6x6 matrix
+        """
+        columns = CSVSpatialFormatType.get_format(fmt)
+        if 'Txx' in columns:
+            return [(columns.index('Txx'), 6, 0)]
+        elif 'pxx' in columns:
+            return [(columns.index('pxx'), 3, 0), (columns.index('qrr'), 3, 3)]
+        return []
+
+    @staticmethod
+    def triangle_views(fmt, data):
+        # views (no copy) of the triangle columns of a block: [(N,21)] or [(N,6) position, (N,6) orientation]
+        return [data[:, i:i + CovarianceMatrix.tri_size(n)] for i, n, _ in CovarianceMatrix.blocks(fmt)]
+
+    @staticmethod
+    def unpack_blocks(fmt, data):
+        # [(N,6,6)] or [(N,3,3) position, (N,3,3) orientation]
+        return [CovarianceMatrix.tri_to_full(tri, n)
+                for tri, (_, n, _) in zip(CovarianceMatrix.triangle_views(fmt, data), CovarianceMatrix.blocks(fmt))]
+
+    @staticmethod
+    def unpack(fmt, data):
+        """
+        :return: (N,6,6) covariances of a block with uncertainty; block-diagonal for the PosOrientCov layouts
+        """
+        blocks = CovarianceMatrix.blocks(fmt)
+        assert (len(blocks) > 0)
+        if len(blocks) == 1:
+            return CovarianceMatrix.tri_to_full(CovarianceMatrix.triangle_views(fmt, data)[0], 6)
+        P = np.zeros((len(data), 6, 6), dtype=np.float64)
+        for tri, (_, n, offset) in zip(CovarianceMatrix.triangle_views(fmt, data), blocks):
+            P[:, offset:offset + n, offset:offset + n] = CovarianceMatrix.tri_to_full(tri, n)
+        return P
+
+    @staticmethod
+    def pack(fmt, P, data=None):
+        """
+        writes the upper triangle(s) of the (N,6,6) covariances P into the covariance columns of data (in place);
+        for the PosOrientCov layouts, the off-diagonal blocks of P are dropped.
+
+        :return: data, or a new zero block with the covariance columns set if data is None
+        """
+        if data is None:
+            data = np.zeros((len(P), len(CSVSpatialFormatType.get_format(fmt))), dtype=np.float64)
+        for i, n, offset in CovarianceMatrix.blocks(fmt):
+            data[:, i:i + CovarianceMatrix.tri_size(n)] = \
+                CovarianceMatrix.full_to_tri(P[:, offset:offset + n, offset:offset + n])
+        return data
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import numpy as np
+import cnspy_spatial_csv_formats.SpatialMath as sm
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType
+from cnspy_spatial_csv_formats.CovarianceMatrix import CovarianceMatrix
+from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
+from cnspy_spatial_csv_formats.ErrorRepresentationType import ErrorRepresentationType
+
+
+# Batched first-order propagation of pose covariances between the EstimationErrorType's:
+#  - the error is eps = [dp; dtheta] (columns x,y,z,a,b,c of the PoseCov layout), the estimated pose is (R, p).
+#  - the Jacobian from the local type1 error eps1 to type X is (linearized about a zero error):
+#      type1: I                        type3: -I
+#      type5: [[R, 0], [0, I]]         type6: [[R, 0], [0, R]]
+#      type2: [[R, skew(p)*R], [0, R]] type4: -J_type2
+#    P_to = J * P_from * J^T, with J = J_to<-type1 * inv(J_from<-type1), for all rows at once.
+#  - the ErrorRepresentationType's agree to first order at a zero error, except for rpy_degree, which scales the
+#    rotational part by 180/pi.
+#  - the PosOrientCov layouts hold no position/orientation cross-covariance; it is assumed to be zero and dropped again
+#    after the propagation.
+class CovariancePropagator:
+    @staticmethod
+    def est_err_type(est_err_type):
+        if not isinstance(est_err_type, EstimationErrorType):
+            est_err_type = EstimationErrorType(str(est_err_type))
+        if est_err_type == EstimationErrorType.none:
+            raise ValueError("CovariancePropagator: estimation error type [none] cannot be propagated")
+        return est_err_type
+
+    @staticmethod
+    def rotation_scale(err_rep):
+        if not isinstance(err_rep, ErrorRepresentationType):
+            err_rep = ErrorRepresentationType(str(err_rep))
+        if err_rep == ErrorRepresentationType.none:
+            raise ValueError("CovariancePropagator: error representation [none] cannot be propagated")
+        return 180.0 / np.pi if err_rep == ErrorRepresentationType.rpy_degree else 1.0
+
+    @staticmethod
+    def blocks(R, p, est_err_type):
+        # J_type<-type1 = sign * [[A, B], [0, C]]
+        est_err_type = CovariancePropagator.est_err_type(est_err_type)
+        n = len(R)
+        eye = np.broadcast_to(np.eye(3), (n, 3, 3))
+        zero = np.zeros((n, 3, 3))
+        sign = -1.0 if est_err_type in (EstimationErrorType.type3, EstimationErrorType.type4) else 1.0
+        if est_err_type == EstimationErrorType.type1 or est_err_type == EstimationErrorType.type3:
+            return sign, eye, zero, eye
+        elif est_err_type == EstimationErrorType.type5:
+            return sign, R, zero, eye
+        elif est_err_type == EstimationErrorType.type6:
+            return sign, R, zero, R
+        return sign, R, sm.skew(p) @ R, R
+
+    @staticmethod
+    def jacobian(p, q, from_type, to_type):
+        """
+        :param p: (N,3) estimated positions
+        :param q: (N,4) estimated orientations [qx,qy,qz,qw]
+        :return: (N,6,6) Jacobians d eps_to / d eps_from
+        """
+        p = np.asarray(p, dtype=np.float64)
+        R = sm.quat_to_rot(q)
+        s_to, A_to, B_to, C_to = CovariancePropagator.blocks(R, p, to_type)
+        s_from, A_from, B_from, C_from = CovariancePropagator.blocks(R, p, from_type)
+
+        # inv(s*[[A, B], [0, C]]) = s*[[A^T, -A^T*B*C^T], [0, C^T]]
+        A_inv = np.swapaxes(A_from, -1, -2)
+        C_inv = np.swapaxes(C_from, -1, -2)
+        B_inv = -A_inv @ B_from @ C_inv
+
+        J = np.zeros((len(R), 6, 6))
+        J[:, 0:3, 0:3] = A_to @ A_inv
+        J[:, 0:3, 3:6] = A_to @ B_inv + B_to @ C_inv
+        J[:, 3:6, 3:6] = C_to @ C_inv
+        J *= s_to * s_from
+        return J
+
+    @staticmethod
+    def propagate(P, p, q, from_type, to_type,
+                  from_rep=ErrorRepresentationType.theta_so3, to_rep=ErrorRepresentationType.theta_so3):
+        """
+        :param P: (N,6,6) covariances of [dp; dtheta] in from_type/from_rep
+        :return: (N,6,6) covariances in to_type/to_rep
+        """
+        P = np.asarray(P, dtype=np.float64)
+        J = CovariancePropagator.jacobian(p, q, from_type, to_type)
+        s_from = CovariancePropagator.rotation_scale(from_rep)
+        s_to = CovariancePropagator.rotation_scale(to_rep)
+        if s_from != s_to:
+            J[:, :, 3:6] *= 1.0 / s_from
+            J[:, 3:6, :] *= s_to
+        return np.einsum('nij,njk,nlk->nil', J, P, J, optimize=True)
+
+    @staticmethod
+    def convert_block(fmt, data, to_type, to_rep=None, from_type=None, from_rep=None, pose=None):
+        """
+        propagates the covariance columns of a block (see CSVSpatialArray) to another estimation error type.
+
+        :param fmt: a CSVSpatialFormatType with uncertainty (PoseCov, PoseWithCov, PosOrientCov, ...)
+        :param from_type, from_rep: types of the block; taken from the typed columns if None
+        :param pose: (N,7) [tx,ty,tz,qx,qy,qz,qw], required for layouts without pose (PoseCov, PosOrientCov)
+        :return: a new block; the typed columns (if any) are set to to_type/to_rep
+        """
+        assert (isinstance(fmt, CSVSpatialFormatType) and fmt.has_uncertainty())
+        columns = CSVSpatialFormatType.get_format(fmt)
+        data = np.asarray(data, dtype=np.float64)
+        if from_type is None:
+            from_type = EstimationErrorType.from_code(data[0, columns.index('est_err_type')]) \
+                if 'est_err_type' in columns and len(data) else EstimationErrorType.type1
+        if from_rep is None:
+            from_rep = ErrorRepresentationType.from_code(data[0, columns.index('err_representation')]) \
+                if 'err_representation' in columns and len(data) else ErrorRepresentationType.theta_so3
+        if to_rep is None:
+            to_rep = from_rep
+        if pose is None:
+            if 'tx' not in columns:
+                raise ValueError("CovariancePropagator: the layout of [" + str(fmt) + "] requires a pose")
+            pose = data[:, columns.index('tx'):columns.index('qw') + 1]
+        pose = np.asarray(pose, dtype=np.float64)
+
+        P = CovariancePropagator.propagate(CovarianceMatrix.unpack(fmt, data), pose[:, 0:3], pose[:, 3:7],
+                                           from_type, to_type, from_rep, to_rep)
+        result = CovarianceMatrix.pack(fmt, P, data.copy())
+        if 'est_err_type' in columns:
+            result[:, columns.index('est_err_type')] = CovariancePropagator.est_err_type(to_type).code()
+        if 'err_representation' in columns:
+            result[:, columns.index('err_representation')] = ErrorRepresentationType(str(to_rep)).code()
+        return result
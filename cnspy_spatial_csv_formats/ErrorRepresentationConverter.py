@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import numpy as np
+import cnspy_spatial_csv_formats.SpatialMath as sm
+from cnspy_spatial_csv_formats.ErrorRepresentationType import ErrorRepresentationType
+
+
+# Batched conversion of rotation errors between the ErrorRepresentationType's (see its definition):
+#  - theta_R:   R ~ eye(3) + skew(theta), here theta = vee(R - R^T)/2 = sin(a)*axis; invertible for angles <= 90 deg
+#  - theta_q:   q ~ [0.5*theta; 1], here theta = 2*q_v/q_w = 2*tan(a/2)*axis; invertible for angles < 180 deg
+#  - theta_so3: R = exp(skew(theta)), theta = a*axis
+#  - tau_se3:   T = exp(tau), tau = [v; theta]; the rotational part equals theta_so3, the translational part
+#               relates to the position error p by p = V(theta)*v (left Jacobian of SO(3))
+#  - rpy_rad, rpy_degree: R = Rz(y)*Ry(p)*Rx(r), stored as [r, p, y]
+# Error blocks are (N,3) rotation errors [theta_x, theta_y, theta_z] or (N,6) pose errors
+# [nu_x, nu_y, nu_z, theta_x, theta_y, theta_z] as in the PoseErrorStamped format.
+class ErrorRepresentationConverter:
+    @staticmethod
+    def to_quat(theta, err_rep):
+        # rotation errors (N,3) in the given representation -> unit quaternions (N,4) [x,y,z,w]
+        err_rep = ErrorRepresentationConverter.rep(err_rep)
+        theta = np.asarray(theta, dtype=np.float64)
+        if err_rep == ErrorRepresentationType.theta_so3 or err_rep == ErrorRepresentationType.tau_se3:
+            return sm.exp_so3_quat(theta)
+        elif err_rep == ErrorRepresentationType.theta_q:
+            return sm.quat_normalize(np.concatenate([0.5 * theta, np.ones(theta.shape[:-1] + (1,))], axis=-1))
+        elif err_rep == ErrorRepresentationType.theta_R:
+            s = np.linalg.norm(theta, axis=-1, keepdims=True)
+            a = np.arcsin(np.minimum(s, 1.0))
+            k = np.where(s < sm.SMALL_ANGLE, 1.0, a / np.where(s < sm.SMALL_ANGLE, 1.0, s))
+            return sm.exp_so3_quat(theta * k)
+        elif err_rep == ErrorRepresentationType.rpy_rad:
+            return sm.rot_to_quat(sm.rpy_to_rot(theta))
+        elif err_rep == ErrorRepresentationType.rpy_degree:
+            return sm.rot_to_quat(sm.rpy_to_rot(np.deg2rad(theta)))
+        raise ValueError("ErrorRepresentationConverter: unsupported representation [" + str(err_rep) + "]")
+
+    @staticmethod
+    def from_quat(q, err_rep):
+        # unit quaternions (N,4) [x,y,z,w] -> rotation errors (N,3) in the given representation
+        err_rep = ErrorRepresentationConverter.rep(err_rep)
+        q = sm.quat_normalize(q)
+        if err_rep == ErrorRepresentationType.theta_so3 or err_rep == ErrorRepresentationType.tau_se3:
+            return sm.log_so3_quat(q)
+        elif err_rep == ErrorRepresentationType.theta_q:
+            return 2.0 * q[..., 0:3] / q[..., 3:4]
+        elif err_rep == ErrorRepresentationType.theta_R:
+            return 2.0 * q[..., 3:4] * q[..., 0:3]
+        elif err_rep == ErrorRepresentationType.rpy_rad:
+            return sm.rot_to_rpy(sm.quat_to_rot(q))
+        elif err_rep == ErrorRepresentationType.rpy_degree:
+            return np.rad2deg(sm.rot_to_rpy(sm.quat_to_rot(q)))
+        raise ValueError("ErrorRepresentationConverter: unsupported representation [" + str(err_rep) + "]")
+
+    @staticmethod
+    def convert(err, from_rep, to_rep):
+        """
+        converts a (N,3) rotation error block or a (N,6) pose error block [nu; theta] between two representations.
+        """
+        from_rep = ErrorRepresentationConverter.rep(from_rep)
+        to_rep = ErrorRepresentationConverter.rep(to_rep)
+        err = np.asarray(err, dtype=np.float64)
+        assert (err.shape[-1] == 3 or err.shape[-1] == 6)
+        if from_rep == to_rep:
+            return err.copy()
+
+        theta = err[..., -3:]
+        q = ErrorRepresentationConverter.to_quat(theta, from_rep)
+        theta_out = ErrorRepresentationConverter.from_quat(q, to_rep)
+        if err.shape[-1] == 3:
+            return theta_out
+
+        nu = err[..., 0:3]
+        if from_rep == ErrorRepresentationType.tau_se3:
+            nu = np.einsum('...ij,...j->...i', sm.so3_left_jacobian(theta), nu)
+        if to_rep == ErrorRepresentationType.tau_se3:
+            nu = np.einsum('...ij,...j->...i', sm.so3_left_jacobian_inv(theta_out), nu)
+        return np.concatenate([nu, theta_out], axis=-1)
+
+    @staticmethod
+    def rep(err_rep):
+        if isinstance(err_rep, ErrorRepresentationType):
+            return err_rep
+        return ErrorRepresentationType(str(err_rep))
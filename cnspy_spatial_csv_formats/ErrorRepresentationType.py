@@ -36,6 +36,14 @@ class ErrorRepresentationType(Enum):
 
     def str(self):
         return str(self.value)
+
+    def code(self):
+        # small integer code used in numeric (NumPy) blocks, index into .list()
+        return ErrorRepresentationType.list().index(self.value)
+
+    @staticmethod
+    def from_code(code):
+        return ErrorRepresentationType(ErrorRepresentationType.list()[int(code)])
     
     @staticmethod
     def list():
@@ -43,6 +43,14 @@ class EstimationErrorType(Enum):
     def str(self):
         return str(self.value)
 
+    def code(self):
+        # small integer code used in numeric (NumPy) blocks, index into .list()
+        return EstimationErrorType.list().index(self.value)
+
+    @staticmethod
+    def from_code(code):
+        return EstimationErrorType(EstimationErrorType.list()[int(code)])
+
     @staticmethod
     def list():
         return list([str(EstimationErrorType.type1),
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import numpy as np
+import cnspy_spatial_csv_formats.SpatialMath as sm
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType
+from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
+from cnspy_spatial_csv_formats.ErrorRepresentationType import ErrorRepresentationType
+from cnspy_spatial_csv_formats.ErrorRepresentationConverter import ErrorRepresentationConverter
+
+
+# Batched pose errors between aligned estimated and true poses (TUM/PoseStamped blocks, JPL order [qx,qy,qz,qw]):
+#  - the error (R_err, p_err) follows the definition of the EstimationErrorType, e.g. type1: TRUE = EST \oplus ERR,
+#    i.e. R_err = R_est^T*R_true and p_err = R_est^T*(p_true - p_est).
+#  - the rotation error is expressed in the ErrorRepresentationType (see ErrorRepresentationConverter); for tau_se3,
+#    nu = V(theta)^-1 * p_err, otherwise nu = p_err.
+#  - the result is a block in the PoseErrorStamped layout (see CSVSpatialArray).
+class PoseErrorComputer:
+    @staticmethod
+    def errors(p_est, q_est, p_true, q_true, est_err_type):
+        """
+        :return: (p_err (N,3), q_err (N,4)) of the estimation error type
+        """
+        if not isinstance(est_err_type, EstimationErrorType):
+            est_err_type = EstimationErrorType(str(est_err_type))
+        q_est = sm.quat_normalize(q_est)
+        q_true = sm.quat_normalize(q_true)
+        p_est = np.asarray(p_est, dtype=np.float64)
+        p_true = np.asarray(p_true, dtype=np.float64)
+
+        if est_err_type == EstimationErrorType.type1:
+            q_err = sm.quat_mul(sm.quat_conj(q_est), q_true)
+            p_err = sm.quat_rotate(sm.quat_conj(q_est), p_true - p_est)
+        elif est_err_type == EstimationErrorType.type2:
+            q_err = sm.quat_mul(q_true, sm.quat_conj(q_est))
+            p_err = p_true - sm.quat_rotate(q_err, p_est)
+        elif est_err_type == EstimationErrorType.type3:
+            q_err = sm.quat_mul(sm.quat_conj(q_true), q_est)
+            p_err = sm.quat_rotate(sm.quat_conj(q_true), p_est - p_true)
+        elif est_err_type == EstimationErrorType.type4:
+            q_err = sm.quat_mul(q_est, sm.quat_conj(q_true))
+            p_err = p_est - sm.quat_rotate(q_err, p_true)
+        elif est_err_type == EstimationErrorType.type5:
+            q_err = sm.quat_mul(sm.quat_conj(q_est), q_true)
+            p_err = p_true - p_est
+        elif est_err_type == EstimationErrorType.type6:
+            q_err = sm.quat_mul(q_true, sm.quat_conj(q_est))
+            p_err = p_true - p_est
+        else:
+            raise ValueError("PoseErrorComputer: unsupported estimation error type [" + str(est_err_type) + "]")
+        return p_err, q_err
+
+    @staticmethod
+    def compute(t, p_est, q_est, p_true, q_true, est_err_type=EstimationErrorType.type1,
+                err_rep=ErrorRepresentationType.theta_so3):
+        """
+        :return: (N,9) block in the PoseErrorStamped layout
+        """
+        err_rep = ErrorRepresentationConverter.rep(err_rep)
+        p_err, q_err = PoseErrorComputer.errors(p_est, q_est, p_true, q_true, est_err_type)
+        theta = ErrorRepresentationConverter.from_quat(q_err, err_rep)
+        if err_rep == ErrorRepresentationType.tau_se3:
+            p_err = np.einsum('nij,nj->ni', sm.so3_left_jacobian_inv(theta), p_err)
+
+        columns = CSVSpatialFormatType.get_format(CSVSpatialFormatType.PoseErrorStamped)
+        data = np.empty((len(p_err), len(columns)), dtype=np.float64)
+        data[:, 0] = t
+        data[:, 1:4] = p_err
+        data[:, 4:7] = theta
+        data[:, 7] = EstimationErrorType(str(est_err_type)).code()
+        data[:, 8] = err_rep.code()
+        return data
+
+    @staticmethod
+    def compute_blocks(est, gt, est_err_type=EstimationErrorType.type1, err_rep=ErrorRepresentationType.theta_so3):
+        """
+        :param est, gt: aligned (N,8) TUM/PoseStamped blocks [t,tx,ty,tz,qx,qy,qz,qw], e.g. of read_array()
+        :return: (N,9) block in the PoseErrorStamped layout, stamped with the timestamps of est
+        """
+        assert (len(est) == len(gt))
+        return PoseErrorComputer.compute(est[:, 0], est[:, 1:4], est[:, 4:8], gt[:, 1:4], gt[:, 4:8],
+                                         est_err_type=est_err_type, err_rep=err_rep)
@@ -22,13 +22,24 @@
 # TODOs:
 # - TODO: maybe switch from JPL to Hammilton quaternion order -> no because of backward compatibility
 # - TODO: get rid of PoseStructs use pandas to manage data
+#
+# HINT: __slots__ lists the attributes in the order of the 'vec' entries (= columns of the CSV format); it avoids a
+# per-instance __dict__ and is used by PoseStructsBatch to map attribute names to columns.
+from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
+from cnspy_spatial_csv_formats.ErrorRepresentationType import ErrorRepresentationType
+
+
 class sTimestamp:
+    __slots__ = ('t',)
+
     def __init__(self, vec=None):
         assert (len(vec) == 1)
         self.t = vec[0]
 
 # uses JPL quaternion order (vec, scalar)
 class sTUMPoseStamped:
+    __slots__ = ('t', 'tx', 'ty', 'tz', 'qx', 'qy', 'qz', 'qw')
+
     def __init__(self, vec=None):
         assert (len(vec) == 8)
         self.t = vec[0]
@@ -42,6 +53,8 @@ class sTUMPoseStamped:
 
 
 class sPoseStamped:
+    __slots__ = ('t', 'tx', 'ty', 'tz', 'qw', 'qx', 'qy', 'qz')
+
     def __init__(self, vec=None):
         assert (len(vec) == 8)
         self.t = vec[0]
@@ -54,14 +67,18 @@ class sPoseStamped:
         self.qz = vec[7]
 
 class sPose2DStamped:
+    __slots__ = ('t', 'tx', 'ty', 'yaw')
+
     def __init__(self, vec=None):
-        assert (len(vec) == 8)
+        assert (len(vec) == 4)
         self.t = vec[0]
         self.tx = vec[1]
         self.ty = vec[2]
         self.yaw = vec[3]
 
 class sPositionStamped:
+    __slots__ = ('t', 'tx', 'ty', 'tz')
+
     def __init__(self, vec=None):
         assert (len(vec) == 4)
         self.t = vec[0]
@@ -71,6 +88,8 @@ class sPositionStamped:
 
 
 class sPosOrientCovStamped:
+    __slots__ = ('t', 'pxx', 'pxy', 'pxz', 'pyy', 'pyz', 'pzz', 'qrr', 'qrp', 'qry', 'qpp', 'qpy', 'qyy')
+
     def __init__(self, vec=None):
         assert (len(vec) == 13)
         self.t = vec[0]
@@ -88,6 +107,9 @@ class sPosOrientCovStamped:
         self.qyy = vec[12]
 
 class sPoseCovStamped:
+    __slots__ = ('t', 'Txx', 'Txy', 'Txz', 'Txa', 'Txb', 'Txc', 'Tyy', 'Tyz', 'Tya', 'Tyb', 'Tyc', 'Tzz', 'Tza',
+                 'Tzb', 'Tzc', 'Taa', 'Tab', 'Tac', 'Tbb', 'Tbc', 'Tcc')
+
     def __init__(self, vec=None):
         assert (len(vec) == 22)
         self.t = vec[0]
@@ -115,6 +137,9 @@ class sPoseCovStamped:
 
 # uses JPL quaternion order (vec, scalar)
 class sTUMPosOrientWithCovStamped:
+    __slots__ = ('t', 'tx', 'ty', 'tz', 'qx', 'qy', 'qz', 'qw', 'pxx', 'pxy', 'pxz', 'pyy', 'pyz', 'pzz', 'qrr',
+                 'qrp', 'qry', 'qpp', 'qpy', 'qyy')
+
     def __init__(self, vec=None):
         assert (len(vec) == 20)
         self.t = vec[0]
@@ -140,6 +165,9 @@ class sTUMPosOrientWithCovStamped:
 
 
 class sPosOrientWithCovStamped:
+    __slots__ = ('t', 'tx', 'ty', 'tz', 'qw', 'qx', 'qy', 'qz', 'pxx', 'pxy', 'pxz', 'pyy', 'pyz', 'pzz', 'qrr',
+                 'qrp', 'qry', 'qpp', 'qpy', 'qyy')
+
     def __init__(self, vec=None):
         assert (len(vec) == 20)
         self.t = vec[0]
@@ -164,6 +192,9 @@ class sPosOrientWithCovStamped:
         self.qyy = vec[19]
 
 class sPoseWithCovStamped:
+    __slots__ = ('t', 'tx', 'ty', 'tz', 'qw', 'qx', 'qy', 'qz', 'Txx', 'Txy', 'Txz', 'Txa', 'Txb', 'Txc', 'Tyy',
+                 'Tyz', 'Tya', 'Tyb', 'Tyc', 'Tzz', 'Tza', 'Tzb', 'Tzc', 'Taa', 'Tab', 'Tac', 'Tbb', 'Tbc', 'Tcc')
+
     def __init__(self, vec=None):
         assert (len(vec) == 29)
         self.t = vec[0]
@@ -198,6 +229,9 @@ class sPoseWithCovStamped:
 
 # uses JPL quaternion order (vec, scalar)
 class sTUMPoseWithCovStamped:
+    __slots__ = ('t', 'tx', 'ty', 'tz', 'qx', 'qy', 'qz', 'qw', 'Txx', 'Txy', 'Txz', 'Txa', 'Txb', 'Txc', 'Tyy',
+                 'Tyz', 'Tya', 'Tyb', 'Tyc', 'Tzz', 'Tza', 'Tzb', 'Tzc', 'Taa', 'Tab', 'Tac', 'Tbb', 'Tbc', 'Tcc')
+
     def __init__(self, vec=None):
         assert (len(vec) == 29)
         self.t = vec[0]
@@ -228,4 +262,32 @@ class sTUMPoseWithCovStamped:
         self.Tac = vec[18+7]
         self.Tbb = vec[19+7]
         self.Tbc = vec[20+7]
-        self.Tcc = vec[21+7]
\ No newline at end of file
+        self.Tcc = vec[21+7]
+
+
+# uses JPL quaternion order (vec, scalar)
+class sTUMPosOrientWithCovStampedTyped(sTUMPosOrientWithCovStamped):
+    __slots__ = ('est_err_type', 'err_representation')
+
+    def __init__(self, vec=None, est_type=None, err_repr=None):
+        sTUMPosOrientWithCovStamped.__init__(self, vec=vec)
+        if not isinstance(est_type, EstimationErrorType):
+            est_type = EstimationErrorType(str(est_type).strip())
+        if not isinstance(err_repr, ErrorRepresentationType):
+            err_repr = ErrorRepresentationType(str(err_repr).strip())
+        self.est_err_type = est_type
+        self.err_representation = err_repr
+
+
+# uses JPL quaternion order (vec, scalar)
+class sTUMPoseWithCovStampedTyped(sTUMPoseWithCovStamped):
+    __slots__ = ('est_err_type', 'err_representation')
+
+    def __init__(self, vec=None, est_type=None, err_repr=None):
+        sTUMPoseWithCovStamped.__init__(self, vec=vec)
+        if not isinstance(est_type, EstimationErrorType):
+            est_type = EstimationErrorType(str(est_type).strip())
+        if not isinstance(err_repr, ErrorRepresentationType):
+            err_repr = ErrorRepresentationType(str(err_repr).strip())
+        self.est_err_type = est_type
+        self.err_representation = err_repr
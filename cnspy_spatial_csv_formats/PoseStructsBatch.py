@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import time
+import numpy as np
+from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
+from cnspy_spatial_csv_formats.ErrorRepresentationType import ErrorRepresentationType
+from cnspy_spatial_csv_formats.CSVSpatialStats import CSVSpatialStats
+
+# typed attributes are stored as codes in the numeric block (see EstimationErrorType.code())
+TYPED_FIELDS = {'est_err_type': EstimationErrorType, 'err_representation': ErrorRepresentationType}
+
+
+def struct_fields(struct_cls):
+    # attribute names of a PoseStructs class in the order of its 'vec' entries (base class slots first)
+    fields = []
+    for cls in reversed(struct_cls.__mro__):
+        fields.extend(cls.__dict__.get('__slots__', ()))
+    return fields
+
+
+def _make_field_property(idx, enum_cls=None):
+    if enum_cls is None:
+        def getter(self):
+            return float(self._data[self._row, idx])
+
+        def setter(self, value):
+            self._data[self._row, idx] = value
+    else:
+        def getter(self):
+            return enum_cls.from_code(self._data[self._row, idx])
+
+        def setter(self, value):
+            self._data[self._row, idx] = enum_cls(str(value)).code()
+    return property(getter, setter)
+
+
+# Lightweight view on one row of a PoseStructsBatch: has the attributes of the PoseStructs class, but stores nothing
+# except a reference to the shared block and the row index.
+class PoseStructView:
+    __slots__ = ('_data', '_row')
+    struct_cls = None
+
+    def __init__(self, data, row):
+        self._data = data
+        self._row = row
+
+    def to_struct(self):
+        return PoseStructsBatch.row_to_struct(self.struct_cls, self._data[self._row])
+
+    _view_classes = dict()
+
+    @staticmethod
+    def view_class(struct_cls):
+        view_cls = PoseStructView._view_classes.get(struct_cls)
+        if view_cls is None:
+            attrs = {'__slots__': (), 'struct_cls': struct_cls}
+            for idx, name in enumerate(struct_fields(struct_cls)):
+                attrs[name] = _make_field_property(idx, TYPED_FIELDS.get(name))
+            view_cls = type(struct_cls.__name__ + 'View', (PoseStructView,), attrs)
+            PoseStructView._view_classes[struct_cls] = view_cls
+        return view_cls
+
+
+# Stores N poses of one PoseStructs class as a single contiguous (N, len(struct_fields(struct_cls))) float64 block
+# and hands out PoseStructView objects with the same attribute names.
+class PoseStructsBatch:
+    struct_cls = None
+    data = None
+    fields = None
+
+    def __init__(self, struct_cls, data=None, size=0):
+        self.struct_cls = struct_cls
+        self.fields = struct_fields(struct_cls)
+        if data is None:
+            data = np.zeros((size, len(self.fields)), dtype=np.float64)
+        assert (data.ndim == 2 and data.shape[1] == len(self.fields))
+        self.data = data
+        self._view_cls = PoseStructView.view_class(struct_cls)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return PoseStructsBatch(self.struct_cls, data=self.data[idx])
+        if idx < 0:
+            idx += len(self.data)
+        if idx < 0 or idx >= len(self.data):
+            raise IndexError('PoseStructsBatch index out of range')
+        return self._view_cls(self.data, idx)
+
+    def __iter__(self):
+        view_cls = self._view_cls
+        data = self.data
+        for idx in range(len(data)):
+            yield view_cls(data, idx)
+
+    def column(self, name):
+        return self.data[:, self.fields.index(name)]
+
+    def to_structs(self):
+        stats = CSVSpatialStats.active
+        if stats is None:
+            return [PoseStructsBatch.row_to_struct(self.struct_cls, row) for row in self.data]
+        t_start = time.perf_counter()
+        structs = [PoseStructsBatch.row_to_struct(self.struct_cls, row) for row in self.data]
+        stats.record('<' + self.struct_cls.__name__ + '>', 'structs', time.perf_counter() - t_start, rows=len(structs))
+        return structs
+
+    @staticmethod
+    def row_to_struct(struct_cls, row):
+        fields = struct_fields(struct_cls)
+        typed = [name for name in fields if name in TYPED_FIELDS]
+        if typed:
+            n = len(fields) - len(typed)
+            return struct_cls(vec=row[0:n].tolist(),
+                              est_type=EstimationErrorType.from_code(row[fields.index('est_err_type')]),
+                              err_repr=ErrorRepresentationType.from_code(row[fields.index('err_representation')]))
+        return struct_cls(vec=row.tolist())
+
+    @staticmethod
+    def from_structs(structs, struct_cls=None):
+        if struct_cls is None:
+            struct_cls = type(structs[0])
+        fields = struct_fields(struct_cls)
+        data = np.empty((len(structs), len(fields)), dtype=np.float64)
+        for idx, name in enumerate(fields):
+            enum_cls = TYPED_FIELDS.get(name)
+            if enum_cls is None:
+                data[:, idx] = [getattr(s, name) for s in structs]
+            else:
+                data[:, idx] = [enum_cls(str(getattr(s, name))).code() for s in structs]
+        return PoseStructsBatch(struct_cls, data=data)
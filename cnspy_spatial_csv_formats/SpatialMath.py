@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import numpy as np
+
+# Batched rotation helpers, all functions operate on stacks: vectors (N,3), quaternions (N,4), matrices (N,3,3).
+#  - quaternions are stored in JPL order [qx, qy, qz, qw] (as in the CSV files), with the Hamilton product.
+#  - roll-pitch-yaw: R = Rz(yaw)*Ry(pitch)*Rx(roll), stored as [roll, pitch, yaw].
+
+SMALL_ANGLE = 1e-6
+
+
+def skew(v):
+    v = np.asarray(v, dtype=np.float64)
+    S = np.zeros(v.shape[:-1] + (3, 3), dtype=np.float64)
+    S[..., 0, 1] = -v[..., 2]
+    S[..., 0, 2] = v[..., 1]
+    S[..., 1, 0] = v[..., 2]
+    S[..., 1, 2] = -v[..., 0]
+    S[..., 2, 0] = -v[..., 1]
+    S[..., 2, 1] = v[..., 0]
+    return S
+
+
+def vee(S):
+    return np.stack([S[..., 2, 1], S[..., 0, 2], S[..., 1, 0]], axis=-1)
+
+
+def quat_normalize(q):
+    # unit quaternions with non-negative scalar part
+    q = np.asarray(q, dtype=np.float64)
+    q = q / np.linalg.norm(q, axis=-1, keepdims=True)
+    return np.where(q[..., 3:4] < 0, -q, q)
+
+
+def quat_mul(p, q):
+    # Hamilton product p*q of [x, y, z, w] quaternions
+    px, py, pz, pw = p[..., 0], p[..., 1], p[..., 2], p[..., 3]
+    qx, qy, qz, qw = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+    return np.stack([pw * qx + px * qw + py * qz - pz * qy,
+                     pw * qy - px * qz + py * qw + pz * qx,
+                     pw * qz + px * qy - py * qx + pz * qw,
+                     pw * qw - px * qx - py * qy - pz * qz], axis=-1)
+
+
+def quat_conj(q):
+    q = np.array(q, dtype=np.float64)
+    q[..., 0:3] *= -1.0
+    return q
+
+
+def quat_rotate(q, v):
+    # R(q)*v for unit quaternions: v + 2w(u x v) + 2u x (u x v), with q = [u, w]
+    q = np.asarray(q, dtype=np.float64)
+    u = q[..., 0:3]
+    uv = np.cross(u, v)
+    return v + 2.0 * q[..., 3:4] * uv + 2.0 * np.cross(u, uv)
+
+
+def quat_to_rot(q):
+    q = np.asarray(q, dtype=np.float64)
+    q = q / np.linalg.norm(q, axis=-1, keepdims=True)
+    x, y, z, w = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+    R = np.empty(q.shape[:-1] + (3, 3), dtype=np.float64)
+    R[..., 0, 0] = 1 - 2 * (y * y + z * z)
+    R[..., 0, 1] = 2 * (x * y - z * w)
+    R[..., 0, 2] = 2 * (x * z + y * w)
+    R[..., 1, 0] = 2 * (x * y + z * w)
+    R[..., 1, 1] = 1 - 2 * (x * x + z * z)
+    R[..., 1, 2] = 2 * (y * z - x * w)
+    R[..., 2, 0] = 2 * (x * z - y * w)
+    R[..., 2, 1] = 2 * (y * z + x * w)
+    R[..., 2, 2] = 1 - 2 * (x * x + y * y)
+    return R
+
+
+def rot_to_quat(R):
+    # Shepperd's method: per row, the largest of the four candidates is used for numerical stability
+    R = np.asarray(R, dtype=np.float64)
+    r00, r11, r22 = R[..., 0, 0], R[..., 1, 1], R[..., 2, 2]
+    cand = np.stack([r00 - r11 - r22, -r00 + r11 - r22, -r00 - r11 + r22, r00 + r11 + r22], axis=-1)
+    k = np.argmax(cand, axis=-1)
+    s = np.sqrt(np.maximum(np.take_along_axis(cand, k[..., None], axis=-1)[..., 0] + 1.0, 1e-300)) * 2.0
+
+    q = np.empty(R.shape[:-2] + (4,), dtype=np.float64)
+    d21 = R[..., 2, 1] - R[..., 1, 2]
+    d02 = R[..., 0, 2] - R[..., 2, 0]
+    d10 = R[..., 1, 0] - R[..., 0, 1]
+    s01 = R[..., 0, 1] + R[..., 1, 0]
+    s02 = R[..., 0, 2] + R[..., 2, 0]
+    s12 = R[..., 1, 2] + R[..., 2, 1]
+    # columns: x, y, z, w for each case k
+    table = [np.stack([0.25 * s, s01 / s, s02 / s, d21 / s], axis=-1),
+             np.stack([s01 / s, 0.25 * s, s12 / s, d02 / s], axis=-1),
+             np.stack([s02 / s, s12 / s, 0.25 * s, d10 / s], axis=-1),
+             np.stack([d21 / s, d02 / s, d10 / s, 0.25 * s], axis=-1)]
+    for i in range(4):
+        mask = k == i
+        q[mask] = table[i][mask]
+    return quat_normalize(q)
+
+
+def exp_so3_quat(theta):
+    # q = exp(theta): [axis*sin(a/2), cos(a/2)]
+    theta = np.asarray(theta, dtype=np.float64)
+    a = np.linalg.norm(theta, axis=-1, keepdims=True)
+    small = a < SMALL_ANGLE
+    a_safe = np.where(small, 1.0, a)
+    k = np.where(small, 0.5 - a * a / 48.0, np.sin(0.5 * a) / a_safe)
+    return np.concatenate([theta * k, np.cos(0.5 * a)], axis=-1)
+
+
+def log_so3_quat(q):
+    # theta = log(q), with |theta| in [0, pi]
+    q = quat_normalize(q)
+    n = np.linalg.norm(q[..., 0:3], axis=-1, keepdims=True)
+    a = 2.0 * np.arctan2(n, q[..., 3:4])
+    small = n < SMALL_ANGLE
+    k = np.where(small, 2.0 / np.maximum(q[..., 3:4], SMALL_ANGLE), a / np.where(small, 1.0, n))
+    return q[..., 0:3] * k
+
+
+def quat_slerp(q0, q1, alpha):
+    # spherical linear interpolation along the shortest path: q0 * exp(alpha * log(q0^-1 * q1))
+    alpha = np.asarray(alpha, dtype=np.float64)[..., None]
+    dq = quat_normalize(quat_mul(quat_conj(q0), q1))
+    return quat_normalize(quat_mul(q0, exp_so3_quat(alpha * log_so3_quat(dq))))
+
+
+def exp_so3(theta):
+    return quat_to_rot(exp_so3_quat(theta))
+
+
+def log_so3(R):
+    return log_so3_quat(rot_to_quat(R))
+
+
+def rpy_to_rot(rpy):
+    rpy = np.asarray(rpy, dtype=np.float64)
+    cr, sr = np.cos(rpy[..., 0]), np.sin(rpy[..., 0])
+    cp, sp = np.cos(rpy[..., 1]), np.sin(rpy[..., 1])
+    cy, sy = np.cos(rpy[..., 2]), np.sin(rpy[..., 2])
+    R = np.empty(rpy.shape[:-1] + (3, 3), dtype=np.float64)
+    R[..., 0, 0] = cy * cp
+    R[..., 0, 1] = cy * sp * sr - sy * cr
+    R[..., 0, 2] = cy * sp * cr + sy * sr
+    R[..., 1, 0] = sy * cp
+    R[..., 1, 1] = sy * sp * sr + cy * cr
+    R[..., 1, 2] = sy * sp * cr - cy * sr
+    R[..., 2, 0] = -sp
+    R[..., 2, 1] = cp * sr
+    R[..., 2, 2] = cp * cr
+    return R
+
+
+def rot_to_rpy(R):
+    R = np.asarray(R, dtype=np.float64)
+    roll = np.arctan2(R[..., 2, 1], R[..., 2, 2])
+    pitch = np.arcsin(np.clip(-R[..., 2, 0], -1.0, 1.0))
+    yaw = np.arctan2(R[..., 1, 0], R[..., 0, 0])
+    return np.stack([roll, pitch, yaw], axis=-1)
+
+
+def so3_left_jacobian(theta):
+    # V(theta) = I + (1-cos(a))/a^2 K + (a-sin(a))/a^3 K^2, with K = skew(theta); t = V(theta)*v for T = exp(tau)
+    theta = np.asarray(theta, dtype=np.float64)
+    a = np.linalg.norm(theta, axis=-1)[..., None, None]
+    small = a < SMALL_ANGLE
+    a_safe = np.where(small, 1.0, a)
+    c1 = np.where(small, 0.5 - a * a / 24.0, (1.0 - np.cos(a)) / (a_safe * a_safe))
+    c2 = np.where(small, 1.0 / 6.0 - a * a / 120.0, (a - np.sin(a)) / (a_safe * a_safe * a_safe))
+    K = skew(theta)
+    return np.eye(3) + c1 * K + c2 * (K @ K)
+
+
+def so3_left_jacobian_inv(theta):
+    # V(theta)^-1 = I - 1/2 K + (1/a^2)(1 - a*sin(a)/(2(1-cos(a)))) K^2
+    theta = np.asarray(theta, dtype=np.float64)
+    a = np.linalg.norm(theta, axis=-1)[..., None, None]
+    small = a < 1e-4
+    a_safe = np.where(small, 1.0, a)
+    c = np.where(small, 1.0 / 12.0 + a * a / 720.0,
+                 (1.0 - a_safe * np.sin(a_safe) / (2.0 * (1.0 - np.cos(a_safe)))) / (a_safe * a_safe))
+    K = skew(theta)
+    return np.eye(3) - 0.5 * K + c * (K @ K)
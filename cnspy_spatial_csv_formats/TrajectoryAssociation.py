@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import numpy as np
+import cnspy_spatial_csv_formats.SpatialMath as sm
+from cnspy_spatial_csv_formats.CSVSpatialFormat import CSVSpatialFormat
+
+
+# Association of two trajectories by their timestamps, O(N log M) by np.searchsorted on the (sorted) 't' columns:
+#  - associate(): each estimate is paired with the nearest reference (ground truth) timestamp, t_est + offset, if it
+#    is within max_difference; with unique=True, a reference entry is used at most once (by the closest estimate).
+#  - interpolation_indices(): brackets each estimate by two reference entries for a linear/SLERP interpolation.
+#  - both return index arrays into the inputs (no data is copied); interpolate() evaluates a reference block at them.
+class TrajectoryAssociation:
+    @staticmethod
+    def sort_order(t):
+        # None if t is sorted already, otherwise the argsort
+        t = np.asarray(t, dtype=np.float64)
+        if len(t) < 2 or np.all(t[1:] >= t[:-1]):
+            return None
+        return np.argsort(t, kind='stable')
+
+    @staticmethod
+    def associate(t_est, t_ref, offset=0.0, max_difference=0.02, unique=True):
+        """
+        :return: (idx_est, idx_ref) int arrays of the associated rows, ordered by idx_est
+        """
+        t_est = np.asarray(t_est, dtype=np.float64) + offset
+        t_ref = np.asarray(t_ref, dtype=np.float64)
+        if len(t_est) == 0 or len(t_ref) == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        order = TrajectoryAssociation.sort_order(t_ref)
+        t_sorted = t_ref if order is None else t_ref[order]
+
+        hi = np.clip(np.searchsorted(t_sorted, t_est, side='left'), 1, len(t_sorted) - 1) \
+            if len(t_sorted) > 1 else np.zeros(len(t_est), dtype=np.intp)
+        lo = np.maximum(hi - 1, 0)
+        use_hi = np.abs(t_sorted[hi] - t_est) < np.abs(t_est - t_sorted[lo])
+        idx_ref = np.where(use_hi, hi, lo)
+        diff = np.abs(t_sorted[idx_ref] - t_est)
+
+        idx_est = np.flatnonzero(diff <= max_difference)
+        idx_ref = idx_ref[idx_est]
+        if unique and len(idx_est):
+            # keep the closest estimate per reference entry
+            sel = np.lexsort((diff[idx_est], idx_ref))
+            first = np.ones(len(sel), dtype=bool)
+            first[1:] = idx_ref[sel][1:] != idx_ref[sel][:-1]
+            keep = np.sort(sel[first])
+            idx_est, idx_ref = idx_est[keep], idx_ref[keep]
+        if order is not None:
+            idx_ref = order[idx_ref]
+        return idx_est, idx_ref
+
+    @staticmethod
+    def interpolation_indices(t_est, t_ref, offset=0.0, max_gap=None):
+        """
+        :param max_gap: maximal time between the two bracketing reference entries, None for any
+        :return: (idx_est, idx_lo, alpha): t_est[idx_est] + offset = (1-alpha)*t_ref[idx_lo] + alpha*t_ref[idx_lo+1];
+                 only estimates within [t_ref[0], t_ref[-1]] are returned. t_ref must be sorted.
+        """
+        t_est = np.asarray(t_est, dtype=np.float64) + offset
+        t_ref = np.asarray(t_ref, dtype=np.float64)
+        if len(t_ref) < 2:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp), np.empty(0)
+        assert (TrajectoryAssociation.sort_order(t_ref) is None)
+
+        idx_est = np.flatnonzero((t_est >= t_ref[0]) & (t_est <= t_ref[-1]))
+        idx_lo = np.clip(np.searchsorted(t_ref, t_est[idx_est], side='right') - 1, 0, len(t_ref) - 2)
+        gap = t_ref[idx_lo + 1] - t_ref[idx_lo]
+        if max_gap is not None:
+            valid = gap <= max_gap
+            idx_est, idx_lo, gap = idx_est[valid], idx_lo[valid], gap[valid]
+        alpha = np.where(gap > 0, (t_est[idx_est] - t_ref[idx_lo]) / np.where(gap > 0, gap, 1.0), 0.0)
+        return idx_est, idx_lo, alpha
+
+    @staticmethod
+    def interpolate(ref, idx_lo, alpha):
+        """
+        evaluates a TUM/PoseStamped block [t,tx,ty,tz,qx,qy,qz,qw] between the rows idx_lo and idx_lo+1: linear for
+        t and the position, SLERP for the orientation. Further columns (e.g. covariance or typed columns of a
+        PoseWithCov block) are not interpolated but copied from the row idx_lo.
+        """
+        r0 = ref[idx_lo]
+        r1 = ref[idx_lo + 1]
+        a = np.asarray(alpha, dtype=np.float64)[:, None]
+        data = r0.copy()
+        data[:, 0:4] = (1.0 - a) * r0[:, 0:4] + a * r1[:, 0:4]
+        data[:, 4:8] = sm.quat_slerp(r0[:, 4:8], r1[:, 4:8], alpha)
+        return data
+
+    @staticmethod
+    def associate_files(fn_est, fn_ref, offset=0.0, max_difference=0.02, unique=True):
+        """
+        reads two files (see CSVSpatialFormat.read_array) and associates them by their 't' column.
+
+        :return: (est, ref, idx_est, idx_ref) or (None, None, None, None)
+        """
+        fmt_est, est = CSVSpatialFormat.read_array(fn_est)
+        fmt_ref, ref = CSVSpatialFormat.read_array(fn_ref)
+        if est is None or ref is None:
+            return None, None, None, None
+        idx_est, idx_ref = TrajectoryAssociation.associate(est[:, 0], ref[:, 0], offset=offset,
+                                                           max_difference=max_difference, unique=unique)
+        return est, ref, idx_est, idx_ref
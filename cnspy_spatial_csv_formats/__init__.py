@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import importlib
+
+# The modules of the package are imported on first access (PEP 562), e.g.
+#   import cnspy_spatial_csv_formats as csf
+#   csf.CSVSpatialFormatType.CSVSpatialFormatType.identify_format(fn)
+# imports CSVSpatialFormatType (and the enums) only, not NumPy.
+__all__ = ['CSVSpatialArray',
+           'CSVSpatialAsync',
+           'CSVSpatialBenchmark',
+           'CSVSpatialCache',
+           'CSVSpatialColumnar',
+           'CSVSpatialCompression',
+           'CSVSpatialFollower',
+           'CSVSpatialFormat',
+           'CSVSpatialFormatType',
+           'CSVSpatialLoader',
+           'CSVSpatialParser',
+           'CSVSpatialShared',
+           'CSVSpatialSplitReader',
+           'CSVSpatialStats',
+           'CSVSpatialTimeIndex',
+           'CSVSpatialTranscoder',
+           'CSVSpatialValidator',
+           'CSVSpatialWriter',
+           'CovarianceMatrix',
+           'CovariancePropagator',
+           'ErrorRepresentationConverter',
+           'ErrorRepresentationType',
+           'EstimationErrorType',
+           'PoseErrorComputer',
+           'PoseStructs',
+           'PoseStructsBatch',
+           'SpatialMath',
+           'TrajectoryAssociation']
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError("module " + repr(__name__) + " has no attribute " + repr(name))
+
+
+def __dir__():
+    return sorted(list(globals().keys()) + __all__)
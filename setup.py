@@ -34,4 +34,12 @@ setup(
     packages=find_packages(exclude=["test_*", "TODO*"]),
     python_requires='>=3.6',
     install_requires=['numpy'],
+    extras_require={'columnar': ['pyarrow'], 'zstd': ['zstandard']},
+    entry_points={
+        'console_scripts': [
+            'cnspy_spatial_csv_convert = cnspy_spatial_csv_formats.CSVSpatialColumnar:main',
+            'cnspy_spatial_csv_benchmark = cnspy_spatial_csv_formats.CSVSpatialBenchmark:main',
+            'cnspy_spatial_csv_transcode = cnspy_spatial_csv_formats.CSVSpatialTranscoder:main',
+        ],
+    },
 )
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import time
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from cnspy_spatial_csv_formats.CSVSpatialArray import CSVSpatialArray
+from cnspy_spatial_csv_formats.CSVSpatialFormat import CSVSpatialFormat
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType
+from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
+from cnspy_spatial_csv_formats.ErrorRepresentationType import ErrorRepresentationType
+
+SAMPLE_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_data')
+BENCH_ROWS = int(os.environ.get('CNSPY_BENCH_ROWS', '2000'))
+
+
+class CSVSpatialArray_Test(unittest.TestCase):
+    def test_read_pose(self):
+        fn = str(SAMPLE_DATA_DIR + '/ID1-pose-gt.csv')
+        fmt, data = CSVSpatialFormat.read_array(fn)
+        self.assertTrue(fmt.type == CSVSpatialFormatType.PoseStamped)
+        self.assertEqual(data.shape[1], len(fmt.get_format()))
+
+        with open(fn, "r") as file:
+            file.readline()
+            for row, line in zip(data, file):
+                pose = CSVSpatialFormatType.parse(line, fmt.type)
+                self.assertEqual(row[0], pose.t)
+                self.assertEqual(row[7], pose.qw)
+
+    def test_read_typed(self):
+        fmt, data = CSVSpatialFormat.read_array(str(SAMPLE_DATA_DIR + '/ID1-pose-est-posorient-cov-type2-thetaq.csv'))
+        print('read_array: ' + str(fmt.type) + ' ' + str(data.shape))
+        self.assertTrue(fmt.type == CSVSpatialFormatType.PosOrientWithCovTyped)
+        self.assertTrue(fmt.estimation_error_type == EstimationErrorType.type2)
+        self.assertTrue(fmt.rotation_error_representation == ErrorRepresentationType.theta_q)
+        self.assertTrue(np.all(data[:, -2] == EstimationErrorType.type2.code()))
+        self.assertTrue(np.all(data[:, -1] == ErrorRepresentationType.theta_q.code()))
+
+    def test_read_anyorder(self):
+        _, data = CSVSpatialFormat.read_array(str(SAMPLE_DATA_DIR + '/ID1-pose-est-posorient-cov-type1-thetaR.csv'))
+        fmt, data_any = CSVSpatialFormat.read_array(
+            str(SAMPLE_DATA_DIR + '/ID1-pose-est-posorient-cov-type1-thetaR-anyorder.csv'), order='F')
+        self.assertTrue(fmt.estimation_error_type == EstimationErrorType.type1)
+        self.assertTrue(data_any.flags['F_CONTIGUOUS'])
+        # the anyorder file holds the same rows, just its header names the columns differently
+        self.assertTrue(np.array_equal(data_any[:, 1:4], data[:, [3, 2, 1]]))
+        self.assertTrue(np.array_equal(data_any[:, 4:8], data[:, [6, 4, 5, 7]]))
+        self.assertTrue(np.array_equal(data_any[:, 8:], data[:, 8:]))
+
+    def test_parse_lines(self):
+        layout = CSVSpatialArray(CSVSpatialFormatType.PoseErrorStamped)
+        data = layout.parse(['0.1,1,2,3,0.1,0.2,0.3,type5,rpy_degree', '0.2,1,2,3,0.1,0.2,0.3,type5,rpy_degree'])
+        self.assertEqual(data.shape, (2, 9))
+        self.assertEqual(data[1, layout.column_index('err_representation')], ErrorRepresentationType.rpy_degree.code())
+        self.assertEqual(layout.parse([]).shape, (0, 9))
+
+    def test_read_typed_whitespace(self):
+        fn = str(SAMPLE_DATA_DIR + '/ID1-pose-est-posorient-cov-type2-thetaq.csv')
+        _, data = CSVSpatialFormat.read_array(fn)
+        with open(fn, "r") as file:
+            lines = file.readlines()
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            padded_fn = os.path.join(tmp_dir, 'padded.csv')
+            with open(padded_fn, "w") as file:
+                file.write(lines[0])
+                file.writelines(line.replace(',type2,theta_q', ', type2 , theta_q ') for line in lines[1:])
+            fmt, data_padded = CSVSpatialFormat.read_array(padded_fn)
+            self.assertTrue(fmt.estimation_error_type == EstimationErrorType.type2)
+            self.assertTrue(np.array_equal(data_padded, data))
+            self.assertTrue(np.array_equal(np.vstack(list(CSVSpatialFormat.iter_chunks(padded_fn, chunk_size=2))), data))
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_identify_formats(self):
+        fmts = CSVSpatialFormat.identify_formats([str(SAMPLE_DATA_DIR + '/ID1-pose-est-posorient-cov-type2-thetaq.csv'),
+                                                  str(SAMPLE_DATA_DIR + '/test-posewithcov2csv.csv')])
+        self.assertTrue(fmts[0].type == CSVSpatialFormatType.PosOrientWithCovTyped)
+        self.assertTrue(fmts[0].estimation_error_type == EstimationErrorType.type2)
+        self.assertTrue(fmts[0].rotation_error_representation == ErrorRepresentationType.theta_q)
+        self.assertTrue(fmts[1].type == CSVSpatialFormatType.PoseWithCov)
+
+    def test_read_unknown(self):
+        fmt, data = CSVSpatialFormat.read_array(str(SAMPLE_DATA_DIR + '/example_eval.csv'))
+        self.assertTrue(fmt.type == CSVSpatialFormatType.none)
+        self.assertTrue(data is None)
+
+        fmt, data = CSVSpatialFormat.read_array(str(SAMPLE_DATA_DIR + '/212341234.csv'))
+        self.assertTrue(data is None)
+
+    def test_iter_chunks(self):
+        fn = str(SAMPLE_DATA_DIR + '/ID1-pose-est.csv')
+        fmt, data = CSVSpatialFormat.read_array(fn)
+        chunks = list(CSVSpatialFormat.iter_chunks(fn, chunk_size=1000))
+        print('iter_chunks: ' + str([len(c) for c in chunks]))
+        self.assertTrue(all(len(c) <= 1000 for c in chunks))
+        self.assertTrue(np.array_equal(np.vstack(chunks), data))
+
+        t_min = data[len(data) // 4, 0]
+        t_max = data[len(data) // 2, 0]
+        selected = data[(data[:, 0] >= t_min) & (data[:, 0] <= t_max)]
+        for is_sorted in [False, True]:
+            chunks = list(CSVSpatialFormat.iter_chunks(fn, chunk_size=1000, t_min=t_min, t_max=t_max,
+                                                       is_sorted=is_sorted))
+            self.assertTrue(np.array_equal(np.vstack(chunks), selected))
+
+        # early termination
+        for chunk in CSVSpatialFormat.iter_chunks(fn, chunk_size=10):
+            self.assertEqual(len(chunk), 10)
+            break
+
+        self.assertEqual(len(list(CSVSpatialFormat.iter_chunks(str(SAMPLE_DATA_DIR + '/example_eval.csv')))), 0)
+
+    def test_benchmark_read_vs_parse(self):
+        with open(str(SAMPLE_DATA_DIR + '/ID1-pose-gt.csv'), "r") as file:
+            header = file.readline()
+            lines = file.readlines()
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fn = os.path.join(tmp_dir, 'pose-gt-scaled.csv')
+            with open(fn, "w") as file:
+                file.write(header)
+                for i in range(0, BENCH_ROWS, len(lines)):
+                    file.writelines(lines[0:min(len(lines), BENCH_ROWS - i)])
+
+            t_start = time.perf_counter()
+            poses = []
+            with open(fn, "r") as file:
+                file.readline()
+                for line in file:
+                    poses.append(CSVSpatialFormatType.parse(line, CSVSpatialFormatType.PoseStamped))
+            t_parse = time.perf_counter() - t_start
+
+            t_start = time.perf_counter()
+            fmt, data = CSVSpatialFormat.read_array(fn)
+            t_read = time.perf_counter() - t_start
+
+        self.assertEqual(len(poses), BENCH_ROWS)
+        self.assertEqual(data.shape, (BENCH_ROWS, 8))
+        print('rows: %d, parse(): %.3f s (%.0f rows/s), read_array(): %.3f s (%.0f rows/s)'
+              % (BENCH_ROWS, t_parse, BENCH_ROWS / t_parse, t_read, BENCH_ROWS / t_read))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import shutil
+import asyncio
+import tempfile
+import unittest
+import numpy as np
+from cnspy_spatial_csv_formats.CSVSpatialAsync import CSVSpatialAsync, CSVSpatialAsyncLoader
+from cnspy_spatial_csv_formats.CSVSpatialArray import CSVSpatialArray
+from cnspy_spatial_csv_formats.CSVSpatialFormat import CSVSpatialFormat
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType
+from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
+
+SAMPLE_DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), 'sample_data'))
+
+
+class CSVSpatialAsync_Test(unittest.TestCase):
+    def test_identify_and_chunks(self):
+        fn = os.path.join(SAMPLE_DATA_DIR, 'ID1-pose-est-posorient-cov-type1-thetaR.csv')
+
+        async def run():
+            fmt = await CSVSpatialAsync.identify_format_async(fn)
+            chunks = [block async for block in CSVSpatialAsync.iter_chunks_async(fn, chunk_size=100)]
+            return fmt, chunks
+
+        fmt, chunks = asyncio.run(run())
+        self.assertEqual(fmt.type, CSVSpatialFormatType.PosOrientWithCovTyped)
+        self.assertEqual(fmt.estimation_error_type, EstimationErrorType.type1)
+        _, data = CSVSpatialFormat.read_array(fn)
+        self.assertTrue(all(len(block) <= 100 for block in chunks))
+        self.assertTrue(np.array_equal(np.concatenate(chunks), data))
+
+    def test_loader(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            for name in ['ID1-pose-est.csv', 'ID1-pose-gt.csv', 'ID1-pose-err.csv']:
+                shutil.copy(os.path.join(SAMPLE_DATA_DIR, name), tmp_dir)
+            with open(os.path.join(tmp_dir, 'unknown.csv'), 'w') as file:
+                file.write('a,b,c\n1,2,3\n')
+
+            async def run():
+                loader = CSVSpatialAsyncLoader(max_concurrency=2, chunk_size=500)
+                return await loader.load_all([tmp_dir, os.path.join(tmp_dir, 'missing.csv')])
+
+            results = asyncio.run(run())
+            self.assertEqual(len(results), 5)
+
+            # a loader constructed outside of the event loop, used by two event loops
+            loader = CSVSpatialAsyncLoader(max_concurrency=1)
+            gt_fn = os.path.join(tmp_dir, 'ID1-pose-gt.csv')
+
+            async def load_concurrently():
+                # the callers wait for the semaphore of load()
+                return await asyncio.gather(*[loader.load(gt_fn) for _ in range(3)])
+
+            for _ in range(2):
+                reloaded = asyncio.run(loader.load_all(tmp_dir))
+                self.assertTrue(reloaded[gt_fn].ok())
+                self.assertTrue(all(r.ok() for r in asyncio.run(load_concurrently())))
+            for name in ['ID1-pose-est.csv', 'ID1-pose-gt.csv', 'ID1-pose-err.csv']:
+                fn = os.path.join(tmp_dir, name)
+                fmt, data = CSVSpatialFormat.read_array(fn)
+                self.assertTrue(results[fn].ok())
+                self.assertEqual(results[fn].fmt.type, fmt.type)
+                self.assertTrue(np.array_equal(results[fn].data, data))
+            self.assertFalse(results[os.path.join(tmp_dir, 'unknown.csv')].ok())
+            self.assertFalse(results[os.path.join(tmp_dir, 'missing.csv')].ok())
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_cancel(self):
+        fn = os.path.join(SAMPLE_DATA_DIR, 'ID1-pose-gt.csv')
+
+        async def consume(received):
+            async for block in CSVSpatialAsync.iter_chunks_async(fn, chunk_size=10):
+                received.append(block)
+                await asyncio.sleep(10)
+
+        async def run():
+            received = []
+            task = asyncio.create_task(consume(received))
+            while not received:
+                await asyncio.sleep(0.001)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return received
+
+        self.assertEqual(len(asyncio.run(run())), 1)
+
+    def test_close(self):
+        fn = os.path.join(SAMPLE_DATA_DIR, 'ID1-pose-gt.csv')
+        closed = []
+        iter_chunks = CSVSpatialArray.iter_chunks
+
+        def recording_iter_chunks(*args, **kwargs):
+            try:
+                yield from iter_chunks(*args, **kwargs)
+            finally:
+                closed.append(True)
+
+        async def run():
+            chunks = CSVSpatialAsync.iter_chunks_async(fn, chunk_size=10)
+            await chunks.__anext__()
+            await chunks.aclose()
+            # the file is closed once aclose() returns
+            return list(closed)
+
+        CSVSpatialArray.iter_chunks = recording_iter_chunks
+        try:
+            self.assertEqual(asyncio.run(run()), [True])
+        finally:
+            CSVSpatialArray.iter_chunks = iter_chunks
+
+
+if __name__ == '__main__':
+    unittest.main()
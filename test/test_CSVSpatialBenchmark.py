@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from cnspy_spatial_csv_formats.CSVSpatialBenchmark import CSVSpatialBenchmark
+from cnspy_spatial_csv_formats.CSVSpatialFormat import CSVSpatialFormat
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType
+
+
+class CSVSpatialBenchmark_Test(unittest.TestCase):
+    def test_synthesize(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            for fmt in [CSVSpatialFormatType(f) for f in CSVSpatialFormatType.list()[:-1]]:
+                data = CSVSpatialBenchmark.synthesize(fmt, 50)
+                fn = os.path.join(tmp_dir, str(fmt) + '.csv')
+                CSVSpatialFormat.from_array(fmt, data).write_array(fn, data)
+                fmt_read, data_read = CSVSpatialFormat.read_array(fn)
+                self.assertEqual(len(data_read), 50, str(fmt))
+                self.assertTrue(np.array_equal(data_read, data), str(fmt))
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_report(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            bench = CSVSpatialBenchmark(rows=[200], formats=['PoseWithCovTyped', 'PoseErrorStamped'])
+            report = bench.run()
+            names = set((r['format'], r['benchmark']) for r in report['results'])
+            self.assertEqual(len([n for n in names if n[0] == 'PoseWithCovTyped']), 6)
+            # no PoseStructs for PoseErrorStamped: no per-line parsing
+            self.assertEqual(len([n for n in names if n[0] == 'PoseErrorStamped']), 4)
+            for r in report['results']:
+                self.assertTrue(r['seconds'] > 0)
+                self.assertTrue(r['peak_memory_bytes'] > 0)
+
+            fn = os.path.join(tmp_dir, 'report.json')
+            CSVSpatialBenchmark.save(report, fn)
+            loaded = CSVSpatialBenchmark.load(fn)
+            self.assertEqual(loaded['results'], report['results'])
+            self.assertIn('numpy', loaded['environment'])
+            comparison = CSVSpatialBenchmark.compare(loaded, report)
+            self.assertEqual(len(comparison), len(report['results']))
+            self.assertTrue(all(c[3] == 1.0 for c in comparison))
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import time
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from cnspy_spatial_csv_formats.CSVSpatialCache import CSVSpatialCache
+from cnspy_spatial_csv_formats.CSVSpatialFormat import CSVSpatialFormat
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType
+from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
+from cnspy_spatial_csv_formats.ErrorRepresentationType import ErrorRepresentationType
+
+SAMPLE_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_data')
+
+
+class CSVSpatialCache_Test(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = CSVSpatialCache(cache_dir=os.path.join(self.tmp_dir, 'cache'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_load(self):
+        fn = str(SAMPLE_DATA_DIR + '/ID1-pose-gt.csv')
+        _, data = CSVSpatialFormat.read_array(fn)
+
+        t_start = time.perf_counter()
+        fmt, data_miss = self.cache.load(fn)
+        t_miss = time.perf_counter() - t_start
+        t_start = time.perf_counter()
+        fmt_hit, data_hit = self.cache.load(fn)
+        t_hit = time.perf_counter() - t_start
+        print('cache miss: %.4f s, cache hit: %.4f s' % (t_miss, t_hit))
+
+        self.assertTrue(fmt.type == CSVSpatialFormatType.PoseStamped)
+        self.assertTrue(fmt_hit.type == CSVSpatialFormatType.PoseStamped)
+        self.assertTrue(isinstance(data_hit, np.memmap))
+        self.assertFalse(data_hit.flags['WRITEABLE'])
+        self.assertTrue(np.array_equal(data, data_hit))
+        self.assertTrue(np.array_equal(data, data_miss))
+        self.assertEqual(len(self.cache.list_sidecars()), 1)
+
+    def test_typed(self):
+        fmt, data = self.cache.load(str(SAMPLE_DATA_DIR + '/ID1-pose-est-posorient-cov-type2-thetaq.csv'))
+        fmt, data = self.cache.load(str(SAMPLE_DATA_DIR + '/ID1-pose-est-posorient-cov-type2-thetaq.csv'))
+        self.assertTrue(fmt.type == CSVSpatialFormatType.PosOrientWithCovTyped)
+        self.assertTrue(fmt.estimation_error_type == EstimationErrorType.type2)
+        self.assertTrue(fmt.rotation_error_representation == ErrorRepresentationType.theta_q)
+
+    def test_invalidation(self):
+        fn = os.path.join(self.tmp_dir, 'pose.csv')
+        shutil.copy(str(SAMPLE_DATA_DIR + '/test-pose2csv.csv'), fn)
+        _, data = self.cache.load(fn)
+        n_rows = len(data)
+        sidecar_fn = self.cache.sidecar_fn(fn)
+        del data
+
+        with open(fn, "a") as file:
+            file.write('1.0,1,2,3,0,0,0,1\n')
+        stat = os.stat(fn)
+        os.utime(fn, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        _, data = self.cache.load(fn)
+        self.assertEqual(len(data), n_rows + 1)
+        self.assertFalse(os.path.exists(sidecar_fn))
+        self.assertEqual(len(self.cache.list_sidecars()), 1)
+
+        cache = CSVSpatialCache(cache_dir=self.cache.cache_dir, use_content_hash=True)
+        fmt, data = cache.load(fn)
+        self.assertEqual(len(data), n_rows + 1)
+
+    def test_eviction(self):
+        cache = CSVSpatialCache(cache_dir=self.cache.cache_dir, max_bytes=1)
+        cache.load(str(SAMPLE_DATA_DIR + '/ID1-pose-gt.csv'))
+        cache.load(str(SAMPLE_DATA_DIR + '/ID1-pose-est.csv'))
+        # the most recent sidecar is always kept
+        self.assertEqual(len(cache.list_sidecars()), 1)
+        self.assertTrue(os.path.exists(cache.sidecar_fn(str(SAMPLE_DATA_DIR + '/ID1-pose-est.csv'))))
+
+        cache.clear()
+        self.assertEqual(cache.size(), 0)
+
+    def test_unknown(self):
+        fmt, data = self.cache.load(str(SAMPLE_DATA_DIR + '/example_eval.csv'))
+        self.assertTrue(data is None)
+        self.assertEqual(len(self.cache.list_sidecars()), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import cnspy_spatial_csv_formats.CSVSpatialColumnar as columnar
+from cnspy_spatial_csv_formats.CSVSpatialColumnar import CSVSpatialColumnar, HAS_PYARROW
+from cnspy_spatial_csv_formats.CSVSpatialFormat import CSVSpatialFormat
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType
+from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
+from cnspy_spatial_csv_formats.ErrorRepresentationType import ErrorRepresentationType
+
+SAMPLE_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_data')
+
+
+class CSVSpatialColumnar_Test(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def check_roundtrip(self, ext):
+        fn_csv = str(SAMPLE_DATA_DIR + '/ID1-pose-est-posorient-cov-type2-thetaq.csv')
+        fmt_csv, data_csv = CSVSpatialFormat.read_array(fn_csv)
+        fn = CSVSpatialColumnar.export(fn_csv, os.path.join(self.tmp_dir, 'est' + ext))
+        print(ext + ': ' + str(os.path.getsize(fn)) + ' bytes, csv: ' + str(os.path.getsize(fn_csv)) + ' bytes')
+
+        fmt = CSVSpatialFormat.identify_format(fn)
+        self.assertTrue(fmt.type == CSVSpatialFormatType.PosOrientWithCovTyped)
+        self.assertTrue(fmt.estimation_error_type == EstimationErrorType.type2)
+        self.assertTrue(fmt.rotation_error_representation == ErrorRepresentationType.theta_q)
+
+        fmt, data = CSVSpatialColumnar.load(fn)
+        self.assertTrue(np.array_equal(data, data_csv))
+        fmt, data = CSVSpatialColumnar.load(fn, columns=['t', 'tx', 'ty', 'tz', 'err_representation'])
+        self.assertTrue(np.array_equal(data, data_csv[:, [0, 1, 2, 3, 21]]))
+        fmt, data = CSVSpatialColumnar.load(fn, columns=['Txx'])
+        self.assertTrue(data is None)
+
+        fn_back = CSVSpatialColumnar.to_csv(fn, os.path.join(self.tmp_dir, 'back' + ext + '.csv'))
+        _, data = CSVSpatialFormat.read_array(fn_back)
+        self.assertTrue(np.array_equal(data, data_csv))
+
+    def test_npz(self):
+        self.check_roundtrip('.npz')
+
+    @unittest.skipUnless(HAS_PYARROW, 'pyarrow not installed')
+    def test_parquet(self):
+        self.check_roundtrip('.parquet')
+
+    @unittest.skipUnless(HAS_PYARROW, 'pyarrow not installed')
+    def test_feather(self):
+        self.check_roundtrip('.feather')
+
+    def test_fallback_without_pyarrow(self):
+        has_pyarrow = columnar.HAS_PYARROW
+        columnar.HAS_PYARROW = False
+        try:
+            fn = CSVSpatialColumnar.export(str(SAMPLE_DATA_DIR + '/ID1-pose-gt.csv'),
+                                           os.path.join(self.tmp_dir, 'gt.parquet'))
+        finally:
+            columnar.HAS_PYARROW = has_pyarrow
+        self.assertEqual(fn, os.path.join(self.tmp_dir, 'gt.npz'))
+        self.assertTrue(CSVSpatialFormat.identify_format(fn).type == CSVSpatialFormatType.PoseStamped)
+
+    def test_all_formats(self):
+        for type in CSVSpatialFormatType.list():
+            if type == str(CSVSpatialFormatType.none):
+                continue
+            fmt = CSVSpatialFormat(CSVSpatialFormatType(type), est_err_type=EstimationErrorType.type1,
+                                   err_rep_type=ErrorRepresentationType.theta_so3)
+            data = np.ones((3, len(fmt.get_format())))
+            fn = CSVSpatialColumnar.save(os.path.join(self.tmp_dir, type + '.npz'), fmt, data)
+            fmt_loaded, data_loaded = CSVSpatialColumnar.load(fn)
+            self.assertTrue(fmt_loaded.type == fmt.type)
+            self.assertTrue(np.array_equal(data, data_loaded))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import gzip
+import lzma
+import time
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from cnspy_spatial_csv_formats.CSVSpatialCompression import CSVSpatialCompression
+from cnspy_spatial_csv_formats.CSVSpatialFormat import CSVSpatialFormat
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType
+from cnspy_spatial_csv_formats.CSVSpatialLoader import CSVSpatialLoader
+from cnspy_spatial_csv_formats.CSVSpatialTimeIndex import CSVSpatialTimeIndex
+from cnspy_spatial_csv_formats.CSVSpatialBenchmark import CSVSpatialBenchmark
+from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
+
+try:
+    import zstandard
+    HAS_ZSTANDARD = True
+except ImportError:
+    HAS_ZSTANDARD = False
+
+SAMPLE_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_data')
+BENCH_ROWS = int(os.environ.get('CNSPY_BENCH_ROWS', '2000'))
+
+
+def compress(fn, codec, out_fn):
+    with open(fn, "rb") as file:
+        content = file.read()
+    if codec == 'gzip':
+        content = gzip.compress(content, compresslevel=1)
+    elif codec == 'xz':
+        content = lzma.compress(content, preset=1)
+    else:
+        content = zstandard.ZstdCompressor().compress(content)
+    with open(out_fn, "wb") as file:
+        file.write(content)
+    return out_fn
+
+
+class CSVSpatialCompression_Test(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_codec(self):
+        fn = os.path.join(SAMPLE_DATA_DIR, 'ID1-pose-gt.csv')
+        self.assertEqual(CSVSpatialCompression.codec(fn), None)
+        self.assertEqual(CSVSpatialCompression.codec(compress(fn, 'gzip', os.path.join(self.tmp_dir, 'a.gz'))), 'gzip')
+        # magic bytes take precedence over the extension
+        self.assertEqual(CSVSpatialCompression.codec(compress(fn, 'xz', os.path.join(self.tmp_dir, 'b.csv'))), 'xz')
+        self.assertEqual(CSVSpatialCompression.codec(os.path.join(self.tmp_dir, 'missing.csv.zst')), 'zstd')
+        self.assertEqual(CSVSpatialCompression.strip_extension('traj.csv.gz'), 'traj.csv')
+        self.assertEqual(CSVSpatialCompression.strip_extension('traj.csv'), 'traj.csv')
+
+        with open(os.path.join(self.tmp_dir, 'c.zst'), "wb") as file:
+            file.write(b'\x28\xb5\x2f\xfd\x00\x00')
+        if not HAS_ZSTANDARD:
+            self.assertRaises(ImportError, CSVSpatialCompression.open_text, os.path.join(self.tmp_dir, 'c.zst'))
+
+    def test_read(self):
+        codecs = ['gzip', 'xz'] + (['zstd'] if HAS_ZSTANDARD else [])
+        ext = {'gzip': '.gz', 'xz': '.xz', 'zstd': '.zst'}
+        for name in ['ID1-pose-gt.csv', 'ID1-pose-est-posorient-cov-type1-thetaR.csv']:
+            fn = os.path.join(SAMPLE_DATA_DIR, name)
+            fmt, data = CSVSpatialFormat.read_array(fn)
+            for codec in codecs:
+                fn_c = compress(fn, codec, os.path.join(self.tmp_dir, name + ext[codec]))
+                fmt_c = CSVSpatialFormat.identify_format(fn_c)
+                self.assertEqual(fmt_c.type, fmt.type)
+                self.assertEqual(fmt_c.estimation_error_type, fmt.estimation_error_type)
+
+                fmt_c, data_c = CSVSpatialFormat.read_array(fn_c)
+                self.assertTrue(np.array_equal(data_c, data))
+                self.assertTrue(np.array_equal(np.concatenate(list(CSVSpatialFormat.iter_chunks(fn_c, 100))), data))
+                self.assertTrue(np.array_equal(CSVSpatialFormat.read_array_parallel(fn_c, max_workers=2)[1], data))
+
+                res = CSVSpatialLoader(max_workers=1).load(fn_c)[fn_c]
+                self.assertTrue(res.ok())
+                self.assertTrue(np.array_equal(res.data, data))
+                self.assertTrue(CSVSpatialTimeIndex.build(fn_c) is None)
+
+        fn_c = os.path.join(self.tmp_dir, 'ID1-pose-est-posorient-cov-type1-thetaR.csv.gz')
+        self.assertEqual(CSVSpatialFormat.identify_format(fn_c).estimation_error_type, EstimationErrorType.type1)
+
+    def test_benchmark_read(self):
+        fn = os.path.join(self.tmp_dir, 'pose-cov.csv')
+        fmt = CSVSpatialFormatType.PoseWithCovTyped
+        data = CSVSpatialBenchmark.synthesize(fmt, BENCH_ROWS)
+        CSVSpatialFormat.from_array(fmt, data).write_array(fn, data)
+        files = [('plain', fn), ('gzip', compress(fn, 'gzip', fn + '.gz')), ('xz', compress(fn, 'xz', fn + '.xz'))]
+        if HAS_ZSTANDARD:
+            files.append(('zstd', compress(fn, 'zstd', fn + '.zst')))
+
+        size = os.path.getsize(fn)
+        _, data = CSVSpatialFormat.read_array(fn)
+        for codec, fn_c in files:
+            t_start = time.perf_counter()
+            _, data_c = CSVSpatialFormat.read_array(fn_c)
+            t_elapsed = time.perf_counter() - t_start
+            self.assertTrue(np.array_equal(data_c, data))
+            print('%-5s rows: %d, file: %8.2f MB, %.3f s, %7.2f MB/s (uncompressed)' %
+                  (codec, BENCH_ROWS, os.path.getsize(fn_c) * 1e-6, t_elapsed, size / t_elapsed * 1e-6))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import time
+import shutil
+import asyncio
+import tempfile
+import unittest
+import numpy as np
+from cnspy_spatial_csv_formats.CSVSpatialFormat import CSVSpatialFormat
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType
+
+BENCH_ROWS = int(os.environ.get('CNSPY_BENCH_ROWS', '2000'))
+HEADER = 't,tx,ty,tz,qx,qy,qz,qw\n'
+
+
+def rows(first, n):
+    return ''.join('%d,%d,0,0,0,0,0,1\n' % (i, 2 * i) for i in range(first, first + n))
+
+
+class CSVSpatialFollower_Test(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.fn = os.path.join(self.tmp_dir, 'live.csv')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def append(self, text):
+        with open(self.fn, 'a') as file:
+            file.write(text)
+
+    def test_poll(self):
+        follower = CSVSpatialFormat.follow(self.fn)
+        self.assertIsNone(follower.poll())
+        self.append(HEADER[:5])
+        self.assertIsNone(follower.poll())
+        self.append(HEADER[5:])
+        self.assertIsNone(follower.poll())
+        self.assertEqual(follower.layout.fmt, CSVSpatialFormatType.PoseStamped)
+
+        self.append(rows(0, 3) + '3,6,0,0')
+        block = follower.poll()
+        self.assertEqual(block.shape, (3, 8))
+        self.assertEqual(block[:, 0].tolist(), [0, 1, 2])
+        self.assertIsNone(follower.poll())
+
+        self.append(',0,0,0,1\n' + rows(4, 2))
+        block = follower.poll()
+        self.assertEqual(block[:, 0].tolist(), [3, 4, 5])
+        self.assertEqual(block[0, 1], 6)
+
+        # rewritten file
+        with open(self.fn, 'w') as file:
+            file.write(HEADER + rows(10, 1))
+        block = follower.poll()
+        self.assertEqual(block[:, 0].tolist(), [10])
+
+    def test_max_read(self):
+        self.append(HEADER + rows(0, 100))
+        follower = CSVSpatialFormat.follow(self.fn, max_read=200)
+        blocks = []
+        for _ in range(100):
+            block = follower.poll()
+            if block is not None:
+                self.assertTrue(len(block) * len(rows(0, 1)) <= 200)
+                blocks.append(block)
+        self.assertTrue(len(blocks) > 1)
+        self.assertEqual(np.concatenate(blocks)[:, 0].tolist(), list(range(100)))
+
+        # a line longer than max_read is read completely
+        follower = CSVSpatialFormat.follow(self.fn, max_read=4)
+        self.assertIsNone(follower.poll())
+        self.assertEqual(follower.poll()[:, 0].tolist(), [0])
+
+    def test_unknown_header(self):
+        follower = CSVSpatialFormat.follow(self.fn)
+        self.append('a,b,c\n1,2,3\n')
+        self.assertRaises(ValueError, follower.poll)
+        # reported once, also while the file grows
+        self.assertIsNone(follower.poll())
+        self.append('4,5,6\n')
+        self.assertIsNone(follower.poll())
+        self.assertIsNone(follower.layout)
+
+        # rewritten with another unknown header, then with a known one
+        with open(self.fn, 'w') as file:
+            file.write('x,y\n')
+        self.assertRaises(ValueError, follower.poll)
+        with open(self.fn, 'w') as file:
+            file.write(HEADER + rows(0, 2))
+        self.assertEqual(follower.poll()[:, 0].tolist(), [0, 1])
+        self.assertIsNone(follower.bad_header)
+
+        # follow() propagates the error
+        os.remove(self.fn)
+        self.append('a,b,c\n')
+        follower = CSVSpatialFormat.follow(self.fn, poll_interval=0.01)
+        self.assertRaises(ValueError, follower.follow, lambda block: None, 0.1)
+
+    def test_follow(self):
+        self.append(HEADER + rows(0, 5))
+        blocks = []
+        follower = CSVSpatialFormat.follow(self.fn, poll_interval=0.01)
+        follower.follow(blocks.append, timeout=0.05)
+        self.assertEqual(sum(len(b) for b in blocks), 5)
+
+        async def consume():
+            received = []
+            async for block in follower:
+                received.append(block)
+                if len(received) == 1:
+                    self.append(rows(5, 2))
+                else:
+                    follower.stop()
+            return received
+
+        self.append(rows(5, 1))
+        received = asyncio.run(consume())
+        self.assertEqual([b[:, 0].tolist() for b in received], [[5], [5, 6]])
+
+    def test_benchmark_poll(self):
+        # the cost of a poll depends on the appended rows only, not on the length of the file
+        self.append(HEADER)
+        follower = CSVSpatialFormat.follow(self.fn)
+        for n_rows in [1000, BENCH_ROWS]:
+            self.append(rows(0, n_rows))
+            follower.poll()
+            self.append(rows(0, 100))
+            t_start = time.perf_counter()
+            block = follower.poll()
+            t_elapsed = time.perf_counter() - t_start
+            self.assertEqual(len(block), 100)
+            print('file rows: %d, poll of 100 new rows: %.3f ms' % (n_rows, t_elapsed * 1e3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -97,6 +97,36 @@ class CSVFormat_Test(unittest.TestCase):
         print('identify_format:' + str(fmt))
         self.assertTrue(fmt == CSVSpatialFormatType.PoseWithCov)
 
+    def test_header_to_format_type(self):
+        h2f = CSVSpatialFormatType.header_to_format_type
+        self.assertTrue(h2f('t, tx ,ty,tz') == CSVSpatialFormatType.PositionStamped)
+        self.assertTrue(h2f('tz,ty,tx,t') == CSVSpatialFormatType.PositionStamped)
+        self.assertTrue(h2f('#t,tx,ty,tz,qx,qy,qz,qw') == CSVSpatialFormatType.TUM)
+        self.assertTrue(h2f('t,tx,tx,tz') == CSVSpatialFormatType.none)
+        self.assertTrue(h2f('no format') == CSVSpatialFormatType.none)
+        for type in CSVSpatialFormatType.list():
+            if type != str(CSVSpatialFormatType.none):
+                header = ','.join(CSVSpatialFormatType.get_header(type))
+                fmt = CSVSpatialFormatType.header_to_format_type(header)
+                self.assertTrue(CSVSpatialFormatType.get_header(fmt) == CSVSpatialFormatType.get_header(type))
+
+    def test_identify_with_types(self):
+        fmt, est_err, err_rep = CSVSpatialFormatType.identify_format_with_types(
+            str(SAMPLE_DATA_DIR + '/ID1-pose-est-posorient-cov-type2-thetaq.csv'))
+        self.assertTrue(fmt == CSVSpatialFormatType.PosOrientWithCovTyped)
+        self.assertTrue(est_err == EstimationErrorType.type2)
+        self.assertTrue(err_rep == ErrorRepresentationType.theta_q)
+
+        fmts = CSVSpatialFormatType.identify_formats([
+            str(SAMPLE_DATA_DIR + '/ID1-pose-gt.csv'),
+            str(SAMPLE_DATA_DIR + '/ID1-pose-est-posorient-cov-type1-thetaR-anyorder.csv'),
+            str(SAMPLE_DATA_DIR + '/212341234.csv')])
+        print('identify_formats:' + str(fmts))
+        self.assertTrue(fmts[0] == (CSVSpatialFormatType.PoseStamped, EstimationErrorType.none,
+                                    ErrorRepresentationType.none))
+        self.assertTrue(fmts[1] == (CSVSpatialFormatType.PosOrientWithCovTyped, EstimationErrorType.type1,
+                                    ErrorRepresentationType.theta_R))
+        self.assertTrue(fmts[2][0] == CSVSpatialFormatType.none)
 
 
 if __name__ == '__main__':
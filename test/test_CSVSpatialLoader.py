@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import time
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from cnspy_spatial_csv_formats.CSVSpatialLoader import CSVSpatialLoader
+from cnspy_spatial_csv_formats.CSVSpatialFormat import CSVSpatialFormat
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType
+from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
+
+SAMPLE_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_data')
+
+
+class CSVSpatialLoader_Test(unittest.TestCase):
+    def test_expand(self):
+        files = CSVSpatialLoader.expand(SAMPLE_DATA_DIR)
+        self.assertTrue(str(SAMPLE_DATA_DIR + '/ID1-pose-gt.csv') in files)
+        files = CSVSpatialLoader.expand([str(SAMPLE_DATA_DIR + '/ID1-*.csv'), str(SAMPLE_DATA_DIR + '/t_est.csv')])
+        self.assertTrue(str(SAMPLE_DATA_DIR + '/t_est.csv') in files)
+        self.assertFalse(str(SAMPLE_DATA_DIR + '/example_eval.csv') in files)
+
+    def test_load(self):
+        for max_workers in [1, 2]:
+            results = CSVSpatialLoader(max_workers=max_workers, chunksize=2).load(SAMPLE_DATA_DIR)
+            self.assertEqual(list(results.keys()), CSVSpatialLoader.expand(SAMPLE_DATA_DIR))
+
+            res = results[str(SAMPLE_DATA_DIR + '/ID1-pose-gt.csv')]
+            self.assertTrue(res.ok())
+            self.assertTrue(res.fmt.type == CSVSpatialFormatType.PoseStamped)
+            _, data = CSVSpatialFormat.read_array(res.fn)
+            self.assertTrue(np.array_equal(res.data, data))
+
+            res = results[str(SAMPLE_DATA_DIR + '/ID1-pose-est-posorient-cov-type1-thetaR.csv')]
+            self.assertTrue(res.fmt.estimation_error_type == EstimationErrorType.type1)
+
+            res = results[str(SAMPLE_DATA_DIR + '/example_eval.csv')]
+            print('error: ' + str(res.error))
+            self.assertFalse(res.ok())
+            self.assertTrue(res.data is None)
+
+        results = CSVSpatialLoader(max_workers=1).load(str(SAMPLE_DATA_DIR + '/212341234.csv'))
+        self.assertTrue('FileNotFoundError' in results[str(SAMPLE_DATA_DIR + '/212341234.csv')].error)
+
+    def test_benchmark_workers(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            for i in range(16):
+                shutil.copy(str(SAMPLE_DATA_DIR + '/ID1-pose-est.csv'), os.path.join(tmp_dir, 'run%02d.csv' % i))
+            for max_workers in [1, 2, 4]:
+                t_start = time.perf_counter()
+                results = CSVSpatialLoader(max_workers=max_workers).load(tmp_dir)
+                t_elapsed = time.perf_counter() - t_start
+                self.assertEqual(len(results), 16)
+                print('workers: %d, %.3f s' % (max_workers, t_elapsed))
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
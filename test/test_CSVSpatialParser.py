@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import time
+import unittest
+from cnspy_spatial_csv_formats.CSVSpatialParser import CSVSpatialParser
+from cnspy_spatial_csv_formats.CSVSpatialFormat import CSVSpatialFormat
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType, PARSE_TABLE
+from cnspy_spatial_csv_formats.PoseStructsBatch import struct_fields
+from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
+from cnspy_spatial_csv_formats.ErrorRepresentationType import ErrorRepresentationType
+
+SAMPLE_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_data')
+BENCH_ROWS = int(os.environ.get('CNSPY_BENCH_ROWS', '2000'))
+
+
+def sample_line(fmt):
+    # a line with the entries of get_format(fmt): 0.5, 1.5, ...; typed entries 'type1' and 'theta_R'
+    elems = []
+    for i, name in enumerate(CSVSpatialFormatType.get_format(fmt)):
+        if name == 'est_err_type':
+            elems.append('type1')
+        elif name == 'err_representation':
+            elems.append('theta_R')
+        else:
+            elems.append(str(i + 0.5))
+    return ",".join(elems) + "\n"
+
+
+class CSVSpatialParser_Test(unittest.TestCase):
+    def assertStructEqual(self, a, b):
+        self.assertTrue(type(a) == type(b))
+        for name in struct_fields(type(a)):
+            self.assertEqual(getattr(a, name), getattr(b, name))
+
+    def test_parse_all_formats(self):
+        for type in CSVSpatialFormatType.list():
+            if type not in PARSE_TABLE:
+                continue
+            fmt = CSVSpatialFormatType(type)
+            line = sample_line(fmt)
+            parser = CSVSpatialFormat(fmt).get_parser()
+            self.assertStructEqual(parser(line), CSVSpatialFormatType.parse(line, fmt))
+
+        self.assertRaises(ValueError, CSVSpatialParser, CSVSpatialFormatType.PoseErrorStamped)
+
+    def test_parse_typed(self):
+        p = CSVSpatialFormatType.parse(sample_line(CSVSpatialFormatType.PoseWithCovTyped),
+                                       CSVSpatialFormatType.PoseWithCovTyped)
+        self.assertTrue(p.est_err_type == EstimationErrorType.type1)
+        self.assertTrue(p.err_representation == ErrorRepresentationType.theta_R)
+        self.assertEqual(p.Tcc, 28.5)
+
+        # the column count decides if the format is unknown
+        p = CSVSpatialFormatType.parse('1,2,3,4', CSVSpatialFormatType.none)
+        self.assertEqual(p.yaw, 4.0)
+        self.assertTrue(CSVSpatialFormatType.parse('1,2', CSVSpatialFormatType.none) is None)
+
+    def test_parse_anyorder(self):
+        fn_ordered = str(SAMPLE_DATA_DIR + '/ID1-pose-est-posorient-cov-type1-thetaR.csv')
+        fn_any = str(SAMPLE_DATA_DIR + '/ID1-pose-est-posorient-cov-type1-thetaR-anyorder.csv')
+        with open(fn_ordered, "r") as f_ordered, open(fn_any, "r") as f_any:
+            f_ordered.readline()
+            header_parts = f_any.readline().rstrip("\n\r").split(',')
+            parser = CSVSpatialFormat(CSVSpatialFormatType.PosOrientWithCovTyped).get_parser(header_parts)
+            p_ordered = CSVSpatialFormatType.parse(f_ordered.readline(), CSVSpatialFormatType.PosOrientWithCovTyped)
+            p_any = parser(f_any.readline())
+        # the anyorder file names its columns [t,tz,ty,tx,qy,qz,qx,qw,...]
+        self.assertEqual(p_any.tz, p_ordered.tx)
+        self.assertEqual(p_any.qy, p_ordered.qx)
+        self.assertEqual(p_any.qyy, p_ordered.qyy)
+        self.assertTrue(p_any.est_err_type == EstimationErrorType.type1)
+
+    def test_parse_space_separated(self):
+        # e.g. TUM files written by CSVSpatialTranscoder: '#t tx ty tz qx qy qz qw'
+        for fmt in [CSVSpatialFormatType.TUM, CSVSpatialFormatType.PoseWithCovTyped]:
+            line = sample_line(fmt)
+            line_ws = line.replace(',', ' ')
+            expected = CSVSpatialFormatType.parse(line, fmt)
+            self.assertStructEqual(CSVSpatialFormatType.parse(line_ws, fmt), expected)
+            self.assertStructEqual(CSVSpatialFormat(fmt).get_parser(delimiter=None)(line_ws), expected)
+            parser = CSVSpatialParser.from_header(' '.join(CSVSpatialFormatType.get_header(fmt)) + '\n')
+            self.assertEqual(parser.fmt, fmt)
+            self.assertStructEqual(parser(line_ws), expected)
+
+        parser = CSVSpatialParser.from_header('#t ty tx tz qx qy qz qw')
+        self.assertEqual(parser('1 2 3 4 0 0 0 1\n').tx, 3.0)
+        self.assertTrue(CSVSpatialParser.from_header('#attr,lvl') is None)
+
+    def test_benchmark_lines_per_sec(self):
+        n_lines = min(BENCH_ROWS, 50000)
+        for type in CSVSpatialFormatType.list():
+            if type not in PARSE_TABLE:
+                continue
+            fmt = CSVSpatialFormatType(type)
+            lines = [sample_line(fmt)] * n_lines
+
+            t_start = time.perf_counter()
+            for line in lines:
+                CSVSpatialFormatType.parse(line, fmt)
+            t_parse = time.perf_counter() - t_start
+
+            parser = CSVSpatialFormat(fmt).get_parser()
+            t_start = time.perf_counter()
+            for line in lines:
+                parser(line)
+            t_parser = time.perf_counter() - t_start
+            print('%-22s parse(): %9.0f lines/s, get_parser(): %9.0f lines/s'
+                  % (type, n_lines / t_parse, n_lines / t_parser))
+
+
+if __name__ == '__main__':
+    unittest.main()
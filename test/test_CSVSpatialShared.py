@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import sys
+import time
+import pickle
+import shutil
+import tempfile
+import unittest
+import threading
+from multiprocessing import shared_memory, resource_tracker
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from cnspy_spatial_csv_formats.CSVSpatialShared import CSVSpatialSharedTrajectory, CSVSpatialSharedDescriptor, \
+    attach_shared_memory
+from cnspy_spatial_csv_formats.CSVSpatialFormat import CSVSpatialFormat
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType
+from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
+from cnspy_spatial_csv_formats.CSVSpatialBenchmark import CSVSpatialBenchmark
+
+SAMPLE_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_data')
+BENCH_ROWS = int(os.environ.get('CNSPY_BENCH_ROWS', '2000'))
+
+
+def worker_sum(descriptor):
+    traj = CSVSpatialSharedTrajectory.attach(descriptor)
+    try:
+        return traj.data.sum(axis=0), str(traj.get_format().estimation_error_type), traj.data.flags.writeable
+    finally:
+        traj.close()
+
+
+def worker_read(fn):
+    return CSVSpatialFormat.read_array(fn)[1].sum(axis=0)
+
+
+class CSVSpatialShared_Test(unittest.TestCase):
+    def test_create_attach(self):
+        fn = os.path.join(SAMPLE_DATA_DIR, 'ID1-pose-est-posorient-cov-type1-thetaR.csv')
+        fmt, data = CSVSpatialFormat.read_array(fn)
+        with CSVSpatialSharedTrajectory.load(fn) as traj:
+            desc = traj.descriptor
+            self.assertEqual(desc.columns, fmt.get_format())
+            self.assertEqual(desc.shape, data.shape)
+            self.assertEqual(desc.source, fn)
+            self.assertTrue(np.array_equal(traj.data, data))
+            self.assertTrue(len(pickle.dumps(desc)) < 2048)
+
+            reader = CSVSpatialSharedTrajectory.attach(CSVSpatialSharedDescriptor.from_dict(desc.to_dict()))
+            self.assertEqual(reader.get_format().type, CSVSpatialFormatType.PosOrientWithCovTyped)
+            self.assertTrue(np.array_equal(reader.data, data))
+            self.assertFalse(reader.data.flags.writeable)
+            with self.assertRaises(ValueError):
+                reader.data[0, 0] = 1.0
+            reader.close()
+
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                for sums, est_err_type, writeable in executor.map(worker_sum, [desc] * 4):
+                    self.assertTrue(np.allclose(sums, data.sum(axis=0)))
+                    self.assertEqual(est_err_type, str(EstimationErrorType.type1))
+                    self.assertFalse(writeable)
+
+        # unlinked by the owner
+        self.assertTrue(CSVSpatialSharedTrajectory.attach(desc) is None)
+        self.assertTrue(CSVSpatialSharedTrajectory.load(os.path.join(SAMPLE_DATA_DIR, '212341234.csv')) is None)
+
+        fmt = CSVSpatialFormat(CSVSpatialFormatType.PoseStamped)
+        with CSVSpatialSharedTrajectory.create(fmt, np.empty((0, 8))) as traj:
+            self.assertEqual(traj.data.shape, (0, 8))
+
+    def test_attach_threads(self):
+        # segments created by other threads while attaching must still be registered with the resource tracker
+        registered = []
+        register = resource_tracker.register
+
+        def recording_register(name, rtype):
+            registered.append(name.lstrip('/'))
+            register(name, rtype)
+
+        fmt = CSVSpatialFormat(CSVSpatialFormatType.PoseStamped)
+        with CSVSpatialSharedTrajectory.create(fmt, np.zeros((10, 8))) as traj:
+            resource_tracker.register = recording_register
+            created = []
+            try:
+                def attach():
+                    for _ in range(200):
+                        attach_shared_memory(traj.descriptor.name).close()
+
+                def create():
+                    for _ in range(200):
+                        shm = shared_memory.SharedMemory(create=True, size=8)
+                        created.append(shm.name.lstrip('/'))
+                        shm.close()
+                        shm.unlink()
+
+                threads = [threading.Thread(target=attach), threading.Thread(target=attach),
+                           threading.Thread(target=create)]
+                switch_interval = sys.getswitchinterval()
+                sys.setswitchinterval(1e-6)
+                try:
+                    for t in threads:
+                        t.start()
+                    for t in threads:
+                        t.join()
+                finally:
+                    sys.setswitchinterval(switch_interval)
+            finally:
+                resource_tracker.register = register
+            self.assertEqual(resource_tracker.register, register)
+            self.assertEqual(sorted(registered), sorted(created))
+
+    def test_benchmark_workers(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            fn = os.path.join(tmp_dir, 'pose-gt.csv')
+            fmt = CSVSpatialFormatType.PoseStamped
+            data = CSVSpatialBenchmark.synthesize(fmt, BENCH_ROWS)
+            CSVSpatialFormat.from_array(fmt, data).write_array(fn, data)
+            n_tasks = 8
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                t_start = time.perf_counter()
+                list(executor.map(worker_read, [fn] * n_tasks))
+                t_read = time.perf_counter() - t_start
+
+                t_start = time.perf_counter()
+                with CSVSpatialSharedTrajectory.load(fn) as traj:
+                    list(executor.map(worker_sum, [traj.descriptor] * n_tasks))
+                t_shared = time.perf_counter() - t_start
+            print('rows: %d, tasks: %d, parse per task: %.3f s, shared: %.3f s' % (BENCH_ROWS, n_tasks, t_read,
+                                                                                   t_shared))
+        finally:
+            shutil.rmtree(tmp_dir)
+
+if __name__ == '__main__':
+    unittest.main()
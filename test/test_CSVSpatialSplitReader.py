@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import time
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from cnspy_spatial_csv_formats.CSVSpatialSplitReader import CSVSpatialSplitReader
+from cnspy_spatial_csv_formats.CSVSpatialFormat import CSVSpatialFormat
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType
+from cnspy_spatial_csv_formats.CSVSpatialBenchmark import CSVSpatialBenchmark
+from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
+
+SAMPLE_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_data')
+BENCH_ROWS = int(os.environ.get('CNSPY_BENCH_ROWS', '2000'))
+
+
+class CSVSpatialSplitReader_Test(unittest.TestCase):
+    def test_byte_ranges(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            fn = os.path.join(tmp_dir, 'lines.txt')
+            content = b'header\n1\n22\n\n333\n4444'
+            with open(fn, 'wb') as file:
+                file.write(content)
+            with open(fn, 'rb') as file:
+                for n_ranges in range(1, 20):
+                    ranges = CSVSpatialSplitReader.byte_ranges(file, 7, len(content), n_ranges)
+                    self.assertTrue(len(ranges) <= n_ranges)
+                    self.assertEqual(b''.join(content[b:e] for b, e in ranges), content[7:])
+                    self.assertTrue(all(content[b - 1:b] == b'\n' for b, _ in ranges))
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_read(self):
+        for name in ['ID1-pose-gt.csv', 'ID1-pose-est-posorient-cov-type1-thetaR.csv',
+                     'ID1-pose-est-posorient-cov-type1-thetaR-anyorder.csv']:
+            fn = os.path.join(SAMPLE_DATA_DIR, name)
+            fmt, data = CSVSpatialFormat.read_array(fn)
+            for max_workers in [1, 3]:
+                reader = CSVSpatialSplitReader(max_workers=max_workers, min_range_bytes=1000, max_range_bytes=5000)
+                layout, data_split = reader.read(fn)
+                self.assertEqual(layout.fmt, fmt.type)
+                self.assertTrue(np.array_equal(data_split, data))
+
+        fn = os.path.join(SAMPLE_DATA_DIR, 'ID1-pose-est-posorient-cov-type1-thetaR.csv')
+        fmt, data = CSVSpatialFormat.read_array_parallel(fn, max_workers=2)
+        self.assertEqual(fmt.type, CSVSpatialFormatType.PosOrientWithCovTyped)
+        self.assertEqual(fmt.estimation_error_type, EstimationErrorType.type1)
+        self.assertTrue(np.array_equal(data, CSVSpatialFormat.read_array(fn)[1]))
+
+        fmt, data = CSVSpatialFormat.read_array_parallel(os.path.join(SAMPLE_DATA_DIR, '212341234.csv'))
+        self.assertTrue(data is None)
+
+    def test_benchmark_speedup(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            fn = os.path.join(tmp_dir, 'pose-cov.csv')
+            fmt = CSVSpatialFormatType.PoseWithCovTyped
+            data = CSVSpatialBenchmark.synthesize(fmt, BENCH_ROWS)
+            csv_fmt = CSVSpatialFormat.from_array(fmt, data)
+            csv_fmt.write_array(fn, data)
+            _, data = CSVSpatialFormat.read_array(fn)
+
+            t_start = time.perf_counter()
+            CSVSpatialFormat.read_array(fn)
+            t_base = time.perf_counter() - t_start
+            print('cores: %d, rows: %d, read_array: %.3f s' % (os.cpu_count() or 1, BENCH_ROWS, t_base))
+            for max_workers in [1, 2, 4]:
+                reader = CSVSpatialSplitReader(max_workers=max_workers, min_range_bytes=1 << 16)
+                t_start = time.perf_counter()
+                _, data_split = reader.read(fn)
+                t_elapsed = time.perf_counter() - t_start
+                self.assertTrue(np.array_equal(data_split, data))
+                print('workers: %d, %.3f s, speedup: %.2f' % (max_workers, t_elapsed, t_base / t_elapsed))
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
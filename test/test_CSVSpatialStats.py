@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import json
+import time
+import unittest
+import cnspy_spatial_csv_formats.PoseStructs as ps
+from cnspy_spatial_csv_formats.CSVSpatialStats import CSVSpatialStats
+from cnspy_spatial_csv_formats.CSVSpatialFormat import CSVSpatialFormat
+from cnspy_spatial_csv_formats.PoseStructsBatch import PoseStructsBatch
+
+SAMPLE_DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), 'sample_data'))
+
+
+class CSVSpatialStats_Test(unittest.TestCase):
+    def test_read(self):
+        fn = os.path.join(SAMPLE_DATA_DIR, 'ID1-pose-est-posorient-cov-type1-thetaR.csv')
+        events = []
+        with CSVSpatialStats(callback=events.append) as stats:
+            self.assertIs(CSVSpatialStats.active, stats)
+            CSVSpatialFormat.identify_format(fn)
+            fmt, data = CSVSpatialFormat.read_array(fn)
+        self.assertIsNone(CSVSpatialStats.active)
+
+        rec = stats.files[fn]
+        self.assertEqual(rec['fmt'], 'PosOrientWithCovTyped')
+        self.assertEqual(set(rec['stages'].keys()), {'identify', 'io', 'parse'})
+        self.assertEqual(rec['rows'], len(data))
+        self.assertEqual(rec['bytes'], os.path.getsize(fn))
+        self.assertEqual(rec['rows_rejected'], 0)
+        self.assertEqual([e['stage'] for e in events], ['identify', 'io', 'parse'])
+        self.assertEqual(json.loads(stats.to_json())['files'][0]['rows'], len(data))
+
+        # disabled: nothing is recorded
+        CSVSpatialFormat.read_array(fn)
+        self.assertEqual(len(events), 3)
+
+    def test_chunks_and_structs(self):
+        fn = os.path.join(SAMPLE_DATA_DIR, 'ID1-pose-gt.csv')
+        _, data = CSVSpatialFormat.read_array(fn)
+        t_min, t_max = data[10, 0], data[100, 0]
+        stats = CSVSpatialStats.enable()
+        try:
+            blocks = list(CSVSpatialFormat.iter_chunks(fn, chunk_size=64, t_min=t_min, t_max=t_max))
+            PoseStructsBatch(ps.sTUMPoseStamped, data=data[0:50]).to_structs()
+        finally:
+            self.assertIs(CSVSpatialStats.disable(), stats)
+
+        rec = stats.files[fn]
+        n_rows = sum(len(b) for b in blocks)
+        self.assertEqual(rec['rows'], n_rows)
+        self.assertEqual(rec['rows'] + rec['rows_rejected'], len(data))
+        self.assertEqual(rec['bytes'], os.path.getsize(fn))
+        self.assertEqual(stats.files['<sTUMPoseStamped>']['rows'], 50)
+        self.assertTrue(stats.total('structs') > 0)
+        self.assertAlmostEqual(stats.total(), sum(sum(r['stages'].values()) for r in stats.files.values()))
+
+    def test_benchmark_overhead(self):
+        fn = os.path.join(SAMPLE_DATA_DIR, 'ID1-pose-est-posorient-cov-type1-thetaR.csv')
+        times = []
+        for enabled in [False, True]:
+            stats = CSVSpatialStats.enable() if enabled else None
+            t_start = time.perf_counter()
+            for _ in range(20):
+                CSVSpatialFormat.read_array(fn)
+            times.append(time.perf_counter() - t_start)
+            CSVSpatialStats.disable()
+            if stats is not None:
+                print('stages: ' + str(stats.files[fn]['stages']))
+        print('read_array x20: disabled %.3f s, enabled %.3f s' % tuple(times))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import time
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from cnspy_spatial_csv_formats.CSVSpatialTimeIndex import CSVSpatialTimeIndex
+from cnspy_spatial_csv_formats.CSVSpatialFormat import CSVSpatialFormat
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType
+
+SAMPLE_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_data')
+BENCH_ROWS = int(os.environ.get('CNSPY_BENCH_ROWS', '2000'))
+
+
+class CSVSpatialTimeIndex_Test(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.fn = os.path.join(self.tmp_dir, 'ID1-pose-gt.csv')
+        shutil.copy(str(SAMPLE_DATA_DIR + '/ID1-pose-gt.csv'), self.fn)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_query(self):
+        _, data = CSVSpatialFormat.read_array(self.fn)
+        index = CSVSpatialTimeIndex.build(self.fn, stride=100)
+        self.assertEqual(len(index.t), (len(data) + 99) // 100)
+
+        for t_min, t_max in [(data[0, 0], data[-1, 0]), (data[123, 0], data[456, 0]), (0.0123, 0.0456),
+                             (data[-1, 0], 1e9), (-1.0, data[0, 0]), (1e9, 2e9), (-2.0, -1.0), (5.0, 4.0)]:
+            expected = data[(data[:, 0] >= t_min) & (data[:, 0] <= t_max)]
+            self.assertTrue(np.array_equal(index.query(t_min, t_max), expected))
+
+    def test_persist(self):
+        fmt, data = CSVSpatialFormat.read_time_range(self.fn, 1.0, 2.0, stride=64)
+        self.assertTrue(fmt.type == CSVSpatialFormatType.PoseStamped)
+        self.assertTrue(np.all((data[:, 0] >= 1.0) & (data[:, 0] <= 2.0)))
+        self.assertTrue(os.path.exists(CSVSpatialTimeIndex.index_fn(self.fn)))
+
+        index = CSVSpatialTimeIndex.load(self.fn, stride=64)
+        self.assertEqual(index.stride, 64)
+
+        # a modified CSV file invalidates the index
+        with open(self.fn, "a") as file:
+            file.write('1000.0,1,2,3,0,0,0,1\n')
+        stat = os.stat(self.fn)
+        os.utime(self.fn, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        fmt, data = CSVSpatialFormat.read_time_range(self.fn, 999.0, 1001.0, stride=64)
+        self.assertEqual(len(data), 1)
+
+    def test_persist_space_separated(self):
+        fn = os.path.join(self.tmp_dir, 'tum.txt')
+        with open(fn, "w") as file:
+            file.write('#t tx ty tz qx qy qz qw\n')
+            for i in range(100):
+                file.write('%d 1 2 3 0 0 0 1\n' % i)
+        for _ in range(2):
+            index = CSVSpatialTimeIndex.load(fn, stride=16)
+            self.assertEqual(index.layout.delimiter, None)
+            data = index.query(10, 20)
+            self.assertEqual(data.shape, (11, 8))
+            self.assertTrue(np.array_equal(data[:, 0], np.arange(10, 21)))
+
+    def test_unsorted(self):
+        fn = os.path.join(self.tmp_dir, 'unsorted.csv')
+        with open(fn, "w") as file:
+            file.write('t,tx,ty,tz\n2,0,0,0\n1,0,0,0\n')
+        self.assertTrue(CSVSpatialTimeIndex.build(fn, stride=1) is None)
+
+    def test_benchmark_query(self):
+        with open(self.fn, "r") as file:
+            header = file.readline()
+            lines = file.readlines()
+        fn = os.path.join(self.tmp_dir, 'scaled.csv')
+        with open(fn, "w") as file:
+            file.write(header)
+            for k in range(max(1, BENCH_ROWS // len(lines))):
+                t_offset = k * 100.0
+                file.writelines('%.6f,%s' % (float(line.partition(',')[0]) + t_offset, line.partition(',')[2])
+                                for line in lines)
+
+        t_start = time.perf_counter()
+        index = CSVSpatialTimeIndex.load(fn)
+        t_build = time.perf_counter() - t_start
+        t_start = time.perf_counter()
+        data = index.query(50.0, 50.5)
+        t_query = time.perf_counter() - t_start
+        t_start = time.perf_counter()
+        fmt, data_all = CSVSpatialFormat.read_array(fn)
+        t_read = time.perf_counter() - t_start
+        self.assertEqual(len(data), np.count_nonzero((data_all[:, 0] >= 50.0) & (data_all[:, 0] <= 50.5)))
+        print('rows: %d, index build: %.3f s, query: %.4f s, read_array: %.3f s'
+              % (len(data_all), t_build, t_query, t_read))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+import subprocess
+import tracemalloc
+import numpy as np
+from cnspy_spatial_csv_formats.CSVSpatialTranscoder import CSVSpatialTranscoder
+from cnspy_spatial_csv_formats.CSVSpatialFormat import CSVSpatialFormat
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType
+from cnspy_spatial_csv_formats.CSVSpatialBenchmark import CSVSpatialBenchmark
+from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
+from cnspy_spatial_csv_formats.ErrorRepresentationType import ErrorRepresentationType
+
+SAMPLE_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_data')
+BENCH_ROWS = int(os.environ.get('CNSPY_BENCH_ROWS', '2000'))
+
+
+class CSVSpatialTranscoder_Test(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_transcode(self):
+        fn = os.path.join(SAMPLE_DATA_DIR, 'ID1-pose-est-posorient-cov-type1-thetaR-anyorder.csv')
+        src_fmt, data = CSVSpatialFormat.read_array(fn)
+        columns = src_fmt.get_format()
+
+        # dropping columns
+        out_fn = os.path.join(self.tmp_dir, 'posorient.csv')
+        n_rows = CSVSpatialTranscoder.transcode(fn, out_fn, 'PosOrientWithCov', chunk_size=100)
+        self.assertEqual(n_rows, len(data))
+        fmt, data_out = CSVSpatialFormat.read_array(out_fn)
+        self.assertEqual(fmt.type, CSVSpatialFormatType.PosOrientWithCov)
+        self.assertTrue(np.array_equal(data_out, data[:, [columns.index(c) for c in fmt.get_format()]]))
+
+        # space-separated TUM
+        tum_fn = os.path.join(self.tmp_dir, 'traj.tum')
+        CSVSpatialTranscoder.transcode(out_fn, tum_fn, 'TUM', chunk_size=100)
+        with open(tum_fn, "r") as file:
+            self.assertEqual(file.readline(), '#t tx ty tz qx qy qz qw\n')
+            self.assertEqual(len(file.readline().split(' ')), 8)
+        fmt, data_tum = CSVSpatialFormat.read_array(tum_fn)
+        self.assertEqual(fmt.type, CSVSpatialFormatType.TUM)
+        self.assertTrue(np.array_equal(data_tum, data[:, 0:8]))
+        blocks = list(CSVSpatialFormat.iter_chunks(tum_fn, 1, t_min=data_tum[1, 0]))
+        self.assertTrue(np.array_equal(np.concatenate(blocks), data_tum[1:]))
+
+        # adding the typed columns
+        typed_fn = os.path.join(self.tmp_dir, 'typed.csv')
+        dst_fmt = CSVSpatialFormat(CSVSpatialFormatType.PosOrientWithCovTyped, est_err_type=EstimationErrorType.type2,
+                                   err_rep_type=ErrorRepresentationType.theta_q)
+        CSVSpatialTranscoder.transcode(out_fn, typed_fn, dst_fmt)
+        fmt = CSVSpatialFormat.identify_format(typed_fn)
+        self.assertEqual(fmt.estimation_error_type, EstimationErrorType.type2)
+        self.assertEqual(fmt.rotation_error_representation, ErrorRepresentationType.theta_q)
+        _, data_typed = CSVSpatialFormat.read_array(typed_fn)
+        self.assertTrue(np.array_equal(data_typed[:, 0:-2], data_out))
+
+        with self.assertRaises(ValueError):
+            CSVSpatialTranscoder.transcode(tum_fn, typed_fn, 'PoseWithCov')
+        self.assertTrue(CSVSpatialTranscoder.transcode(os.path.join(SAMPLE_DATA_DIR, 'example_eval.csv'), typed_fn,
+                                                       'TUM') is None)
+
+    def test_main(self):
+        fn = os.path.join(SAMPLE_DATA_DIR, 'ID1-pose-est-posorient-cov-type1-thetaR.csv')
+        out_fn = os.path.join(self.tmp_dir, 'out.csv')
+        res = subprocess.run([sys.executable, '-m', 'cnspy_spatial_csv_formats.CSVSpatialTranscoder', fn, out_fn,
+                              '--format', 'PoseStamped', '--precision', '6'], capture_output=True, text=True)
+        self.assertEqual(res.returncode, 0)
+        fmt, data = CSVSpatialFormat.read_array(out_fn)
+        self.assertEqual(fmt.type, CSVSpatialFormatType.PoseStamped)
+        self.assertTrue(np.allclose(data, CSVSpatialFormat.read_array(fn)[1][:, 0:8], rtol=1e-5, atol=1e-6))
+
+        # the typed columns of the source are not relabeled
+        typed_fn = os.path.join(self.tmp_dir, 'typed.csv')
+        for args, returncode in [(['--est-err-type', 'type2'], 1), (['--err-rep', 'theta_q'], 1),
+                                 (['--est-err-type', 'type1', '--err-rep', 'theta_R'], 0)]:
+            res = subprocess.run([sys.executable, '-m', 'cnspy_spatial_csv_formats.CSVSpatialTranscoder', fn, typed_fn,
+                                  '--format', 'PosOrientWithCovTyped'] + args, capture_output=True, text=True)
+            self.assertEqual(res.returncode, returncode)
+            self.assertEqual(os.path.exists(typed_fn), returncode == 0)
+            if returncode:
+                self.assertTrue('CovariancePropagator' in res.stdout)
+        fmt = CSVSpatialFormat.identify_format(typed_fn)
+        self.assertEqual(fmt.estimation_error_type, EstimationErrorType.type1)
+
+    def test_peak_memory(self):
+        # the peak memory depends on the chunk size only: a 4x larger file needs less than one more chunk of text
+        fmt = CSVSpatialFormatType.PoseWithCovTyped
+        chunk_size = 64
+        peaks = []
+        for n_rows in [500, 2000]:
+            fn = os.path.join(self.tmp_dir, 'pose-cov-%d.csv' % n_rows)
+            data = CSVSpatialBenchmark.synthesize(fmt, n_rows)
+            CSVSpatialFormat.from_array(fmt, data).write_array(fn, data)
+            line_bytes = os.path.getsize(fn) / n_rows
+            tracemalloc.start()
+            CSVSpatialTranscoder.transcode(fn, os.path.join(self.tmp_dir, 'out.csv'), 'TUM', chunk_size=chunk_size)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        print('peak: %d bytes (%d rows), %d bytes (%d rows)' % (peaks[0], 500, peaks[1], 2000))
+        self.assertTrue(peaks[1] - peaks[0] < chunk_size * line_bytes)
+
+    def test_benchmark_transcode(self):
+        fn = os.path.join(self.tmp_dir, 'pose-cov.csv')
+        fmt = CSVSpatialFormatType.PoseWithCovTyped
+        data = CSVSpatialBenchmark.synthesize(fmt, BENCH_ROWS)
+        CSVSpatialFormat.from_array(fmt, data).write_array(fn, data)
+        for dst in ['PoseStamped', 'TUM']:
+            out_fn = os.path.join(self.tmp_dir, 'out-' + dst)
+            tracemalloc.start()
+            t_start = time.perf_counter()
+            n_rows = CSVSpatialTranscoder.transcode(fn, out_fn, dst, chunk_size=8192)
+            t_elapsed = time.perf_counter() - t_start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            self.assertEqual(n_rows, BENCH_ROWS)
+            print('%s -> %s rows: %d, %.3f s, %.0f rows/s, file: %.2f MB, peak: %.2f MB' %
+                  (fmt, dst, n_rows, t_elapsed, n_rows / t_elapsed, os.path.getsize(fn) * 1e-6, peak * 1e-6))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import time
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from cnspy_spatial_csv_formats.CSVSpatialValidator import CSVSpatialValidator
+from cnspy_spatial_csv_formats.CSVSpatialFormat import CSVSpatialFormat
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType
+from cnspy_spatial_csv_formats.CSVSpatialBenchmark import CSVSpatialBenchmark
+from cnspy_spatial_csv_formats.CovarianceMatrix import CovarianceMatrix
+
+SAMPLE_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_data')
+BENCH_ROWS = int(os.environ.get('CNSPY_BENCH_ROWS', '2000'))
+
+
+def valid_block(fmt, n_rows, seed=0):
+    # synthesized trajectory with random positive definite covariances
+    data = CSVSpatialBenchmark.synthesize(fmt, n_rows, seed=seed)
+    rng = np.random.default_rng(seed)
+    for i, n, _ in CovarianceMatrix.blocks(fmt):
+        A = rng.standard_normal((n_rows, n, n))
+        P = A @ A.transpose(0, 2, 1) + 0.1 * np.eye(n)
+        data[:, i:i + CovarianceMatrix.tri_size(n)] = CovarianceMatrix.full_to_tri(P)
+    return data
+
+
+class CSVSpatialValidator_Test(unittest.TestCase):
+    def test_validate(self):
+        for fmt in [CSVSpatialFormatType.PoseWithCovTyped, CSVSpatialFormatType.PosOrientWithCov]:
+            data = valid_block(fmt, 200)
+            self.assertTrue(CSVSpatialValidator.validate(fmt, data).ok())
+
+            columns = CSVSpatialFormatType.get_format(fmt)
+            data[10, columns.index('tx')] = np.nan
+            data[20, 0] = data[19, 0]
+            data[30, 0] = data[28, 0]
+            data[40, columns.index('qx'):columns.index('qw') + 1] = [0.0, 0.0, 0.0, 1.1]
+            P = CovarianceMatrix.unpack_blocks(fmt, data[50:51])[-1][0]
+            w, V = np.linalg.eigh(P)
+            w[0] = -1.0
+            i, n, _ = CovarianceMatrix.blocks(fmt)[-1]
+            data[50, i:i + CovarianceMatrix.tri_size(n)] = CovarianceMatrix.full_to_tri((V * w) @ V.T)
+            # positive semi-definite, but singular
+            data[60, i:i + CovarianceMatrix.tri_size(n)] = 0.0
+
+            report = CSVSpatialValidator.validate(fmt, data)
+            self.assertFalse(report.ok())
+            self.assertEqual(report.n_rows, 200)
+            self.assertEqual(report.get('nan').tolist(), [10])
+            self.assertEqual(report.get('timestamps').tolist(), [20, 30])
+            self.assertEqual(report.get('quaternion').tolist(), [40])
+            self.assertEqual(report.get('covariance').tolist(), [50])
+            self.assertEqual(CSVSpatialValidator.validate(fmt, data, strict=False).get('timestamps').tolist(), [30])
+
+            # streaming: the same report for any chunking
+            for chunk_size in [1, 7, 30]:
+                validator = CSVSpatialValidator(fmt)
+                for start in range(0, len(data), chunk_size):
+                    validator.feed(data[start:start + chunk_size])
+                self.assertEqual(validator.report.to_dict(), report.to_dict())
+
+            # a NaN timestamp: the next row is compared with the previous finite row
+            data_nan = data.copy()
+            data_nan[70, 0] = np.nan
+            data_nan[71, 0] = data_nan[69, 0]
+            data_nan[80, 0] = np.inf
+            report_nan = CSVSpatialValidator.validate(fmt, data_nan)
+            self.assertEqual(report_nan.get('nan').tolist(), [10, 70, 80])
+            self.assertEqual(report_nan.get('timestamps').tolist(), [20, 30, 71])
+            validator = CSVSpatialValidator(fmt)
+            for start in range(0, len(data), 10):
+                validator.feed(data_nan[start:start + 10])
+            self.assertEqual(validator.report.to_dict(), report_nan.to_dict())
+
+            report = CSVSpatialValidator.validate(fmt, data, max_indices=1)
+            self.assertEqual(report.counts['timestamps'], 2)
+            self.assertEqual(report.get('timestamps').tolist(), [20])
+
+    def test_validate_file(self):
+        fn = os.path.join(SAMPLE_DATA_DIR, 'ID1-pose-gt.csv')
+        _, data = CSVSpatialFormat.read_array(fn)
+        report = CSVSpatialFormat.validate(fn, chunk_size=1000)
+        print(report)
+        self.assertEqual(report.fmt, CSVSpatialFormatType.PoseStamped)
+        self.assertEqual(report.n_rows, len(data))
+        expected = np.flatnonzero(np.diff(data[:, 0]) <= 0) + 1
+        self.assertEqual(report.counts['timestamps'], len(expected))
+        self.assertTrue(np.array_equal(report.get('timestamps'), expected[0:1000]))
+        self.assertEqual(report.counts['quaternion'], 0)
+
+        self.assertTrue(CSVSpatialFormat.validate(os.path.join(SAMPLE_DATA_DIR, 'test-posewithcov2csv.csv')).ok())
+        self.assertTrue(CSVSpatialFormat.validate(os.path.join(SAMPLE_DATA_DIR, 'example_eval.csv')) is None)
+
+    def test_benchmark_validate(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            fn = os.path.join(tmp_dir, 'pose-cov.csv')
+            fmt = CSVSpatialFormatType.PoseWithCovTyped
+            data = valid_block(fmt, BENCH_ROWS)
+            CSVSpatialFormat.from_array(fmt, data).write_array(fn, data)
+
+            t_start = time.perf_counter()
+            n_rows = sum(len(block) for block in CSVSpatialFormat.iter_chunks(fn))
+            t_read = time.perf_counter() - t_start
+            t_start = time.perf_counter()
+            report = CSVSpatialFormat.validate(fn)
+            t_validate = time.perf_counter() - t_start
+            self.assertTrue(report.ok())
+            self.assertEqual(report.n_rows, n_rows)
+
+            data[::2, 8] = -1.0
+            t_start = time.perf_counter()
+            CSVSpatialValidator.validate(fmt, data)
+            t_eig = time.perf_counter() - t_start
+            print('rows: %d, iter_chunks: %.3f s, validate_file: %.3f s (%.0f%%), checks with eigvalsh: %.3f s' %
+                  (n_rows, t_read, t_validate, 100.0 * t_validate / t_read, t_eig))
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import time
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import cnspy_spatial_csv_formats.PoseStructs as ps
+from cnspy_spatial_csv_formats.CSVSpatialWriter import CSVSpatialWriter
+from cnspy_spatial_csv_formats.CSVSpatialFormat import CSVSpatialFormat
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType
+from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
+from cnspy_spatial_csv_formats.ErrorRepresentationType import ErrorRepresentationType
+from cnspy_spatial_csv_formats.PoseStructsBatch import PoseStructsBatch
+
+SAMPLE_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_data')
+BENCH_ROWS = int(os.environ.get('CNSPY_BENCH_ROWS', '2000'))
+
+
+def random_block(fmt, n_rows, seed=0):
+    # random block with valid codes in the typed columns
+    rng = np.random.default_rng(seed)
+    columns = CSVSpatialFormatType.get_format(fmt.type)
+    data = rng.standard_normal((n_rows, len(columns)))
+    if 'est_err_type' in columns:
+        data[:, columns.index('est_err_type')] = fmt.estimation_error_type.code()
+    if 'err_representation' in columns:
+        data[:, columns.index('err_representation')] = fmt.rotation_error_representation.code()
+    return data
+
+
+class CSVSpatialWriter_Test(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_roundtrip(self):
+        for fn in ['ID1-pose-gt.csv', 'ID1-pose-est-posorient-cov-type2-thetaq.csv', 'test-posewithcov2csv.csv']:
+            fmt, data = CSVSpatialFormat.read_array(str(SAMPLE_DATA_DIR + '/' + fn))
+            fn_out = os.path.join(self.tmp_dir, fn)
+            fmt.write_array(fn_out, data)
+            fmt_out, data_out = CSVSpatialFormat.read_array(fn_out)
+            self.assertTrue(fmt_out.type == fmt.type)
+            self.assertTrue(fmt_out.estimation_error_type == fmt.estimation_error_type)
+            self.assertTrue(np.array_equal(data, data_out))
+
+        with open(os.path.join(self.tmp_dir, 'ID1-pose-est-posorient-cov-type2-thetaq.csv'), "r") as file:
+            file.readline()
+            self.assertTrue(file.readline().rstrip('\n').endswith(',type2,theta_q'))
+
+    def test_precision(self):
+        fmt = CSVSpatialFormat(CSVSpatialFormatType.PositionStamped)
+        writer = CSVSpatialWriter(fmt, precision=3)
+        self.assertEqual(writer.header(), 't,tx,ty,tz\n')
+        self.assertEqual(writer.format_rows(np.array([[0.123456, 1, -2.5e-7, 1e3]])), '0.123,1,-2.5e-07,1e+03\n')
+        self.assertEqual(writer.format_rows(np.empty((0, 4))), '')
+
+    def test_structs(self):
+        fmt = CSVSpatialFormat(CSVSpatialFormatType.PoseWithCovTyped, est_err_type=EstimationErrorType.type5,
+                               err_rep_type=ErrorRepresentationType.rpy_degree)
+        structs = [ps.sTUMPoseWithCovStampedTyped(vec=[float(i + k) for i in range(29)], est_type='type5',
+                                                  err_repr='rpy_degree') for k in range(3)]
+        fn_out = os.path.join(self.tmp_dir, 'structs.csv')
+        fmt.write_array(fn_out, structs)
+        fmt_out, data = CSVSpatialFormat.read_array(fn_out)
+        self.assertTrue(fmt_out.rotation_error_representation == ErrorRepresentationType.rpy_degree)
+        self.assertTrue(np.array_equal(data, PoseStructsBatch.from_structs(structs).data))
+
+        fmt.write_array(fn_out, PoseStructsBatch.from_structs(structs))
+        _, data_batch = CSVSpatialFormat.read_array(fn_out)
+        self.assertTrue(np.array_equal(data, data_batch))
+
+        # Hamilton order (qw first) is reordered to the columns of the format
+        CSVSpatialFormat(CSVSpatialFormatType.PoseStamped).write_array(
+            fn_out, [ps.sPoseStamped(vec=[0, 1, 2, 3, 1.0, 0.1, 0.2, 0.3])])
+        fmt_out, data = CSVSpatialFormat.read_array(fn_out)
+        self.assertEqual(fmt_out.get_format(), ['t', 'tx', 'ty', 'tz', 'qx', 'qy', 'qz', 'qw'])
+        self.assertTrue(np.array_equal(data, [[0, 1, 2, 3, 0.1, 0.2, 0.3, 1.0]]))
+        with self.assertRaises(ValueError):
+            CSVSpatialFormat(CSVSpatialFormatType.PositionStamped).write_array(fn_out, structs)
+
+    def test_benchmark_write(self):
+        fmt = CSVSpatialFormat(CSVSpatialFormatType.PoseWithCovTyped, est_err_type=EstimationErrorType.type1,
+                               err_rep_type=ErrorRepresentationType.theta_R)
+        data = random_block(fmt, BENCH_ROWS)
+        fn_out = os.path.join(self.tmp_dir, 'bench.csv')
+
+        t_start = time.perf_counter()
+        with open(fn_out, "w") as file:
+            for row in data:
+                file.write(",".join(str(x) for x in row[0:29]) + ",type1,theta_R\n")
+        t_loop = time.perf_counter() - t_start
+
+        for precision in [None, 9]:
+            t_start = time.perf_counter()
+            fmt.write_array(fn_out, data, precision=precision)
+            t_write = time.perf_counter() - t_start
+            n_bytes = os.path.getsize(fn_out)
+            print('rows: %d, join loop: %.0f rows/s, write_array(precision=%s): %.0f rows/s (%.1f MB/s)'
+                  % (BENCH_ROWS, BENCH_ROWS / t_loop, str(precision), BENCH_ROWS / t_write, n_bytes / t_write / 1e6))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import time
+import unittest
+import numpy as np
+from cnspy_spatial_csv_formats.CovarianceMatrix import CovarianceMatrix
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType
+
+BENCH_ROWS = int(os.environ.get('CNSPY_BENCH_ROWS', '2000'))
+
+
+# per-row reference by column names
+def ref_unpack(fmt, row):
+    columns = CSVSpatialFormatType.get_format(fmt)
+    P = np.zeros((6, 6))
+    if 'Txx' in columns:
+        axes = ['x', 'y', 'z', 'a', 'b', 'c']
+        for i in range(6):
+            for j in range(i, 6):
+                P[i, j] = P[j, i] = row[columns.index('T' + axes[i] + axes[j])]
+    else:
+        for prefix, axes, offset in [('p', ['x', 'y', 'z'], 0), ('q', ['r', 'p', 'y'], 3)]:
+            for i in range(3):
+                for j in range(i, 3):
+                    P[offset + i, offset + j] = P[offset + j, offset + i] = \
+                        row[columns.index(prefix + axes[i] + axes[j])]
+    return P
+
+
+class CovarianceMatrix_Test(unittest.TestCase):
+    def test_unpack(self):
+        rng = np.random.default_rng(0)
+        for fmt in [CSVSpatialFormatType.PoseCov, CSVSpatialFormatType.PoseWithCov,
+                    CSVSpatialFormatType.PoseWithCovTyped, CSVSpatialFormatType.PosOrientCov,
+                    CSVSpatialFormatType.PosOrientWithCov, CSVSpatialFormatType.PosOrientWithCovTyped]:
+            data = rng.standard_normal((10, len(CSVSpatialFormatType.get_format(fmt))))
+            P = CovarianceMatrix.unpack(fmt, data)
+            self.assertEqual(P.shape, (10, 6, 6))
+            for n in range(10):
+                self.assertTrue(np.array_equal(P[n], ref_unpack(fmt, data[n])), str(fmt))
+
+            data2 = np.zeros_like(data)
+            CovarianceMatrix.pack(fmt, P, data2)
+            for view, view2 in zip(CovarianceMatrix.triangle_views(fmt, data),
+                                   CovarianceMatrix.triangle_views(fmt, data2)):
+                self.assertTrue(np.shares_memory(view, data))
+                self.assertTrue(np.array_equal(view, view2))
+
+    def test_blocks(self):
+        data = np.arange(2 * 13, dtype=np.float64).reshape(2, 13)
+        P_pos, P_orient = CovarianceMatrix.unpack_blocks(CSVSpatialFormatType.PosOrientCov, data)
+        self.assertTrue(np.array_equal(P_pos[1], [[14, 15, 16], [15, 17, 18], [16, 18, 19]]))
+        self.assertTrue(np.array_equal(P_orient[0], [[7, 8, 9], [8, 10, 11], [9, 11, 12]]))
+
+        tri = np.random.default_rng(1).standard_normal((5, 21))
+        out = np.empty((5, 6, 6))
+        self.assertIs(CovarianceMatrix.tri_to_full(tri, 6, out=out), out)
+        self.assertTrue(np.array_equal(CovarianceMatrix.full_to_tri(out), tri))
+        self.assertTrue(np.array_equal(out, np.swapaxes(out, 1, 2)))
+
+        # non-contiguous out, e.g. every second matrix of a stack
+        stack = np.zeros((10, 6, 6))
+        self.assertIs(CovarianceMatrix.tri_to_full(tri, 6, out=stack[::2]).base, stack)
+        self.assertTrue(np.array_equal(stack[::2], out))
+        self.assertTrue(np.all(stack[1::2] == 0))
+
+    def test_benchmark_unpack(self):
+        data = np.random.default_rng(2).standard_normal((BENCH_ROWS, 22))
+        t_start = time.perf_counter()
+        P = CovarianceMatrix.unpack(CSVSpatialFormatType.PoseCov, data)
+        t_unpack = time.perf_counter() - t_start
+        t_start = time.perf_counter()
+        CovarianceMatrix.pack(CSVSpatialFormatType.PoseCov, P, data)
+        t_pack = time.perf_counter() - t_start
+        print('rows: %d, unpack: %.3f s (%.0f rows/s), pack: %.3f s (%.0f rows/s)'
+              % (BENCH_ROWS, t_unpack, BENCH_ROWS / t_unpack, t_pack, BENCH_ROWS / t_pack))
+
+
+if __name__ == '__main__':
+    unittest.main()
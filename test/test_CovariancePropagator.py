@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import time
+import unittest
+import numpy as np
+import cnspy_spatial_csv_formats.SpatialMath as sm
+from cnspy_spatial_csv_formats.CovariancePropagator import CovariancePropagator
+from cnspy_spatial_csv_formats.CovarianceMatrix import CovarianceMatrix
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType
+from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
+from cnspy_spatial_csv_formats.ErrorRepresentationType import ErrorRepresentationType
+
+BENCH_ROWS = int(os.environ.get('CNSPY_BENCH_ROWS', '2000'))
+TYPES = [EstimationErrorType.type1, EstimationErrorType.type2, EstimationErrorType.type3,
+         EstimationErrorType.type4, EstimationErrorType.type5, EstimationErrorType.type6]
+
+
+# error of a true pose w.r.t. an estimated pose, by the definitions of EstimationErrorType
+def error(R, p, R_t, p_t, est_err_type):
+    if est_err_type == EstimationErrorType.type1:
+        R_err, p_err = R.T @ R_t, R.T @ (p_t - p)
+    elif est_err_type == EstimationErrorType.type2:
+        R_err = R_t @ R.T
+        p_err = p_t - R_err @ p
+    elif est_err_type == EstimationErrorType.type3:
+        R_err, p_err = R_t.T @ R, R_t.T @ (p - p_t)
+    elif est_err_type == EstimationErrorType.type4:
+        R_err = R @ R_t.T
+        p_err = p - R_err @ p_t
+    elif est_err_type == EstimationErrorType.type5:
+        R_err, p_err = R.T @ R_t, p_t - p
+    else:
+        R_err, p_err = R_t @ R.T, p_t - p
+    return np.concatenate([p_err, sm.log_so3(R_err)])
+
+
+def random_poses(n, seed=0):
+    rng = np.random.default_rng(seed)
+    p = rng.uniform(-10, 10, (n, 3))
+    q = sm.quat_normalize(rng.standard_normal((n, 4)))
+    return p, q
+
+
+def random_covariances(n, seed=0):
+    rng = np.random.default_rng(seed)
+    L = rng.standard_normal((n, 6, 6)) * 0.1
+    return L @ np.swapaxes(L, 1, 2) + 1e-3 * np.eye(6)
+
+
+class CovariancePropagator_Test(unittest.TestCase):
+    def test_jacobian_numerical(self):
+        p, q = random_poses(5)
+        R = sm.quat_to_rot(q)
+        h = 1e-6
+        for to_type in TYPES:
+            J = CovariancePropagator.jacobian(p, q, EstimationErrorType.type1, to_type)
+            for n in range(len(p)):
+                J_num = np.zeros((6, 6))
+                for k in range(6):
+                    d = np.zeros(6)
+                    d[k] = h
+                    e = []
+                    for eps1 in [d, -d]:
+                        # TRUE = EST \oplus ERR (type1)
+                        R_t = R[n] @ sm.exp_so3(eps1[3:6])
+                        p_t = p[n] + R[n] @ eps1[0:3]
+                        e.append(error(R[n], p[n], R_t, p_t, to_type))
+                    J_num[:, k] = (e[0] - e[1]) / (2 * h)
+                self.assertTrue(np.allclose(J[n], J_num, atol=1e-6), str(to_type))
+
+    def test_propagate(self):
+        p, q = random_poses(50, seed=1)
+        P = random_covariances(50, seed=2)
+        for from_type in TYPES:
+            for to_type in TYPES:
+                P_to = CovariancePropagator.propagate(P, p, q, from_type, to_type)
+                J = np.array([CovariancePropagator.jacobian(p, q, EstimationErrorType.type1, to_type)[n] @
+                              np.linalg.inv(CovariancePropagator.jacobian(p, q, EstimationErrorType.type1,
+                                                                          from_type)[n]) for n in range(50)])
+                self.assertTrue(np.allclose(P_to, J @ P @ np.swapaxes(J, 1, 2)))
+                P_back = CovariancePropagator.propagate(P_to, p, q, to_type, from_type)
+                self.assertTrue(np.allclose(P_back, P))
+
+        P_deg = CovariancePropagator.propagate(P, p, q, EstimationErrorType.type1, EstimationErrorType.type1,
+                                               ErrorRepresentationType.theta_so3, ErrorRepresentationType.rpy_degree)
+        self.assertTrue(np.allclose(P_deg[:, 3:6, 3:6], P[:, 3:6, 3:6] * (180.0 / np.pi) ** 2))
+        self.assertTrue(np.allclose(P_deg[:, 0:3, 0:3], P[:, 0:3, 0:3]))
+        self.assertRaises(ValueError, CovariancePropagator.propagate, P, p, q, 'type1', 'none')
+
+    def test_convert_block(self):
+        p, q = random_poses(20, seed=3)
+        P = random_covariances(20, seed=4)
+        fmt = CSVSpatialFormatType.PoseWithCovTyped
+        data = np.zeros((20, len(CSVSpatialFormatType.get_format(fmt))))
+        data[:, 0] = np.arange(20)
+        data[:, 1:4] = p
+        data[:, 4:8] = q
+        CovarianceMatrix.pack(fmt, P, data)
+        data[:, -2] = EstimationErrorType.type1.code()
+        data[:, -1] = ErrorRepresentationType.theta_so3.code()
+
+        data2 = CovariancePropagator.convert_block(fmt, data, EstimationErrorType.type2)
+        self.assertTrue(np.all(data2[:, -2] == EstimationErrorType.type2.code()))
+        self.assertTrue(np.allclose(CovarianceMatrix.unpack(fmt, data2),
+                                    CovariancePropagator.propagate(P, p, q, 'type1', 'type2')))
+        data1 = CovariancePropagator.convert_block(fmt, data2, EstimationErrorType.type1)
+        self.assertTrue(np.allclose(data1, data))
+
+        # PosOrientCov: no cross-covariances
+        fmt = CSVSpatialFormatType.PosOrientCov
+        block = np.zeros((20, 13))
+        P[:, 0:3, 3:6] = 0
+        P[:, 3:6, 0:3] = 0
+        CovarianceMatrix.pack(fmt, P, block)
+        self.assertTrue(np.allclose(CovarianceMatrix.unpack(fmt, block), P))
+        self.assertRaises(ValueError, CovariancePropagator.convert_block, fmt, block, 'type6')
+        block6 = CovariancePropagator.convert_block(fmt, block, 'type6', pose=np.hstack([p, q]))
+        self.assertTrue(np.allclose(CovarianceMatrix.unpack(fmt, block6),
+                                    CovariancePropagator.propagate(P, p, q, 'type1', 'type6')))
+
+    def test_benchmark_propagate(self):
+        p, q = random_poses(BENCH_ROWS)
+        P = random_covariances(BENCH_ROWS)
+        t_start = time.perf_counter()
+        CovariancePropagator.propagate(P, p, q, EstimationErrorType.type1, EstimationErrorType.type2)
+        t_elapsed = time.perf_counter() - t_start
+        print('rows: %d, propagate type1 -> type2: %.3f s (%.0f rows/s)'
+              % (BENCH_ROWS, t_elapsed, BENCH_ROWS / t_elapsed))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import math
+import time
+import unittest
+import numpy as np
+import cnspy_spatial_csv_formats.SpatialMath as sm
+from cnspy_spatial_csv_formats.ErrorRepresentationConverter import ErrorRepresentationConverter
+from cnspy_spatial_csv_formats.ErrorRepresentationType import ErrorRepresentationType
+
+BENCH_ROWS = int(os.environ.get('CNSPY_BENCH_ROWS', '2000'))
+REPS = [ErrorRepresentationType.theta_R, ErrorRepresentationType.theta_q, ErrorRepresentationType.theta_so3,
+        ErrorRepresentationType.tau_se3, ErrorRepresentationType.rpy_degree, ErrorRepresentationType.rpy_rad]
+
+
+# per-row reference implementation
+def ref_expm(A, terms=40):
+    E = np.eye(len(A))
+    term = np.eye(len(A))
+    for k in range(1, terms):
+        term = term @ A / k
+        E = E + term
+    return E
+
+
+def ref_skew(v):
+    return np.array([[0, -v[2], v[1]], [v[2], 0, -v[0]], [-v[1], v[0], 0]])
+
+
+def ref_rotation_error(R, err_rep):
+    angle = math.acos(max(-1.0, min(1.0, (np.trace(R) - 1) / 2)))
+    axis = np.array([R[2, 1] - R[1, 2], R[0, 2] - R[2, 0], R[1, 0] - R[0, 1]]) / (2 * math.sin(angle))
+    if err_rep == ErrorRepresentationType.theta_R:
+        return math.sin(angle) * axis
+    if err_rep == ErrorRepresentationType.theta_q:
+        return 2 * math.tan(angle / 2) * axis
+    if err_rep == ErrorRepresentationType.theta_so3 or err_rep == ErrorRepresentationType.tau_se3:
+        return angle * axis
+    rpy = np.array([math.atan2(R[2, 1], R[2, 2]), math.asin(-R[2, 0]), math.atan2(R[1, 0], R[0, 0])])
+    if err_rep == ErrorRepresentationType.rpy_degree:
+        return np.degrees(rpy)
+    return rpy
+
+
+def random_rotations(n, max_angle, seed=0):
+    rng = np.random.default_rng(seed)
+    axis = rng.standard_normal((n, 3))
+    axis /= np.linalg.norm(axis, axis=1, keepdims=True)
+    return axis * rng.uniform(0.01, max_angle, (n, 1))
+
+
+class ErrorRepresentationConverter_Test(unittest.TestCase):
+    def test_against_reference(self):
+        theta = random_rotations(200, np.deg2rad(80))
+        for to_rep in REPS:
+            converted = ErrorRepresentationConverter.convert(theta, ErrorRepresentationType.theta_so3, to_rep)
+            expected = np.array([ref_rotation_error(ref_expm(ref_skew(t)), to_rep) for t in theta])
+            self.assertTrue(np.allclose(converted, expected, atol=1e-9), str(to_rep))
+
+    def test_roundtrip(self):
+        theta_so3 = random_rotations(500, np.deg2rad(85), seed=1)
+        for from_rep in REPS:
+            theta = ErrorRepresentationConverter.convert(theta_so3, ErrorRepresentationType.theta_so3, from_rep)
+            for to_rep in REPS:
+                converted = ErrorRepresentationConverter.convert(theta, from_rep, to_rep)
+                back = ErrorRepresentationConverter.convert(converted, to_rep, from_rep)
+                self.assertTrue(np.allclose(back, theta, atol=1e-9), str(from_rep) + ' <-> ' + str(to_rep))
+
+    def test_small_angles(self):
+        theta = np.array([[0.0, 0.0, 0.0], [1e-9, -2e-9, 3e-9]])
+        for to_rep in REPS:
+            converted = ErrorRepresentationConverter.convert(theta, ErrorRepresentationType.theta_so3, to_rep)
+            scale = 180.0 / np.pi if to_rep == ErrorRepresentationType.rpy_degree else 1.0
+            self.assertTrue(np.allclose(converted, theta * scale, atol=1e-15), str(to_rep))
+
+    def test_tau_se3(self):
+        rng = np.random.default_rng(2)
+        tau = np.hstack([rng.standard_normal((50, 3)), random_rotations(50, np.deg2rad(120), seed=3)])
+        for to_rep in [ErrorRepresentationType.theta_so3, ErrorRepresentationType.rpy_rad]:
+            err = ErrorRepresentationConverter.convert(tau, ErrorRepresentationType.tau_se3, to_rep)
+            for row_tau, row_err in zip(tau, err):
+                A = np.zeros((4, 4))
+                A[0:3, 0:3] = ref_skew(row_tau[3:6])
+                A[0:3, 3] = row_tau[0:3]
+                T = ref_expm(A)
+                self.assertTrue(np.allclose(row_err[0:3], T[0:3, 3], atol=1e-9))
+                self.assertTrue(np.allclose(row_err[3:6], ref_rotation_error(T[0:3, 0:3], to_rep), atol=1e-9))
+            back = ErrorRepresentationConverter.convert(err, to_rep, ErrorRepresentationType.tau_se3)
+            self.assertTrue(np.allclose(back, tau, atol=1e-9))
+
+        self.assertRaises(ValueError, ErrorRepresentationConverter.convert, tau, 'none', 'theta_R')
+
+    def test_quat(self):
+        q = sm.rot_to_quat(sm.exp_so3(random_rotations(100, np.pi - 0.01, seed=4)))
+        self.assertTrue(np.allclose(sm.rot_to_quat(sm.quat_to_rot(q)), q, atol=1e-12))
+        self.assertTrue(np.allclose(sm.quat_mul(q, sm.quat_conj(q)), [0, 0, 0, 1], atol=1e-12))
+
+    def test_benchmark_convert(self):
+        theta = random_rotations(BENCH_ROWS, np.deg2rad(60))
+        err = np.hstack([np.ones((BENCH_ROWS, 3)), theta])
+        for from_rep, to_rep in [('theta_so3', 'theta_q'), ('theta_R', 'rpy_degree'), ('theta_so3', 'tau_se3')]:
+            t_start = time.perf_counter()
+            ErrorRepresentationConverter.convert(err, from_rep, to_rep)
+            t_elapsed = time.perf_counter() - t_start
+            print('rows: %d, %s -> %s: %.3f s (%.0f rows/s)'
+                  % (BENCH_ROWS, from_rep, to_rep, t_elapsed, BENCH_ROWS / t_elapsed))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import sys
+import subprocess
+import unittest
+import cnspy_spatial_csv_formats
+
+SAMPLE_DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), 'sample_data'))
+PACKAGE = 'cnspy_spatial_csv_formats'
+
+
+def run_python(code, *args):
+    # runs code in a fresh interpreter, returns (stdout, stderr)
+    res = subprocess.run([sys.executable] + list(args) + ['-c', code], capture_output=True, text=True, check=True)
+    return res.stdout, res.stderr
+
+
+class LazyImport_Test(unittest.TestCase):
+    def test_identify_without_numpy(self):
+        fn = os.path.join(SAMPLE_DATA_DIR, 'ID1-pose-est-posorient-cov-type1-thetaR.csv')
+        for code in ['from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType as F\n'
+                     'fmt = F.identify_format(%r)\n',
+                     'from cnspy_spatial_csv_formats.CSVSpatialFormat import CSVSpatialFormat as F\n'
+                     'fmt = F.identify_format(%r).type\n',
+                     'import cnspy_spatial_csv_formats as csf\n'
+                     'fmt = csf.CSVSpatialFormatType.CSVSpatialFormatType.identify_format(%r)\n']:
+            out, _ = run_python(code % fn + 'import sys\n'
+                                'print(fmt, "numpy" in sys.modules, "%s.PoseStructs" in sys.modules)' % PACKAGE)
+            self.assertEqual(out.split(), ['PosOrientWithCovTyped', 'False', 'False'])
+
+    def test_lazy_attributes(self):
+        package_dir = os.path.dirname(cnspy_spatial_csv_formats.__file__)
+        module_names = sorted(os.path.splitext(f)[0] for f in os.listdir(package_dir)
+                              if f.endswith('.py') and f != '__init__.py')
+        self.assertEqual(sorted(cnspy_spatial_csv_formats.__all__), module_names)
+        self.assertTrue(set(module_names).issubset(dir(cnspy_spatial_csv_formats)))
+        self.assertEqual(cnspy_spatial_csv_formats.EstimationErrorType.EstimationErrorType.type1.code(), 0)
+        self.assertRaises(AttributeError, getattr, cnspy_spatial_csv_formats, 'NoSuchModule')
+
+        out, _ = run_python('import sys, cnspy_spatial_csv_formats\n'
+                            'print(len([m for m in sys.modules if m.startswith("%s.")]))' % PACKAGE)
+        self.assertEqual(out.strip(), '0')
+
+    def test_benchmark_importtime(self):
+        # python -X importtime reports "self [us] | cumulative [us] | module" per imported module on stderr
+        for module in [PACKAGE, PACKAGE + '.CSVSpatialFormatType', PACKAGE + '.CSVSpatialFormat']:
+            _, err = run_python('import ' + module, '-X', 'importtime')
+            lines = [line.split('|') for line in err.splitlines() if line.startswith('import time:')]
+            imported = [parts[2].strip() for parts in lines[1:]]
+            self.assertNotIn('numpy', imported)
+            cumulative = dict((parts[2].strip(), int(parts[1])) for parts in lines[1:])
+            print('import %s: %.1f ms' % (module, cumulative[module] * 1e-3))
+
+
+if __name__ == '__main__':
+    unittest.main()
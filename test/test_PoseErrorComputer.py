@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import time
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import cnspy_spatial_csv_formats.SpatialMath as sm
+from cnspy_spatial_csv_formats.PoseErrorComputer import PoseErrorComputer
+from cnspy_spatial_csv_formats.ErrorRepresentationConverter import ErrorRepresentationConverter
+from cnspy_spatial_csv_formats.CSVSpatialFormat import CSVSpatialFormat
+from cnspy_spatial_csv_formats.CSVSpatialFormatType import CSVSpatialFormatType
+from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
+from cnspy_spatial_csv_formats.ErrorRepresentationType import ErrorRepresentationType
+
+BENCH_ROWS = int(os.environ.get('CNSPY_BENCH_ROWS', '2000'))
+TYPES = [EstimationErrorType.type1, EstimationErrorType.type2, EstimationErrorType.type3,
+         EstimationErrorType.type4, EstimationErrorType.type5, EstimationErrorType.type6]
+
+
+# per-row reference with rotation matrices
+def ref_error(R, p, R_t, p_t, est_err_type):
+    if est_err_type == EstimationErrorType.type1:
+        return R.T @ R_t, R.T @ (p_t - p)
+    elif est_err_type == EstimationErrorType.type2:
+        return R_t @ R.T, p_t - R_t @ R.T @ p
+    elif est_err_type == EstimationErrorType.type3:
+        return R_t.T @ R, R_t.T @ (p - p_t)
+    elif est_err_type == EstimationErrorType.type4:
+        return R @ R_t.T, p - R @ R_t.T @ p_t
+    elif est_err_type == EstimationErrorType.type5:
+        return R.T @ R_t, p_t - p
+    return R_t @ R.T, p_t - p
+
+
+def random_trajectories(n, seed=0):
+    rng = np.random.default_rng(seed)
+    gt = np.empty((n, 8))
+    gt[:, 0] = np.arange(n) * 0.01
+    gt[:, 1:4] = rng.uniform(-10, 10, (n, 3))
+    gt[:, 4:8] = sm.quat_normalize(rng.standard_normal((n, 4)))
+    est = gt.copy()
+    est[:, 1:4] += rng.normal(0, 0.1, (n, 3))
+    est[:, 4:8] = sm.quat_mul(gt[:, 4:8], sm.exp_so3_quat(rng.normal(0, 0.1, (n, 3))))
+    return est, gt
+
+
+class PoseErrorComputer_Test(unittest.TestCase):
+    def test_against_reference(self):
+        est, gt = random_trajectories(50)
+        R, R_t = sm.quat_to_rot(est[:, 4:8]), sm.quat_to_rot(gt[:, 4:8])
+        for est_err_type in TYPES:
+            data = PoseErrorComputer.compute_blocks(est, gt, est_err_type, ErrorRepresentationType.theta_so3)
+            self.assertEqual(data.shape, (50, 9))
+            self.assertTrue(np.array_equal(data[:, 0], est[:, 0]))
+            self.assertTrue(np.all(data[:, 7] == est_err_type.code()))
+            self.assertTrue(np.all(data[:, 8] == ErrorRepresentationType.theta_so3.code()))
+            for n in range(50):
+                R_err, p_err = ref_error(R[n], est[n, 1:4], R_t[n], gt[n, 1:4], est_err_type)
+                self.assertTrue(np.allclose(data[n, 1:4], p_err), str(est_err_type))
+                self.assertTrue(np.allclose(sm.exp_so3(data[n, 4:7]), R_err), str(est_err_type))
+
+    def test_representations(self):
+        est, gt = random_trajectories(50, seed=1)
+        ref = PoseErrorComputer.compute_blocks(est, gt, 'type2', 'theta_so3')
+        for err_rep in ErrorRepresentationType.list()[:-1]:
+            data = PoseErrorComputer.compute_blocks(est, gt, 'type2', err_rep)
+            self.assertTrue(np.allclose(data[:, 1:7],
+                                        ErrorRepresentationConverter.convert(ref[:, 1:7], 'theta_so3', err_rep)))
+        self.assertRaises(ValueError, PoseErrorComputer.compute_blocks, est, gt, 'none', 'theta_so3')
+
+    def test_write(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            est, gt = random_trajectories(20, seed=2)
+            data = PoseErrorComputer.compute_blocks(est, gt, 'type5', 'theta_q')
+            fmt = CSVSpatialFormat.from_array(CSVSpatialFormatType.PoseErrorStamped, data)
+            self.assertEqual(fmt.estimation_error_type, EstimationErrorType.type5)
+            fn = os.path.join(tmp_dir, 'error.csv')
+            fmt.write_array(fn, data)
+            fmt2, data2 = CSVSpatialFormat.read_array(fn)
+            self.assertEqual(fmt2.type, CSVSpatialFormatType.PoseErrorStamped)
+            self.assertTrue(np.array_equal(data2, data))
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_benchmark_compute(self):
+        est, gt = random_trajectories(BENCH_ROWS)
+        for est_err_type, err_rep in [('type1', 'theta_so3'), ('type2', 'tau_se3')]:
+            t_start = time.perf_counter()
+            PoseErrorComputer.compute_blocks(est, gt, est_err_type, err_rep)
+            t_elapsed = time.perf_counter() - t_start
+            print('rows: %d, %s/%s: %.3f s (%.0f rows/s)'
+                  % (BENCH_ROWS, est_err_type, err_rep, t_elapsed, BENCH_ROWS / t_elapsed))
+
+
+if __name__ == '__main__':
+    unittest.main()
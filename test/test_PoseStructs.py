@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import time
+import unittest
+import tracemalloc
+import numpy as np
+import cnspy_spatial_csv_formats.PoseStructs as ps
+from cnspy_spatial_csv_formats.PoseStructsBatch import PoseStructsBatch, struct_fields
+from cnspy_spatial_csv_formats.CSVSpatialFormat import CSVSpatialFormat
+from cnspy_spatial_csv_formats.EstimationErrorType import EstimationErrorType
+from cnspy_spatial_csv_formats.ErrorRepresentationType import ErrorRepresentationType
+
+SAMPLE_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_data')
+BENCH_ROWS = int(os.environ.get('CNSPY_BENCH_ROWS', '2000'))
+
+
+# the former PoseStructs record layout: one __dict__ per instance
+class sDictPoseWithCovStamped:
+    def __init__(self, vec=None):
+        for name, val in zip(struct_fields(ps.sTUMPoseWithCovStamped), vec):
+            setattr(self, name, val)
+
+
+class PoseStructs_Test(unittest.TestCase):
+    def test_slots(self):
+        p = ps.sTUMPoseWithCovStamped(vec=list(range(29)))
+        self.assertFalse(hasattr(p, '__dict__'))
+        self.assertEqual(p.Tcc, 28)
+        self.assertEqual(struct_fields(ps.sTUMPoseWithCovStamped)[-1], 'Tcc')
+
+        p = ps.sTUMPoseWithCovStampedTyped(vec=list(range(29)), est_type='type1', err_repr='theta_R\n')
+        self.assertTrue(p.est_err_type == EstimationErrorType.type1)
+        self.assertTrue(p.err_representation == ErrorRepresentationType.theta_R)
+        self.assertEqual(len(struct_fields(ps.sTUMPoseWithCovStampedTyped)), 31)
+
+    def test_batch(self):
+        fmt, data = CSVSpatialFormat.read_array(str(SAMPLE_DATA_DIR + '/ID1-pose-est-posorient-cov-type1-thetaR.csv'))
+        batch = PoseStructsBatch(ps.sTUMPosOrientWithCovStampedTyped, data=data)
+        self.assertEqual(len(batch), len(data))
+
+        view = batch[1]
+        self.assertEqual(view.t, data[1, 0])
+        self.assertEqual(view.qw, data[1, 7])
+        self.assertTrue(view.est_err_type == EstimationErrorType.type1)
+        self.assertTrue(view.err_representation == ErrorRepresentationType.theta_R)
+        self.assertTrue(batch[-1].t == data[-1, 0])
+
+        # views write through to the shared block
+        view.tx = 42.0
+        self.assertEqual(data[1, 1], 42.0)
+        view.err_representation = ErrorRepresentationType.theta_q
+        self.assertEqual(data[1, -1], ErrorRepresentationType.theta_q.code())
+
+        structs = batch[0:3].to_structs()
+        self.assertEqual(structs[1].tx, 42.0)
+        self.assertTrue(structs[1].err_representation == ErrorRepresentationType.theta_q)
+        batch2 = PoseStructsBatch.from_structs(structs)
+        self.assertTrue(np.array_equal(batch2.data, data[0:3]))
+        self.assertTrue(np.array_equal(batch.column('t'), data[:, 0]))
+
+    def test_benchmark_memory(self):
+        # each row holds its own float objects, as if parsed from a file; tracemalloc is slow, thus fewer rows
+        n_rows = min(BENCH_ROWS, 20000)
+        vec = [float(x) for x in range(29)]
+        results = dict()
+        for name, factory in [('dict', lambda: [sDictPoseWithCovStamped(vec=[x + i for x in vec])
+                                                for i in range(n_rows)]),
+                              ('slots', lambda: [ps.sTUMPoseWithCovStamped(vec=[x + i for x in vec])
+                                                 for i in range(n_rows)]),
+                              ('batch', lambda: PoseStructsBatch(ps.sTUMPoseWithCovStamped,
+                                                                 data=np.tile(np.array(vec), (n_rows, 1))))]:
+            tracemalloc.start()
+            t_start = time.perf_counter()
+            obj = factory()
+            t_elapsed = time.perf_counter() - t_start
+            size, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del obj
+            results[name] = size / n_rows
+            print('%s: %.0f bytes/row, %.0f rows/s' % (name, size / n_rows, n_rows / t_elapsed))
+
+        self.assertLess(results['slots'], results['dict'])
+        self.assertLess(results['batch'], results['slots'])
+
+
+if __name__ == '__main__':
+    unittest.main()
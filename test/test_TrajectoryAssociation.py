@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# Software License Agreement (GNU GPLv3  License)
+#
+# Copyright (c) 2022, Roland Jung (roland.jung@aau.at) , AAU, KPK, NAV
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+########################################################################################################################
+import os
+import time
+import unittest
+import numpy as np
+import cnspy_spatial_csv_formats.SpatialMath as sm
+from cnspy_spatial_csv_formats.TrajectoryAssociation import TrajectoryAssociation
+
+SAMPLE_DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), 'sample_data'))
+BENCH_ROWS = int(os.environ.get('CNSPY_BENCH_ROWS', '2000'))
+
+
+# quadratic reference: nearest reference per estimate, then the closest estimate per reference entry
+def ref_associate(t_est, t_ref, offset, max_difference):
+    pairs = dict()
+    for i, t in enumerate(t_est):
+        d = np.abs(t_ref - (t + offset))
+        j = int(np.argmin(d))
+        if d[j] <= max_difference and (j not in pairs or d[j] < pairs[j][1]):
+            pairs[j] = (i, d[j])
+    matches = sorted((i, j) for j, (i, _) in pairs.items())
+    return [i for i, _ in matches], [j for _, j in matches]
+
+
+class TrajectoryAssociation_Test(unittest.TestCase):
+    def test_associate(self):
+        rng = np.random.default_rng(0)
+        t_ref = np.cumsum(rng.uniform(0.005, 0.015, 500))
+        t_est = np.sort(rng.uniform(-0.1, t_ref[-1] + 0.1, 300))
+        for offset, max_difference in [(0.0, 0.002), (0.05, 0.004), (-0.02, 1.0)]:
+            idx_est, idx_ref = TrajectoryAssociation.associate(t_est, t_ref, offset, max_difference)
+            ref_est, ref_ref = ref_associate(t_est, t_ref, offset, max_difference)
+            self.assertEqual(idx_est.tolist(), ref_est)
+            self.assertEqual(idx_ref.tolist(), ref_ref)
+
+        # unsorted reference timestamps are mapped back to their original rows
+        perm = rng.permutation(len(t_ref))
+        idx_est, idx_ref = TrajectoryAssociation.associate(t_est, t_ref[perm], 0.0, 0.002)
+        ref_est, ref_ref = ref_associate(t_est, t_ref, 0.0, 0.002)
+        self.assertEqual(idx_est.tolist(), ref_est)
+        self.assertEqual(perm[idx_ref].tolist(), ref_ref)
+
+        # without unique, estimates may share a reference entry
+        idx_est, idx_ref = TrajectoryAssociation.associate([1.0, 1.001], [0.0, 1.0], max_difference=0.01, unique=False)
+        self.assertEqual(idx_ref.tolist(), [1, 1])
+        self.assertEqual(len(TrajectoryAssociation.associate([], [1.0])[0]), 0)
+
+    def test_interpolate(self):
+        t = np.arange(0, 1.01, 0.1)
+        theta = np.outer(t, [0.0, 0.0, 1.0])
+        ref = np.zeros((len(t), 8))
+        ref[:, 0] = t
+        ref[:, 1:4] = np.outer(t, [1.0, 2.0, 3.0])
+        ref[:, 4:8] = sm.exp_so3_quat(theta)
+
+        t_est = np.array([-0.05, 0.0, 0.25, 0.5, 0.73, 1.0, 1.2])
+        idx_est, idx_lo, alpha = TrajectoryAssociation.interpolation_indices(t_est, t)
+        self.assertEqual(idx_est.tolist(), [1, 2, 3, 4, 5])
+        data = TrajectoryAssociation.interpolate(ref, idx_lo, alpha)
+        self.assertTrue(np.allclose(data[:, 0], t_est[idx_est]))
+        self.assertTrue(np.allclose(data[:, 1:4], np.outer(t_est[idx_est], [1.0, 2.0, 3.0])))
+        self.assertTrue(np.allclose(sm.log_so3_quat(data[:, 4:8]), np.outer(t_est[idx_est], [0.0, 0.0, 1.0])))
+
+        # further columns are copied from the row idx_lo
+        ref_wide = np.hstack([ref, np.outer(np.arange(len(t)), [1.0, 2.0])])
+        data_wide = TrajectoryAssociation.interpolate(ref_wide, idx_lo, alpha)
+        self.assertTrue(np.array_equal(data_wide[:, 0:8], data))
+        self.assertTrue(np.array_equal(data_wide[:, 8:], ref_wide[idx_lo, 8:]))
+
+        idx_est, _, _ = TrajectoryAssociation.interpolation_indices(t_est, np.delete(t, 3), max_gap=0.15)
+        self.assertEqual(idx_est.tolist(), [1, 3, 4, 5])
+
+    def test_associate_files(self):
+        est, gt, idx_est, idx_gt = TrajectoryAssociation.associate_files(
+            os.path.join(SAMPLE_DATA_DIR, 'ID1-pose-est.csv'), os.path.join(SAMPLE_DATA_DIR, 'ID1-pose-gt.csv'),
+            max_difference=0.001)
+        self.assertTrue(len(idx_est) > 0)
+        self.assertTrue(np.all(np.abs(est[idx_est, 0] - gt[idx_gt, 0]) <= 0.001))
+
+    def test_benchmark_associate(self):
+        t_ref = np.arange(BENCH_ROWS) * 0.005
+        t_est = np.arange(BENCH_ROWS // 2) * 0.01 + 0.0012
+        t_start = time.perf_counter()
+        TrajectoryAssociation.associate(t_est, t_ref, max_difference=0.002)
+        t_elapsed = time.perf_counter() - t_start
+        print('rows: %d x %d, associate: %.3f s' % (len(t_est), len(t_ref), t_elapsed))
+
+
+if __name__ == '__main__':
+    unittest.main()